@@ -0,0 +1,60 @@
+import logging
+from typing import Callable, Optional
+
+from services.ports.metrics import CircuitState
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures.
+
+    While open, ``allow`` is False so callers skip the dependency without
+    waiting on it. ``half_open`` marks a single probe in flight; its success
+    closes the breaker and its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        on_transition: Optional[Callable[[str, CircuitState], None]] = None,
+    ):
+        self.name = name
+        self._failure_threshold = max(1, failure_threshold)
+        self._on_transition = on_transition
+        self._state: CircuitState = "closed"
+        self._failures = 0
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow(self) -> bool:
+        return self._state == "closed"
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state != "closed":
+            self._transition("closed")
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == "half_open" or (
+            self._state == "closed" and self._failures >= self._failure_threshold
+        ):
+            self._transition("open")
+
+    def half_open(self) -> None:
+        if self._state == "open":
+            self._transition("half_open")
+
+    def reset(self) -> None:
+        self._failures = 0
+        self._state = "closed"
+
+    def _transition(self, state: CircuitState) -> None:
+        previous, self._state = self._state, state
+        logger.warning("Circuit breaker %s: %s -> %s", self.name, previous, state)
+        if self._on_transition is not None:
+            self._on_transition(self.name, state)
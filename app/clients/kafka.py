@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -50,12 +51,16 @@ class KafkaProducerClient:
         if self._producer is not None:
             return
         bootstrap = self._bootstrap_servers()
-        await ensure_topics(bootstrap)
-        self._producer = AIOKafkaProducer(
+        producer = AIOKafkaProducer(
             bootstrap_servers=bootstrap,
             value_serializer=lambda v: json.dumps(v).encode("utf-8"),
         )
-        await self._producer.start()
+        # Topic creation does not gate the producer, so both handshakes overlap.
+        results = await asyncio.gather(ensure_topics(bootstrap), producer.start(), return_exceptions=True)
+        if isinstance(results[1], BaseException):
+            await producer.stop()
+            raise results[1]
+        self._producer = producer
         logger.info("Kafka producer started")
 
     async def stop(self) -> None:
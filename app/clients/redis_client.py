@@ -1,13 +1,33 @@
+import asyncio
 import os
 import logging
+from typing import Optional
+
 from redis.asyncio import Redis
 
+from app.clients.circuit_breaker import CircuitBreaker
+from services.ports.metrics import CircuitState, get_metrics_recorder
+
 logger = logging.getLogger(__name__)
 
+# Per-call budget: a slow Redis must fail fast so callers fall back to the
+# database instead of holding the request for the default socket timeout.
+REDIS_SOCKET_TIMEOUT_MS = float(os.getenv("REDIS_SOCKET_TIMEOUT_MS", "100"))
+REDIS_CONNECT_TIMEOUT_MS = float(os.getenv("REDIS_CONNECT_TIMEOUT_MS", "200"))
+REDIS_BREAKER_FAILURE_THRESHOLD = int(os.getenv("REDIS_BREAKER_FAILURE_THRESHOLD", "5"))
+REDIS_BREAKER_OPEN_SECONDS = float(os.getenv("REDIS_BREAKER_OPEN_SECONDS", "5"))
+
+
+def _record_transition(name: str, state: CircuitState) -> None:
+    get_metrics_recorder().record_circuit_breaker_transition(name=name, state=state)
+
 
 class RedisClient:
     _instance = None
     _client: Redis | None = None
+    _raw_client: Redis | None = None
+    _breaker: CircuitBreaker = CircuitBreaker("redis", REDIS_BREAKER_FAILURE_THRESHOLD, _record_transition)
+    _probe_task: Optional[asyncio.Task] = None
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -17,25 +37,73 @@ class RedisClient:
     async def connect(self) -> None:
         if self._client is None:
             url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-            self._client = Redis.from_url(url, decode_responses=True)
+            timeouts = {
+                "socket_timeout": REDIS_SOCKET_TIMEOUT_MS / 1000.0,
+                "socket_connect_timeout": REDIS_CONNECT_TIMEOUT_MS / 1000.0,
+            }
+            self._client = Redis.from_url(url, decode_responses=True, **timeouts)
+            # Cache values are binary-encoded, so cache traffic skips UTF-8 decoding.
+            self._raw_client = Redis.from_url(url, decode_responses=False, **timeouts)
             try:
                 await self._client.ping()
             except Exception:
+                await self._raw_client.aclose()
                 self._client = None
+                self._raw_client = None
                 raise
+            self._breaker.reset()
             logger.info("Redis client connected")
 
     async def close(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._raw_client is not None:
+            await self._raw_client.aclose()
+            self._raw_client = None
         if self._client is not None:
             await self._client.aclose()
             self._client = None
             logger.info("Redis client closed")
 
     def is_connected(self) -> bool:
-        return self._client is not None
+        """True when Redis is connected and its circuit breaker lets calls through."""
+        return self._client is not None and self._breaker.allow()
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    def record_success(self) -> None:
+        self._breaker.record_success()
+
+    def record_failure(self) -> None:
+        self._breaker.record_failure()
+        if self._breaker.state == "open" and (self._probe_task is None or self._probe_task.done()):
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+
+    async def _probe(self) -> None:
+        while self._breaker.state != "closed":
+            await asyncio.sleep(REDIS_BREAKER_OPEN_SECONDS)
+            if self._client is None:
+                return
+            self._breaker.half_open()
+            try:
+                await self._client.ping()
+            except Exception as e:
+                logger.warning("Redis probe failed: %s", e)
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
 
     @property
     def client(self) -> Redis:
         if self._client is None:
             raise RuntimeError("Redis client is not initialized")
         return self._client
+
+    @property
+    def raw_client(self) -> Redis:
+        if self._raw_client is None:
+            raise RuntimeError("Redis client is not initialized")
+        return self._raw_client
@@ -0,0 +1,15 @@
+from typing import AsyncIterator
+
+from database import Database, DbSession
+
+
+async def db_session() -> AsyncIterator[DbSession]:
+    """One pooled connection for the whole request, acquired on first use."""
+    async with Database().session() as session:
+        yield session
+
+
+async def db_transaction() -> AsyncIterator[DbSession]:
+    """Like ``db_session``, with every query of the request in one transaction."""
+    async with Database().session(transaction=True) as session:
+        yield session
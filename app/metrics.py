@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 HTTP_REQUESTS_TOTAL = Counter(
     "http_requests_total",
@@ -32,12 +32,161 @@ PREDICTION_ERRORS_TOTAL = Counter(
     labelnames=("error_type",),
 )
 
+PREDICTION_BATCH_SIZE = Histogram(
+    "prediction_batch_size",
+    "Number of feature rows scored by one batched model call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+
+PREDICTION_QUEUE_DELAY_SECONDS = Histogram(
+    "prediction_queue_delay_seconds",
+    "Time a prediction request waited in the micro-batch queue",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+INFERENCE_EXECUTOR_QUEUE_DEPTH = Gauge(
+    "inference_executor_queue_depth",
+    "Model inference calls submitted to the executor and not yet finished",
+)
+
+INFERENCE_EXECUTOR_WAIT_SECONDS = Histogram(
+    "inference_executor_wait_seconds",
+    "Time an inference call waited for a free executor worker",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+MODEL_VERSION_PREDICTIONS_TOTAL = Counter(
+    "model_version_predictions_total",
+    "Total number of predictions per model version",
+    labelnames=("model_version",),
+)
+
+MODEL_ACTIVE_VERSION = Gauge(
+    "model_active_version",
+    "Model version currently served (1 for the active version, 0 otherwise)",
+    labelnames=("model_version",),
+)
+
+MODEL_RELOAD_DURATION_SECONDS = Histogram(
+    "model_reload_duration_seconds",
+    "Time to load a new model version in the background and swap it in",
+    labelnames=("result",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+MODEL_RELOAD_ARTIFACT_BYTES = Gauge(
+    "model_reload_artifact_bytes",
+    "Combined artifact file size of the old and new model versions at the last reload",
+)
+
+PREDICTION_MEMO_EVENTS_TOTAL = Counter(
+    "prediction_memo_events_total",
+    "In-process prediction memo hits, misses, evictions and invalidated entries",
+    labelnames=("event",),
+)
+
+CACHE_LOOKUPS_TOTAL = Counter(
+    "cache_lookups_total",
+    "Prediction cache lookups per tier (l1 in-process, l2 Redis) and outcome",
+    labelnames=("tier", "keyspace", "result"),
+)
+
+CACHE_OPERATIONS_TOTAL = Counter(
+    "cache_operations_total",
+    "Keys touched by Redis cache operations, by outcome (hit/miss for reads, ok for writes, error)",
+    labelnames=("keyspace", "operation", "result"),
+)
+
+CACHE_OPERATION_DURATION_SECONDS = Histogram(
+    "cache_operation_duration_seconds",
+    "Redis cache round-trip duration in seconds, including failed calls",
+    labelnames=("keyspace", "operation"),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+CIRCUIT_BREAKER_TRANSITIONS_TOTAL = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes, by the state entered",
+    labelnames=("name", "state"),
+)
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Current circuit breaker state: 0 closed, 1 half-open, 2 open",
+    labelnames=("name",),
+)
+
+CACHE_PREWARM_DURATION_SECONDS = Histogram(
+    "cache_prewarm_duration_seconds",
+    "Duration of hot-set prewarm runs after a cold prediction cache was detected",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+CACHE_PREWARMED_KEYS_TOTAL = Counter(
+    "cache_prewarmed_keys_total",
+    "Predictions loaded into the cache by hot-set prewarming",
+)
+
+NEGATIVE_CACHE_HITS_TOTAL = Counter(
+    "negative_cache_hits_total",
+    "Lookups of unknown or closed advertisements answered without the database",
+    labelnames=("source",),
+)
+
+PREDICTION_COALESCED_REQUESTS_TOTAL = Counter(
+    "prediction_coalesced_requests_total",
+    "Prediction cache misses served by a computation another request already started",
+    labelnames=("scope",),
+)
+
+STARTUP_PHASE_DURATION_SECONDS = Gauge(
+    "startup_phase_duration_seconds",
+    "Duration of each initialization phase during the last startup",
+    labelnames=("phase",),
+)
+
+STARTUP_DURATION_SECONDS = Gauge(
+    "startup_duration_seconds",
+    "Wall-clock duration of the last startup, with phases running concurrently",
+)
+
 DB_QUERY_DURATION_SECONDS = Histogram(
     "db_query_duration_seconds",
     "Database query duration in seconds",
     labelnames=("query_type",),
 )
 
+DB_POOL_ACQUIRE_WAIT_SECONDS = Histogram(
+    "db_pool_acquire_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    labelnames=("pool",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled database connections by pool and state",
+    labelnames=("pool", "state"),
+)
+
+DB_POOL_ACQUIRE_TIMEOUTS_TOTAL = Counter(
+    "db_pool_acquire_timeouts_total",
+    "Database connection acquisitions that timed out",
+    labelnames=("pool",),
+)
+
+DB_SESSION_ACQUISITIONS = Histogram(
+    "db_session_connection_acquisitions",
+    "Pool connections acquired per request or worker message session",
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16),
+)
+
+DB_CONNECTION_ROUTES_TOTAL = Counter(
+    "db_connection_routes_total",
+    "Database connections handed out, by target and routing reason",
+    labelnames=("target", "reason"),
+)
+
 MODEL_PREDICTION_PROBABILITY = Histogram(
     "model_prediction_probability",
     "Distribution of prediction probability",
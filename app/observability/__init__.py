@@ -1,5 +1,6 @@
 from app.observability.middleware import PrometheusMiddleware
 from app.observability.recorder import PrometheusMetricsRecorder
 from app.observability.routes import router as metrics_router
+from app.observability.startup import StartupReport
 
-__all__ = ["PrometheusMiddleware", "PrometheusMetricsRecorder", "metrics_router"]
+__all__ = ["PrometheusMiddleware", "PrometheusMetricsRecorder", "StartupReport", "metrics_router"]
@@ -1,16 +1,55 @@
 from __future__ import annotations
 
-from services.ports.metrics import MetricsRecorder, PredictionErrorType, PredictionResult
+from typing import Mapping, Sequence
+
+from services.ports.metrics import (
+    CacheKeyspace,
+    CacheOperation,
+    CacheResult,
+    CacheTier,
+    CircuitState,
+    CoalesceScope,
+    MemoEvent,
+    MetricsRecorder,
+    NegativeCacheSource,
+    ModelReloadResult,
+    PredictionErrorType,
+    PredictionResult,
+)
 
 from app.metrics import (
+    CACHE_LOOKUPS_TOTAL,
+    CACHE_OPERATION_DURATION_SECONDS,
+    CACHE_OPERATIONS_TOTAL,
+    CACHE_PREWARM_DURATION_SECONDS,
+    CACHE_PREWARMED_KEYS_TOTAL,
+    CIRCUIT_BREAKER_STATE,
+    CIRCUIT_BREAKER_TRANSITIONS_TOTAL,
+    INFERENCE_EXECUTOR_QUEUE_DEPTH,
+    INFERENCE_EXECUTOR_WAIT_SECONDS,
+    MODEL_ACTIVE_VERSION,
     MODEL_PREDICTION_PROBABILITY,
+    MODEL_RELOAD_ARTIFACT_BYTES,
+    MODEL_RELOAD_DURATION_SECONDS,
+    MODEL_VERSION_PREDICTIONS_TOTAL,
+    NEGATIVE_CACHE_HITS_TOTAL,
+    PREDICTION_BATCH_SIZE,
+    PREDICTION_COALESCED_REQUESTS_TOTAL,
     PREDICTION_DURATION_SECONDS,
     PREDICTION_ERRORS_TOTAL,
+    PREDICTION_MEMO_EVENTS_TOTAL,
+    PREDICTION_QUEUE_DELAY_SECONDS,
     PREDICTIONS_TOTAL,
 )
 
 
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
 class PrometheusMetricsRecorder(MetricsRecorder):
+    def __init__(self) -> None:
+        self._active_model_version: str | None = None
+
     def record_prediction_result(self, *, result: PredictionResult) -> None:
         PREDICTIONS_TOTAL.labels(result=result).inc()
 
@@ -22,3 +61,79 @@ class PrometheusMetricsRecorder(MetricsRecorder):
 
     def record_prediction_error(self, *, error_type: PredictionErrorType) -> None:
         PREDICTION_ERRORS_TOTAL.labels(error_type=error_type).inc()
+
+    def record_prediction_results(self, *, counts: Mapping[PredictionResult, int]) -> None:
+        for result, count in counts.items():
+            if count:
+                PREDICTIONS_TOTAL.labels(result=result).inc(count)
+
+    def observe_prediction_probabilities(self, *, probabilities: Sequence[float]) -> None:
+        for probability in probabilities:
+            MODEL_PREDICTION_PROBABILITY.observe(probability)
+
+    def record_prediction_errors(self, *, error_type: PredictionErrorType, count: int) -> None:
+        if count:
+            PREDICTION_ERRORS_TOTAL.labels(error_type=error_type).inc(count)
+
+    def observe_prediction_batch_size(self, *, batch_size: int) -> None:
+        PREDICTION_BATCH_SIZE.observe(batch_size)
+
+    def observe_prediction_queue_delay(self, *, delay_seconds: float) -> None:
+        PREDICTION_QUEUE_DELAY_SECONDS.observe(delay_seconds)
+
+    def set_inference_queue_depth(self, *, depth: int) -> None:
+        INFERENCE_EXECUTOR_QUEUE_DEPTH.set(depth)
+
+    def observe_inference_wait(self, *, wait_seconds: float) -> None:
+        INFERENCE_EXECUTOR_WAIT_SECONDS.observe(wait_seconds)
+
+    def record_model_version_predictions(self, *, model_version: str, count: int) -> None:
+        if count:
+            MODEL_VERSION_PREDICTIONS_TOTAL.labels(model_version=model_version).inc(count)
+
+    def set_active_model_version(self, *, model_version: str) -> None:
+        if self._active_model_version is not None and self._active_model_version != model_version:
+            MODEL_ACTIVE_VERSION.labels(model_version=self._active_model_version).set(0)
+        MODEL_ACTIVE_VERSION.labels(model_version=model_version).set(1)
+        self._active_model_version = model_version
+
+    def observe_model_reload(self, *, duration_seconds: float, result: ModelReloadResult) -> None:
+        MODEL_RELOAD_DURATION_SECONDS.labels(result=result).observe(duration_seconds)
+
+    def set_model_reload_artifact_bytes(self, *, artifact_bytes: int) -> None:
+        MODEL_RELOAD_ARTIFACT_BYTES.set(artifact_bytes)
+
+    def record_prediction_memo_event(self, *, event: MemoEvent, count: int) -> None:
+        if count:
+            PREDICTION_MEMO_EVENTS_TOTAL.labels(event=event).inc(count)
+
+    def record_cache_lookup(self, *, tier: CacheTier, keyspace: CacheKeyspace, hit: bool) -> None:
+        CACHE_LOOKUPS_TOTAL.labels(tier=tier, keyspace=keyspace, result="hit" if hit else "miss").inc()
+
+    def observe_cache_operation(
+        self,
+        *,
+        keyspace: CacheKeyspace,
+        operation: CacheOperation,
+        duration_seconds: float,
+        results: Mapping[CacheResult, int],
+    ) -> None:
+        CACHE_OPERATION_DURATION_SECONDS.labels(keyspace=keyspace, operation=operation).observe(duration_seconds)
+        for result, count in results.items():
+            if count:
+                CACHE_OPERATIONS_TOTAL.labels(keyspace=keyspace, operation=operation, result=result).inc(count)
+
+    def record_coalesced_request(self, *, scope: CoalesceScope) -> None:
+        PREDICTION_COALESCED_REQUESTS_TOTAL.labels(scope=scope).inc()
+
+    def observe_cache_prewarm(self, *, duration_seconds: float, warmed: int) -> None:
+        CACHE_PREWARM_DURATION_SECONDS.observe(duration_seconds)
+        if warmed:
+            CACHE_PREWARMED_KEYS_TOTAL.inc(warmed)
+
+    def record_negative_cache_hit(self, *, source: NegativeCacheSource) -> None:
+        NEGATIVE_CACHE_HITS_TOTAL.labels(source=source).inc()
+
+    def record_circuit_breaker_transition(self, *, name: str, state: CircuitState) -> None:
+        CIRCUIT_BREAKER_TRANSITIONS_TOTAL.labels(name=name, state=state).inc()
+        CIRCUIT_BREAKER_STATE.labels(name=name).set(_CIRCUIT_STATE_VALUES[state])
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Awaitable
+
+from app.metrics import STARTUP_DURATION_SECONDS, STARTUP_PHASE_DURATION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    def __init__(self) -> None:
+        self._started_at = time.perf_counter()
+        self._phases: dict[str, tuple[float, bool]] = {}
+
+    async def phase(self, name: str, init: Awaitable[None]) -> bool:
+        start = time.perf_counter()
+        ok = True
+        try:
+            await init
+        except Exception as e:
+            ok = False
+            logger.error("Startup phase %s failed: %s", name, e)
+        elapsed = time.perf_counter() - start
+        self._phases[name] = (elapsed, ok)
+        STARTUP_PHASE_DURATION_SECONDS.labels(phase=name).set(elapsed)
+        logger.info("Startup phase %s %s in %.3fs", name, "ready" if ok else "failed", elapsed)
+        return ok
+
+    def finish(self) -> float:
+        total = time.perf_counter() - self._started_at
+        STARTUP_DURATION_SECONDS.set(total)
+        summary = ", ".join(
+            f"{name}={elapsed:.3f}s{'' if ok else ' (failed)'}"
+            for name, (elapsed, ok) in sorted(self._phases.items(), key=lambda p: -p[1][0])
+        )
+        logger.info("Startup finished in %.3fs: %s", total, summary)
+        return total
@@ -0,0 +1,62 @@
+"""Fill ad_features for advertisements that existed before migration 007.
+
+Safe to run while the API serves traffic and to re-run: pages are upserted
+in id order and each page is its own short transaction.
+
+    python -m app.workers.ad_features_backfill
+"""
+import asyncio
+import logging
+import os
+import time
+
+from database import Database
+from repositories.ad_features import AdFeaturesRepository
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+AD_FEATURES_BACKFILL_PAGE_SIZE = int(os.getenv("AD_FEATURES_BACKFILL_PAGE_SIZE", "1000"))
+# Pause between pages so the backfill does not starve request traffic.
+AD_FEATURES_BACKFILL_PAUSE_SECONDS = float(os.getenv("AD_FEATURES_BACKFILL_PAUSE_SECONDS", "0.05"))
+
+
+async def backfill(
+    repository: AdFeaturesRepository,
+    page_size: int = AD_FEATURES_BACKFILL_PAGE_SIZE,
+    pause_seconds: float = AD_FEATURES_BACKFILL_PAUSE_SECONDS,
+) -> int:
+    start = time.perf_counter()
+    total = 0
+    last_id = 0
+    while True:
+        rows, page_last_id = await repository.backfill_page(last_id, page_size)
+        if page_last_id is None:
+            break
+        total += rows
+        last_id = page_last_id
+        logger.info("Backfilled ad_features up to id %d (%d rows)", last_id, total)
+        if pause_seconds > 0:
+            await asyncio.sleep(pause_seconds)
+    logger.info("ad_features backfill done: %d rows in %.1fs", total, time.perf_counter() - start)
+    return total
+
+
+async def run_backfill() -> None:
+    db = Database()
+    await db.initialize()
+    try:
+        await backfill(AdFeaturesRepository())
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    asyncio.run(run_backfill())
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,13 @@ import time
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from aiokafka import AIOKafkaConsumer
-from services.ml_model import build_features, get_prediction, ModelNotLoadedError
+from services.ml_model import build_features, get_inference_executor, ModelNotLoadedError
+from services.model_registry import ModelRegistry
 from repositories.advertisements import AdvertisementRepository
 from repositories.moderation_results import ModerationResultRepository
 from app.clients.kafka import KafkaProducerClient, MODERATION_TOPIC, MODERATION_DLQ_TOPIC
 from app.observability import PrometheusMetricsRecorder
-from database import Database
+from database import Database, release_session_connections
 from services.ports.metrics import get_metrics_recorder, set_metrics_recorder
 
 logging.basicConfig(
@@ -38,6 +39,10 @@ async def process_message(
         return
 
     ad_with_user = await ad_repo.get_with_user(item_id)
+    if ad_with_user is None and ad_repo.db.has_replicas:
+        # The ad may have been created moments ago on an API pod whose
+        # write this replica has not replayed yet.
+        ad_with_user = await ad_repo.get_with_user(item_id, readonly=False)
     if ad_with_user is None:
         error_msg = f"Advertisement with id {item_id} not found"
         logger.warning(error_msg)
@@ -48,22 +53,28 @@ async def process_message(
             logger.warning("set_failed failed after sending to DLQ: %s", e)
         return
 
+    # Inference and retry back-off need no database; free the connection meanwhile.
+    await release_session_connections()
     last_error = None
     recorder = get_metrics_recorder()
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             features = build_features(ad_with_user)
             start = time.perf_counter()
-            is_violation, probability = get_prediction(features)
+            is_violation, probability, model_version = await get_inference_executor().predict_one(features)
             elapsed = time.perf_counter() - start
             recorder.observe_prediction_inference(inference_seconds=elapsed)
 
             result_label = "violation" if is_violation else "no_violation"
             recorder.record_prediction_result(result=result_label)
             recorder.observe_prediction_probability(probability=probability)
+            recorder.record_model_version_predictions(model_version=model_version, count=1)
 
             await mod_repo.set_completed(task_id, is_violation, probability)
-            logger.info(f"Task {task_id} completed: is_violation={is_violation}, probability={probability}")
+            logger.info(
+                f"Task {task_id} completed: is_violation={is_violation}, probability={probability}, "
+                f"model_version={model_version}"
+            )
             return
         except ModelNotLoadedError as e:
             last_error = str(e)
@@ -91,6 +102,9 @@ async def run_worker() -> None:
     db = Database()
     await db.initialize()
 
+    model_registry = ModelRegistry()
+    model_registry.start()
+
     bootstrap = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
     consumer = AIOKafkaConsumer(
         MODERATION_TOPIC,
@@ -115,12 +129,16 @@ async def run_worker() -> None:
                 if not isinstance(value, dict):
                     logger.error("Unexpected message value type: %s", type(value))
                     continue
-                await process_message(value, ad_repo, mod_repo, kafka)
+                # One connection for the message's lookups and result writes.
+                async with db.session():
+                    await process_message(value, ad_repo, mod_repo, kafka)
             except Exception as e:
                 logger.exception("Error processing message: %s", e)
     finally:
         await consumer.stop()
         await kafka.stop()
+        await model_registry.stop()
+        get_inference_executor().shutdown()
         await db.close()
         logger.info("Moderation worker stopped")
 
@@ -0,0 +1,57 @@
+"""Compare the get_with_user read with the narrow ad_features read.
+
+Needs a database with migration 007 applied and backfilled:
+``DATABASE_URL=... python -m benchmarks.bench_ad_features``.
+
+Bytes per lookup are the DataRow payload sent by the server in binary
+format: a 7-byte message header, 4 length bytes per column and the values.
+The text columns are sized from the open ads in the database.
+"""
+import asyncio
+import time
+
+from database import Database
+from repositories import queries
+
+N = 5000
+# id, user_id (int8), category, images_qty (int4), is_verified_seller (bool)
+FULL_FIXED_BYTES = 7 + 7 * 4 + 8 + 8 + 4 + 4 + 1
+# seller_id (int8), is_verified_seller (bool), images_qty, description_len, category (int4)
+NARROW_BYTES = 7 + 5 * 4 + 8 + 1 + 4 + 4 + 4
+
+
+async def _per_call_us(conn, query, ad_ids) -> float:
+    start = time.perf_counter()
+    for ad_id in ad_ids:
+        await conn.fetchrow(query, ad_id)
+    return (time.perf_counter() - start) / len(ad_ids) * 1e6
+
+
+async def main() -> None:
+    db = Database()
+    await db.initialize()
+    try:
+        async with db.get_connection() as conn:
+            text_bytes = await conn.fetchval(
+                "SELECT avg(octet_length(name) + octet_length(description)) FROM advertisements WHERE is_closed = FALSE"
+            )
+            ad_ids = [
+                row["advertisement_id"]
+                for row in await conn.fetch("SELECT advertisement_id FROM ad_features ORDER BY random() LIMIT $1", N)
+            ]
+            if not ad_ids:
+                print("ad_features is empty; run python -m app.workers.ad_features_backfill first")
+                return
+            full_us = await _per_call_us(conn, queries.ADVERTISEMENT_GET_WITH_USER, ad_ids)
+            narrow_us = await _per_call_us(conn, queries.AD_FEATURES_GET, ad_ids)
+
+        full_bytes = FULL_FIXED_BYTES + float(text_bytes or 0)
+        print(f"get_with_user: {full_bytes:8.1f} B/lookup  {full_us:7.1f} us")
+        print(f"ad_features:   {NARROW_BYTES:8.1f} B/lookup  {narrow_us:7.1f} us")
+        print(f"saved:         {full_bytes - NARROW_BYTES:8.1f} B/lookup ({1 - NARROW_BYTES / full_bytes:.0%})")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
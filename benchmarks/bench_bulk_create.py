@@ -0,0 +1,51 @@
+"""Compare single-row AdvertisementRepository.create with bulk_create (COPY).
+
+Needs a migrated database: ``DATABASE_URL=... python -m benchmarks.bench_bulk_create``.
+The benchmark rows are deleted afterwards.
+"""
+import asyncio
+import time
+
+from database import Database
+from models.domain import AdvertisementCreate, UserCreate
+from repositories.advertisements import AdvertisementRepository
+from repositories.users import UserRepository
+
+SINGLE_ROWS = 2000
+BULK_ROWS = 100_000
+
+
+def _ads(user_id: int, n: int):
+    for i in range(n):
+        yield AdvertisementCreate(
+            user_id=user_id, name=f"bench {i}", description="bench description", category=i % 100, images_qty=i % 10
+        )
+
+
+async def main() -> None:
+    db = Database()
+    await db.initialize()
+    users, ads = UserRepository(), AdvertisementRepository()
+    user = await users.create(UserCreate(is_verified=True))
+    created: list[int] = []
+    try:
+        start = time.perf_counter()
+        for ad in _ads(user.id, SINGLE_ROWS):
+            created.append((await ads.create(ad)).id)
+        single = SINGLE_ROWS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        created.extend(await ads.bulk_create(_ads(user.id, BULK_ROWS)))
+        bulk = BULK_ROWS / (time.perf_counter() - start)
+
+        print(f"create:      {single:10.0f} rows/s")
+        print(f"bulk_create: {bulk:10.0f} rows/s  ({bulk / single:.0f}x)")
+    finally:
+        async with db.get_connection() as conn:
+            await conn.execute("DELETE FROM advertisements WHERE id = ANY($1::bigint[])", created)
+        await users.delete(user.id)
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Compare JSON and binary cache values: bytes per entry and encode/decode time.
+
+Run from the project root: ``python -m benchmarks.bench_cache_codec``.
+"""
+import time
+
+import numpy as np
+
+from storages.cache_codec import (
+    decode_moderation_result,
+    decode_prediction,
+    encode_moderation_result,
+    encode_prediction,
+)
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _report(name: str, values: list, encode, decode, repeat: int) -> None:
+    for fmt in ("json", "binary"):
+        encoded = [encode(v, fmt) for v in values]
+        size = sum(len(e) for e in encoded) / len(encoded)
+        encode_seconds = _best_of(lambda: [encode(v, fmt) for v in values], repeat)
+        decode_seconds = _best_of(lambda: [decode(e) for e in encoded], repeat)
+        n = len(values)
+        print(
+            f"{name:<18} {fmt:<6}  {size:6.1f} B/entry  "
+            f"encode: {encode_seconds / n * 1e9:7.0f} ns  decode: {decode_seconds / n * 1e9:7.0f} ns"
+        )
+
+
+def main(n: int = 100_000, repeat: int = 3) -> None:
+    rng = np.random.default_rng(0)
+    probabilities = rng.random(n).tolist()
+    predictions = [(p > 0.5, p) for p in probabilities]
+    results = [
+        {"task_id": i + 1, "status": "completed", "is_violation": p > 0.5, "probability": p}
+        for i, p in enumerate(probabilities)
+    ]
+
+    _report(
+        "prediction",
+        predictions,
+        lambda v, fmt: encode_prediction(v[0], v[1], fmt=fmt),
+        decode_prediction,
+        repeat,
+    )
+    _report("moderation_result", results, encode_moderation_result, decode_moderation_result, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare per-row ``build_features`` with the columnar ``build_features_batch``.
+
+Run from the project root: ``python -m benchmarks.bench_features``.
+"""
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from services.ml_model import build_features, build_features_batch
+
+
+def _columns(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(0, 2, n).astype(bool),
+        rng.integers(0, 25, n),
+        rng.integers(0, 3000, n),
+        rng.integers(0, 200, n),
+    )
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(n: int, repeat: int = 3) -> None:
+    verified, images, desc_len, category = _columns(n)
+    sources = [
+        SimpleNamespace(
+            is_verified_seller=bool(v),
+            images_qty=int(i),
+            description="x" * int(d),
+            category=int(c),
+        )
+        for v, i, d, c in zip(verified, images, desc_len, category)
+    ]
+
+    def per_row():
+        return np.array([build_features(s) for s in sources], dtype=np.float64)
+
+    def columnar():
+        return build_features_batch(verified, images, desc_len, category)
+
+    assert np.array_equal(per_row(), columnar())
+    row_seconds = _best_of(per_row, repeat)
+    batch_seconds = _best_of(columnar, repeat)
+    print(
+        f"N={n:>9,}  build_features: {row_seconds * 1000:9.2f} ms  "
+        f"build_features_batch: {batch_seconds * 1000:8.2f} ms  "
+        f"speedup: {row_seconds / batch_seconds:6.1f}x"
+    )
+
+
+def main() -> None:
+    for n in (10_000, 1_000_000):
+        run(n)
+
+
+if __name__ == "__main__":
+    main()
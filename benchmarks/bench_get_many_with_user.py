@@ -0,0 +1,47 @@
+"""Compare N get_with_user calls with one get_many_with_user at 1k and 100k ids.
+
+Needs a migrated database: ``DATABASE_URL=... python -m benchmarks.bench_get_many_with_user``.
+The ads are created with bulk_create and deleted afterwards.
+"""
+import asyncio
+import time
+
+from database import Database
+from models.domain import AdvertisementCreate, UserCreate
+from repositories.advertisements import AdvertisementRepository
+from repositories.users import UserRepository
+
+SIZES = (1_000, 100_000)
+
+
+async def main() -> None:
+    db = Database()
+    await db.initialize()
+    users, ads = UserRepository(), AdvertisementRepository()
+    user = await users.create(UserCreate(is_verified=True))
+    ad_ids = await ads.bulk_create(
+        AdvertisementCreate(user_id=user.id, name=f"bench {i}", description="bench", category=i % 100, images_qty=1)
+        for i in range(max(SIZES))
+    )
+    try:
+        for size in SIZES:
+            ids = ad_ids[:size]
+            start = time.perf_counter()
+            for ad_id in ids:
+                await ads.get_with_user(ad_id)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            found, _ = await ads.get_many_with_user(ids)
+            many = time.perf_counter() - start
+            assert len(found) == size
+            print(f"{size:>7} ids  get_with_user x N: {single:7.3f} s  get_many_with_user: {many:7.3f} s  ({single / many:.0f}x)")
+    finally:
+        async with db.get_connection() as conn:
+            await conn.execute("DELETE FROM advertisements WHERE id = ANY($1::bigint[])", ad_ids)
+        await users.delete(user.id)
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
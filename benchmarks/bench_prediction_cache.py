@@ -0,0 +1,103 @@
+"""Compare per-key and bulk PredictionCacheStorage calls.
+
+Run from the project root: ``python -m benchmarks.bench_prediction_cache``.
+Uses the Redis at ``REDIS_URL`` when ``BENCH_USE_REDIS=1``; otherwise an
+in-memory stand-in that charges ``BENCH_RTT_MS`` (default 0.2 ms) per
+network round-trip, which is what the bulk API saves.
+"""
+import asyncio
+import os
+import time
+
+from app.clients.redis_client import RedisClient
+from storages.prediction_cache import PredictionCacheStorage
+
+RTT_SECONDS = float(os.getenv("BENCH_RTT_MS", "0.2")) / 1000.0
+
+
+class _StandInPipeline:
+    def __init__(self, server: "StandInRedis"):
+        self._server = server
+        self._commands: list[tuple[str, int, object]] = []
+
+    def setex(self, key, ttl, value):
+        self._commands.append((key, ttl, value))
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(RTT_SECONDS)
+        for key, _, value in self._commands:
+            self._server.data[key] = value
+        return [True] * len(self._commands)
+
+
+class StandInRedis:
+    def __init__(self):
+        self.data: dict[str, object] = {}
+
+    async def get(self, key):
+        await asyncio.sleep(RTT_SECONDS)
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        await asyncio.sleep(RTT_SECONDS)
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        await asyncio.sleep(RTT_SECONDS)
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return _StandInPipeline(self)
+
+
+async def _timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run(storage: PredictionCacheStorage, n: int) -> None:
+    ids = list(range(1, n + 1))
+    predictions = {i: (i % 2 == 0, i / (n + 1)) for i in ids}
+
+    async def set_single():
+        for i, (is_violation, probability) in predictions.items():
+            await storage.set_prediction_by_ad(i, is_violation, probability)
+
+    async def get_single():
+        for i in ids:
+            await storage.get_prediction_by_ad(i)
+
+    set_one = await _timed(set_single())
+    set_bulk = await _timed(storage.set_predictions_by_ads(predictions))
+    get_one = await _timed(get_single())
+    get_bulk = await _timed(storage.get_predictions_by_ads(ids))
+    assert len(await storage.get_predictions_by_ads(ids)) == n
+    print(
+        f"keys={n:>6}  set: {set_one * 1000:9.2f} ms -> {set_bulk * 1000:8.2f} ms  "
+        f"get: {get_one * 1000:9.2f} ms -> {get_bulk * 1000:8.2f} ms"
+    )
+
+
+async def main() -> None:
+    redis_client = RedisClient()
+    if os.getenv("BENCH_USE_REDIS") == "1":
+        await redis_client.connect()
+        print(f"backend: redis at {os.getenv('REDIS_URL', 'redis://localhost:6379/0')}")
+    else:
+        redis_client._client = redis_client._raw_client = StandInRedis()
+        print(f"backend: in-memory stand-in, {RTT_SECONDS * 1000:.2f} ms per round-trip")
+    try:
+        storage = PredictionCacheStorage()
+        for n in (1, 100, 10_000):
+            await run(storage, n)
+    finally:
+        if os.getenv("BENCH_USE_REDIS") == "1":
+            await redis_client.close()
+        else:
+            redis_client._client = redis_client._raw_client = None
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
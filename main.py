@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -5,10 +6,14 @@ from fastapi import FastAPI
 
 from app.clients.kafka import KafkaProducerClient
 from app.clients.redis_client import RedisClient
-from app.observability import PrometheusMiddleware, PrometheusMetricsRecorder, metrics_router
+from app.observability import PrometheusMiddleware, PrometheusMetricsRecorder, StartupReport, metrics_router
 from routers.auth import router as auth_router
 from routers.items import router as items_router
-from services.ml_model import ModelClient
+from repositories.ad_features import AdFeaturesRepository
+from services.cache_prewarm import CachePrewarmer
+from services.open_ads_filter import get_open_ads_filter
+from services.ml_model import ModelClient, get_inference_executor
+from services.model_registry import ModelRegistry
 from services.ports.metrics import set_metrics_recorder
 from database import Database
 
@@ -23,44 +28,46 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     set_metrics_recorder(PrometheusMetricsRecorder())
 
-    logger.info("Initializing ML Client...")
-    try:
-        ModelClient()
-        logger.info("ML Client ready")
-    except Exception as e:
-        logger.error(f"Failed to initialize ML Client: {e}")
+    startup = StartupReport()
+    model_registry = ModelRegistry()
+    db = Database()
+    redis_client = RedisClient()
+    kafka = KafkaProducerClient()
 
-    logger.info("Initializing Database...")
-    try:
-        db = Database()
-        await db.initialize()
-        logger.info("Database ready")
-    except Exception as e:
-        logger.error(f"Failed to initialize Database: {e}")
+    async def init_model() -> None:
+        client = await asyncio.to_thread(ModelClient)
+        # Started either way: without an artifact the registry picks up the
+        # first one published instead of serving 503 until a restart.
+        model_registry.start()
+        if client.version is None:
+            raise RuntimeError("no model artifact found")
 
-    logger.info("Initializing Redis...")
-    redis_client = RedisClient()
-    try:
-        await redis_client.connect()
-        app.state.redis = redis_client
-        logger.info("Redis ready")
-    except Exception as e:
-        logger.error(f"Failed to connect Redis: {e}")
-        app.state.redis = None
+    logger.info("Initializing ML Client, Database, Redis and Kafka producer...")
+    _, db_ok, redis_ok, kafka_ok = await asyncio.gather(
+        startup.phase("model", init_model()),
+        startup.phase("database", db.initialize()),
+        startup.phase("redis", redis_client.connect()),
+        startup.phase("kafka", kafka.start()),
+    )
+    app.state.redis = redis_client if redis_ok else None
+    app.state.kafka = kafka if kafka_ok else None
+    startup.finish()
 
-    logger.info("Initializing Kafka producer...")
-    kafka = KafkaProducerClient()
-    try:
-        await kafka.start()
-        app.state.kafka = kafka
-        logger.info("Kafka producer ready")
-    except Exception as e:
-        logger.error(f"Failed to start Kafka producer: {e}")
-        app.state.kafka = None
+    # Runs in the background: a cold cache is refilled after startup, not before it.
+    prewarmer = CachePrewarmer()
+    open_ads_filter = get_open_ads_filter()
+    if db_ok:
+        await AdFeaturesRepository().detect()
+        prewarmer.start()
+        open_ads_filter.start()
 
     yield
 
     try:
+        await model_registry.stop()
+        await prewarmer.stop()
+        await open_ads_filter.stop()
+        get_inference_executor().shutdown()
         if getattr(app.state, "kafka", None) is not None:
             logger.info("Stopping Kafka producer...")
             await kafka.stop()
@@ -0,0 +1,7 @@
+CREATE TABLE hot_advertisements (
+    advertisement_id BIGINT PRIMARY KEY,
+    hits BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_hot_advertisements_hits ON hot_advertisements(hits DESC);
@@ -0,0 +1,49 @@
+-- Model inputs of each open advertisement, kept in step with advertisements
+-- and users by triggers. Existing ads are filled by
+-- `python -m app.workers.ad_features_backfill`.
+CREATE TABLE ad_features (
+    advertisement_id BIGINT PRIMARY KEY REFERENCES advertisements(id) ON DELETE CASCADE,
+    seller_id BIGINT NOT NULL,
+    is_verified_seller BOOLEAN NOT NULL,
+    images_qty INTEGER NOT NULL,
+    description_len INTEGER NOT NULL,
+    category INTEGER NOT NULL
+);
+
+CREATE INDEX idx_ad_features_seller_id ON ad_features(seller_id);
+
+CREATE FUNCTION ad_features_sync_advertisement() RETURNS trigger AS $$
+BEGIN
+    IF NEW.is_closed THEN
+        DELETE FROM ad_features WHERE advertisement_id = NEW.id;
+    ELSE
+        INSERT INTO ad_features (advertisement_id, seller_id, is_verified_seller, images_qty, description_len, category)
+        SELECT NEW.id, NEW.user_id, u.is_verified, NEW.images_qty, char_length(NEW.description), NEW.category
+        FROM users u
+        WHERE u.id = NEW.user_id
+        ON CONFLICT (advertisement_id) DO UPDATE SET
+            seller_id = EXCLUDED.seller_id,
+            is_verified_seller = EXCLUDED.is_verified_seller,
+            images_qty = EXCLUDED.images_qty,
+            description_len = EXCLUDED.description_len,
+            category = EXCLUDED.category;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_ad_features_advertisement
+AFTER INSERT OR UPDATE OF user_id, description, category, images_qty, is_closed ON advertisements
+FOR EACH ROW EXECUTE FUNCTION ad_features_sync_advertisement();
+
+CREATE FUNCTION ad_features_sync_seller() RETURNS trigger AS $$
+BEGIN
+    UPDATE ad_features SET is_verified_seller = NEW.is_verified WHERE seller_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_ad_features_seller
+AFTER UPDATE OF is_verified ON users
+FOR EACH ROW WHEN (OLD.is_verified IS DISTINCT FROM NEW.is_verified)
+EXECUTE FUNCTION ad_features_sync_seller();
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
 from pydantic import BaseModel
 
 
@@ -51,6 +51,15 @@ class AdvertisementWithUser(BaseModel):
     is_verified_seller: bool
 
 
+class AdFeatures(NamedTuple):
+    """One ``ad_features`` row: the model inputs of an open ad, without its text."""
+    seller_id: int
+    is_verified_seller: bool
+    images_qty: int
+    description_len: int
+    category: int
+
+
 class ModerationResult(BaseModel):
     id: int
     item_id: int
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 class Item(BaseModel):
@@ -12,3 +14,17 @@ class Item(BaseModel):
 class PredictionResponse(BaseModel):
     is_violation: bool
     probability: float
+    model_version: Optional[str] = None
+
+
+class BatchPredictionResult(BaseModel):
+    index: int
+    item_id: Optional[int] = None
+    is_violation: Optional[bool] = None
+    probability: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    results: list[BatchPredictionResult]
+    model_version: Optional[str] = None
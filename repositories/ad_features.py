@@ -0,0 +1,64 @@
+import logging
+import os
+from typing import Optional
+
+import asyncpg
+
+from database import Database
+from models.domain import AdFeatures
+from repositories import queries
+
+logger = logging.getLogger(__name__)
+
+# Read model inputs from ad_features (migration 007) instead of joining the
+# full advertisement and seller rows.
+AD_FEATURES_READ_PATH = os.getenv("AD_FEATURES_READ_PATH", "1") == "1"
+
+
+class AdFeaturesRepository:
+    # Set by detect() at startup; stays False until migration 007 is applied.
+    _table_exists = False
+
+    def __init__(self):
+        self.db = Database()
+
+    @property
+    def available(self) -> bool:
+        return AD_FEATURES_READ_PATH and self._table_exists
+
+    async def detect(self) -> bool:
+        try:
+            async with self.db.get_connection() as conn:
+                exists = bool(await conn.fetchval(queries.AD_FEATURES_TABLE_EXISTS))
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.warning("Could not check for ad_features: %s", e)
+            exists = False
+        AdFeaturesRepository._table_exists = exists
+        if not exists:
+            logger.info("ad_features table not found; predictions read full advertisement rows")
+        return exists
+
+    async def get(self, ad_id: int) -> Optional[AdFeatures]:
+        """Features of an open ad; None when the ad is unknown, closed or not backfilled yet."""
+        async with self.db.get_connection(readonly=True, key=("advertisement", ad_id)) as conn:
+            row = await conn.fetchrow(
+                queries.AD_FEATURES_GET,
+                ad_id,
+            )
+            if row is None:
+                return None
+            return AdFeatures(*row)
+
+    async def backfill_page(self, after_id: int, limit: int) -> tuple[int, Optional[int]]:
+        """Fill features for up to ``limit`` open ads with id > ``after_id``.
+
+        Returns the number of rows written and the last ad id of the page
+        (None once no ads are left).
+        """
+        async with self.db.get_connection() as conn:
+            row = await conn.fetchrow(
+                queries.AD_FEATURES_BACKFILL_PAGE,
+                after_id,
+                limit,
+            )
+            return row['rows'], row['last_id']
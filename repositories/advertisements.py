@@ -1,10 +1,13 @@
-from typing import Optional
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Sequence, Union
 import logging
-from database import Database
+from database import DB_BULK_CHUNK_SIZE, DB_LOOKUP_CHUNK_SIZE, Database, batches
 from models.domain import Advertisement, AdvertisementCreate, AdvertisementWithUser
+from repositories import queries
 
 logger = logging.getLogger(__name__)
 
+_COPY_COLUMNS = ("id", "user_id", "name", "description", "category", "images_qty")
+
 
 class AdvertisementRepository:
     
@@ -14,11 +17,7 @@ class AdvertisementRepository:
     async def create(self, ad_data: AdvertisementCreate) -> Advertisement:
         async with self.db.get_connection() as conn:
             row = await conn.fetchrow(
-                """
-                INSERT INTO advertisements (user_id, name, description, category, images_qty)
-                VALUES ($1, $2, $3, $4, $5)
-                RETURNING id, user_id, name, description, category, images_qty
-                """,
+                queries.ADVERTISEMENT_CREATE,
                 ad_data.user_id,
                 ad_data.name,
                 ad_data.description,
@@ -26,23 +25,45 @@ class AdvertisementRepository:
                 ad_data.images_qty
             )
             logger.info(f"Advertisement created: id={row['id']}, user_id={row['user_id']}")
-            return Advertisement(
-                id=row['id'],
-                user_id=row['user_id'],
-                name=row['name'],
-                description=row['description'],
-                category=row['category'],
-                images_qty=row['images_qty']
-            )
+        self.db.mark_written(("advertisement", row['id']))
+        return Advertisement(
+            id=row['id'],
+            user_id=row['user_id'],
+            name=row['name'],
+            description=row['description'],
+            category=row['category'],
+            images_qty=row['images_qty']
+        )
     
+    async def bulk_create(
+        self,
+        ads: Union[Iterable[AdvertisementCreate], AsyncIterable[AdvertisementCreate]],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> list[int]:
+        """Insert ads with COPY, ``chunk_size`` at a time; returns their ids in input order."""
+        ids: list[int] = []
+        async for chunk in batches(ads, chunk_size):
+            async with self.db.get_connection() as conn:
+                # Ids come from the sequence up front so COPY, which returns
+                # nothing, can write them and the caller gets them in order.
+                rows = await conn.fetch(queries.ADVERTISEMENT_ALLOCATE_IDS, len(chunk))
+                chunk_ids = [row['id'] for row in rows]
+                await conn.copy_records_to_table(
+                    "advertisements",
+                    records=[
+                        (ad_id, ad.user_id, ad.name, ad.description, ad.category, ad.images_qty)
+                        for ad_id, ad in zip(chunk_ids, chunk)
+                    ],
+                    columns=_COPY_COLUMNS,
+                )
+            ids.extend(chunk_ids)
+        logger.info(f"Advertisements bulk created: {len(ids)}")
+        return ids
+
     async def get_by_id(self, ad_id: int) -> Optional[Advertisement]:
-        async with self.db.get_connection() as conn:
+        async with self.db.get_connection(readonly=True, key=("advertisement", ad_id)) as conn:
             row = await conn.fetchrow(
-                """
-                SELECT id, user_id, name, description, category, images_qty
-                FROM advertisements
-                WHERE id = $1 AND is_closed = FALSE
-                """,
+                queries.ADVERTISEMENT_GET_BY_ID,
                 ad_id
             )
             if row is None:
@@ -56,56 +77,106 @@ class AdvertisementRepository:
                 images_qty=row['images_qty']
             )
     
-    async def get_with_user(self, ad_id: int) -> Optional[AdvertisementWithUser]:
-        async with self.db.get_connection() as conn:
+    async def get_with_user(self, ad_id: int, readonly: bool = True) -> Optional[AdvertisementWithUser]:
+        """``readonly=False`` reads the primary, e.g. to confirm a replica miss."""
+        async with self.db.get_connection(readonly=readonly, key=("advertisement", ad_id)) as conn:
             row = await conn.fetchrow(
-                """
-                SELECT 
-                    a.id, a.user_id, a.name, a.description, a.category, a.images_qty,
-                    u.is_verified as is_verified_seller
-                FROM advertisements a
-                JOIN users u ON a.user_id = u.id
-                WHERE a.id = $1 AND a.is_closed = FALSE
-                """,
+                queries.ADVERTISEMENT_GET_WITH_USER,
                 ad_id
             )
             if row is None:
                 return None
-            return AdvertisementWithUser(
-                id=row['id'],
-                user_id=row['user_id'],
-                name=row['name'],
-                description=row['description'],
-                category=row['category'],
-                images_qty=row['images_qty'],
-                is_verified_seller=row['is_verified_seller']
-            )
+            return self._row_to_with_user(row)
+
+    async def get_many_with_user(
+        self, ad_ids: Sequence[int], chunk_size: int = DB_LOOKUP_CHUNK_SIZE
+    ) -> tuple[dict[int, AdvertisementWithUser], list[int]]:
+        """Open ads with their sellers by id, one query per ``chunk_size`` ids.
+
+        Returns the found ads keyed by id and the ids that are missing or
+        closed, in input order.
+        """
+        unique_ids = list(dict.fromkeys(ad_ids))
+        found: dict[int, AdvertisementWithUser] = {}
+        for start in range(0, len(unique_ids), chunk_size):
+            async with self.db.get_connection(readonly=True) as conn:
+                rows = await conn.fetch(
+                    queries.ADVERTISEMENT_GET_MANY_WITH_USER,
+                    unique_ids[start:start + chunk_size],
+                )
+            for row in rows:
+                found[row['id']] = self._row_to_with_user(row)
+        missing = [ad_id for ad_id in unique_ids if ad_id not in found]
+        return found, missing
+
+    def _row_to_with_user(self, row) -> AdvertisementWithUser:
+        return AdvertisementWithUser(
+            id=row['id'],
+            user_id=row['user_id'],
+            name=row['name'],
+            description=row['description'],
+            category=row['category'],
+            images_qty=row['images_qty'],
+            is_verified_seller=row['is_verified_seller']
+        )
+
+    async def count_open(self) -> int:
+        async with self.db.get_connection(readonly=True) as conn:
+            return await conn.fetchval(queries.ADVERTISEMENT_COUNT_OPEN)
+
+    async def iter_open_ids(self, page_size: int = 10000) -> AsyncIterator[list[int]]:
+        """Yield open ad ids in ascending pages; the connection is released between pages."""
+        last_id = 0
+        while True:
+            async with self.db.get_connection(readonly=True) as conn:
+                rows = await conn.fetch(
+                    queries.ADVERTISEMENT_OPEN_IDS_PAGE,
+                    last_id,
+                    page_size,
+                )
+            if not rows:
+                return
+            ids = [row['id'] for row in rows]
+            yield ids
+            last_id = ids[-1]
 
     async def close(self, ad_id: int) -> bool:
         async with self.db.get_connection() as conn:
             result = await conn.execute(
-                """
-                UPDATE advertisements
-                SET is_closed = TRUE
-                WHERE id = $1 AND is_closed = FALSE
-                """,
+                queries.ADVERTISEMENT_CLOSE,
                 ad_id,
             )
             updated = result.split()[-1] == "1"
             if updated:
+                self.db.mark_written(("advertisement", ad_id))
                 logger.info(f"Advertisement closed: id={ad_id}")
             return updated
     
+    async def close_with_moderation_results(self, ad_id: int) -> Optional[list[int]]:
+        """Close an open ad and delete its moderation results atomically.
+
+        Returns the deleted task ids, or None when the ad is unknown or
+        already closed.
+        """
+        async with self.db.get_connection() as conn:
+            row = await conn.fetchrow(
+                queries.ADVERTISEMENT_CLOSE_WITH_RESULTS,
+                ad_id,
+            )
+            if row is None:
+                return None
+            self.db.mark_written(("advertisement", ad_id))
+            logger.info(f"Advertisement closed: id={ad_id}, moderation results deleted: {len(row['task_ids'])}")
+            return list(row['task_ids'])
+
     async def delete(self, ad_id: int) -> bool:
         async with self.db.get_connection() as conn:
             result = await conn.execute(
-                """
-                DELETE FROM advertisements
-                WHERE id = $1
-                """,
+                queries.ADVERTISEMENT_DELETE,
                 ad_id
             )
             deleted = result.split()[-1] == "1"
             if deleted:
+                self.db.mark_written(("advertisement", ad_id))
                 logger.info(f"Advertisement deleted: id={ad_id}")
             return deleted
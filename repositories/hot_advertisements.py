@@ -0,0 +1,35 @@
+from typing import Sequence
+
+from database import Database
+from repositories import queries
+
+
+class HotAdvertisementRepository:
+    def __init__(self):
+        self.db = Database()
+
+    async def save(self, entries: Sequence[tuple[int, int]], half_life_seconds: float) -> None:
+        """Merge ``(advertisement_id, hits)`` into the shared counts, decaying the stored ones."""
+        if not entries:
+            return
+        half_life_seconds = max(1.0, float(half_life_seconds))
+        async with self.db.get_connection() as conn:
+            await conn.executemany(
+                queries.HOT_ADVERTISEMENT_UPSERT,
+                [(advertisement_id, hits, half_life_seconds) for advertisement_id, hits in entries],
+            )
+
+    async def delete_stale(self, max_age_seconds: float) -> None:
+        async with self.db.get_connection() as conn:
+            await conn.execute(
+                queries.HOT_ADVERTISEMENT_DELETE_STALE,
+                float(max_age_seconds),
+            )
+
+    async def get_top(self, limit: int) -> list[tuple[int, int]]:
+        async with self.db.get_connection(readonly=True) as conn:
+            rows = await conn.fetch(
+                queries.HOT_ADVERTISEMENT_TOP,
+                limit,
+            )
+            return [(row["advertisement_id"], row["hits"]) for row in rows]
@@ -2,6 +2,7 @@ from typing import Optional
 
 from database import Database
 from models.domain import ModerationResult
+from repositories import queries
 
 
 class ModerationResultRepository:
@@ -11,23 +12,16 @@ class ModerationResultRepository:
     async def create_pending(self, item_id: int) -> ModerationResult:
         async with self.db.get_connection() as conn:
             row = await conn.fetchrow(
-                """
-                INSERT INTO moderation_results (item_id, status)
-                VALUES ($1, 'pending')
-                RETURNING id, item_id, status, is_violation, probability, error_message, created_at, processed_at
-                """,
+                queries.MODERATION_RESULT_CREATE_PENDING,
                 item_id,
             )
+            self.db.mark_written(("moderation_result", row["id"]))
             return self._row_to_model(row)
 
     async def get_by_id(self, task_id: int) -> Optional[ModerationResult]:
-        async with self.db.get_connection() as conn:
+        async with self.db.get_connection(readonly=True, key=("moderation_result", task_id)) as conn:
             row = await conn.fetchrow(
-                """
-                SELECT id, item_id, status, is_violation, probability, error_message, created_at, processed_at
-                FROM moderation_results
-                WHERE id = $1
-                """,
+                queries.MODERATION_RESULT_GET_BY_ID,
                 task_id,
             )
             if row is None:
@@ -39,32 +33,26 @@ class ModerationResultRepository:
     ) -> None:
         async with self.db.get_connection() as conn:
             await conn.execute(
-                """
-                UPDATE moderation_results
-                SET status = 'completed', is_violation = $1, probability = $2, processed_at = NOW()
-                WHERE id = $3
-                """,
+                queries.MODERATION_RESULT_SET_COMPLETED,
                 is_violation,
                 probability,
                 task_id,
             )
+        self.db.mark_written(("moderation_result", task_id))
 
     async def set_failed(self, task_id: int, error_message: str) -> None:
         async with self.db.get_connection() as conn:
             await conn.execute(
-                """
-                UPDATE moderation_results
-                SET status = 'failed', error_message = $1, processed_at = NOW()
-                WHERE id = $2
-                """,
+                queries.MODERATION_RESULT_SET_FAILED,
                 error_message,
                 task_id,
             )
+        self.db.mark_written(("moderation_result", task_id))
 
     async def get_task_ids_by_item_id(self, item_id: int) -> list[int]:
         async with self.db.get_connection() as conn:
             rows = await conn.fetch(
-                "SELECT id FROM moderation_results WHERE item_id = $1",
+                queries.MODERATION_RESULT_TASK_IDS_BY_ITEM,
                 item_id,
             )
             return [r["id"] for r in rows]
@@ -72,7 +60,7 @@ class ModerationResultRepository:
     async def delete_by_item_id(self, item_id: int) -> int:
         async with self.db.get_connection() as conn:
             result = await conn.execute(
-                "DELETE FROM moderation_results WHERE item_id = $1",
+                queries.MODERATION_RESULT_DELETE_BY_ITEM,
                 item_id,
             )
             return int(result.split()[-1]) if result else 0
@@ -0,0 +1,319 @@
+"""Named SQL used by the repositories.
+
+Every query here is prepared on each pooled connection when it opens (see
+``Database._init_connection``), so hot paths skip parse and describe round
+trips. Repositories pass these objects to the connection instead of SQL text.
+"""
+from database import register_query
+
+USER_CREATE = register_query(
+    "user_create",
+    """
+    INSERT INTO users (is_verified)
+    VALUES ($1)
+    RETURNING id, is_verified
+    """,
+)
+
+USER_ALLOCATE_IDS = register_query(
+    "user_allocate_ids",
+    """
+    SELECT nextval(pg_get_serial_sequence('users', 'id')) AS id
+    FROM generate_series(1, $1)
+    """,
+)
+
+USER_GET_BY_ID = register_query(
+    "user_get_by_id",
+    """
+    SELECT id, is_verified
+    FROM users
+    WHERE id = $1
+    """,
+)
+
+USER_DELETE = register_query(
+    "user_delete",
+    """
+    DELETE FROM users
+    WHERE id = $1
+    """,
+)
+
+ACCOUNT_CREATE = register_query(
+    "account_create",
+    """
+    INSERT INTO account (login, password, is_blocked)
+    VALUES ($1, $2, FALSE)
+    RETURNING id, login, password, is_blocked
+    """,
+)
+
+ACCOUNT_GET_BY_ID = register_query(
+    "account_get_by_id",
+    """
+    SELECT id, login, password, is_blocked
+    FROM account
+    WHERE id = $1
+    """,
+)
+
+ACCOUNT_DELETE = register_query(
+    "account_delete",
+    """
+    DELETE FROM account
+    WHERE id = $1
+    """,
+)
+
+ACCOUNT_BLOCK = register_query(
+    "account_block",
+    """
+    UPDATE account
+    SET is_blocked = TRUE
+    WHERE id = $1
+    """,
+)
+
+ACCOUNT_GET_BY_LOGIN_PASSWORD = register_query(
+    "account_get_by_login_password",
+    """
+    SELECT id, login, password, is_blocked
+    FROM account
+    WHERE login = $1 AND password = $2
+    """,
+)
+
+ADVERTISEMENT_CREATE = register_query(
+    "advertisement_create",
+    """
+    INSERT INTO advertisements (user_id, name, description, category, images_qty)
+    VALUES ($1, $2, $3, $4, $5)
+    RETURNING id, user_id, name, description, category, images_qty
+    """,
+)
+
+ADVERTISEMENT_ALLOCATE_IDS = register_query(
+    "advertisement_allocate_ids",
+    """
+    SELECT nextval(pg_get_serial_sequence('advertisements', 'id')) AS id
+    FROM generate_series(1, $1)
+    """,
+)
+
+ADVERTISEMENT_GET_BY_ID = register_query(
+    "advertisement_get_by_id",
+    """
+    SELECT id, user_id, name, description, category, images_qty
+    FROM advertisements
+    WHERE id = $1 AND is_closed = FALSE
+    """,
+)
+
+ADVERTISEMENT_GET_WITH_USER = register_query(
+    "advertisement_get_with_user",
+    """
+    SELECT
+        a.id, a.user_id, a.name, a.description, a.category, a.images_qty,
+        u.is_verified as is_verified_seller
+    FROM advertisements a
+    JOIN users u ON a.user_id = u.id
+    WHERE a.id = $1 AND a.is_closed = FALSE
+    """,
+)
+
+ADVERTISEMENT_GET_MANY_WITH_USER = register_query(
+    "advertisement_get_many_with_user",
+    """
+    SELECT
+        a.id, a.user_id, a.name, a.description, a.category, a.images_qty,
+        u.is_verified as is_verified_seller
+    FROM advertisements a
+    JOIN users u ON a.user_id = u.id
+    WHERE a.id = ANY($1::bigint[]) AND a.is_closed = FALSE
+    """,
+)
+
+ADVERTISEMENT_COUNT_OPEN = register_query(
+    "advertisement_count_open",
+    """
+    SELECT count(*) FROM advertisements WHERE is_closed = FALSE
+    """,
+)
+
+ADVERTISEMENT_OPEN_IDS_PAGE = register_query(
+    "advertisement_open_ids_page",
+    """
+    SELECT id FROM advertisements
+    WHERE is_closed = FALSE AND id > $1
+    ORDER BY id
+    LIMIT $2
+    """,
+)
+
+ADVERTISEMENT_CLOSE = register_query(
+    "advertisement_close",
+    """
+    UPDATE advertisements
+    SET is_closed = TRUE
+    WHERE id = $1 AND is_closed = FALSE
+    """,
+)
+
+# Closes the ad and drops its moderation results in one statement, so a
+# worker cannot write a result between the two; returns the deleted task ids
+# for cache invalidation. No row comes back when the ad was not open.
+ADVERTISEMENT_CLOSE_WITH_RESULTS = register_query(
+    "advertisement_close_with_results",
+    """
+    WITH closed AS (
+        UPDATE advertisements
+        SET is_closed = TRUE
+        WHERE id = $1 AND is_closed = FALSE
+        RETURNING id
+    ), deleted AS (
+        DELETE FROM moderation_results
+        WHERE item_id IN (SELECT id FROM closed)
+        RETURNING id
+    )
+    SELECT ARRAY(SELECT id FROM deleted) AS task_ids
+    FROM closed
+    """,
+)
+
+ADVERTISEMENT_DELETE = register_query(
+    "advertisement_delete",
+    """
+    DELETE FROM advertisements
+    WHERE id = $1
+    """,
+)
+
+MODERATION_RESULT_CREATE_PENDING = register_query(
+    "moderation_result_create_pending",
+    """
+    INSERT INTO moderation_results (item_id, status)
+    VALUES ($1, 'pending')
+    RETURNING id, item_id, status, is_violation, probability, error_message, created_at, processed_at
+    """,
+)
+
+MODERATION_RESULT_GET_BY_ID = register_query(
+    "moderation_result_get_by_id",
+    """
+    SELECT id, item_id, status, is_violation, probability, error_message, created_at, processed_at
+    FROM moderation_results
+    WHERE id = $1
+    """,
+)
+
+MODERATION_RESULT_SET_COMPLETED = register_query(
+    "moderation_result_set_completed",
+    """
+    UPDATE moderation_results
+    SET status = 'completed', is_violation = $1, probability = $2, processed_at = NOW()
+    WHERE id = $3
+    """,
+)
+
+MODERATION_RESULT_SET_FAILED = register_query(
+    "moderation_result_set_failed",
+    """
+    UPDATE moderation_results
+    SET status = 'failed', error_message = $1, processed_at = NOW()
+    WHERE id = $2
+    """,
+)
+
+MODERATION_RESULT_TASK_IDS_BY_ITEM = register_query(
+    "moderation_result_task_ids_by_item",
+    "SELECT id FROM moderation_results WHERE item_id = $1",
+)
+
+MODERATION_RESULT_DELETE_BY_ITEM = register_query(
+    "moderation_result_delete_by_item",
+    "DELETE FROM moderation_results WHERE item_id = $1",
+)
+
+# Every API pod upserts its own counts. The stored value decays with a
+# half-life of $3 seconds, like a pod's tracker between saves, and a save
+# only raises it, so one pod's recent traffic cannot erase another's.
+HOT_ADVERTISEMENT_UPSERT = register_query(
+    "hot_advertisement_upsert",
+    """
+    INSERT INTO hot_advertisements (advertisement_id, hits, updated_at)
+    VALUES ($1, $2, NOW())
+    ON CONFLICT (advertisement_id)
+    DO UPDATE SET
+        hits = GREATEST(
+            (
+                hot_advertisements.hits
+                * power(0.5, EXTRACT(EPOCH FROM NOW() - hot_advertisements.updated_at)::float8 / $3::float8)
+            )::bigint,
+            EXCLUDED.hits
+        ),
+        updated_at = NOW()
+    """,
+)
+
+HOT_ADVERTISEMENT_DELETE_STALE = register_query(
+    "hot_advertisement_delete_stale",
+    """
+    DELETE FROM hot_advertisements
+    WHERE updated_at < NOW() - make_interval(secs => $1)
+    """,
+)
+
+HOT_ADVERTISEMENT_TOP = register_query(
+    "hot_advertisement_top",
+    """
+    SELECT advertisement_id, hits
+    FROM hot_advertisements
+    ORDER BY hits DESC
+    LIMIT $1
+    """,
+)
+
+AD_FEATURES_TABLE_EXISTS = register_query(
+    "ad_features_table_exists",
+    "SELECT to_regclass('ad_features') IS NOT NULL",
+)
+
+AD_FEATURES_GET = register_query(
+    "ad_features_get",
+    """
+    SELECT seller_id, is_verified_seller, images_qty, description_len, category
+    FROM ad_features
+    WHERE advertisement_id = $1
+    """,
+)
+
+# FOR SHARE makes an ad closed (or a seller re-verified) while the page is
+# read wait for it, and the row is re-checked afterwards, so the backfill
+# never writes a row the triggers have just removed or changed.
+AD_FEATURES_BACKFILL_PAGE = register_query(
+    "ad_features_backfill_page",
+    """
+    WITH page AS (
+        SELECT
+            a.id, a.user_id, u.is_verified, a.images_qty,
+            char_length(a.description) AS description_len, a.category
+        FROM advertisements a
+        JOIN users u ON a.user_id = u.id
+        WHERE a.id > $1 AND a.is_closed = FALSE
+        ORDER BY a.id
+        LIMIT $2
+        FOR SHARE OF a, u
+    ), upserted AS (
+        INSERT INTO ad_features (advertisement_id, seller_id, is_verified_seller, images_qty, description_len, category)
+        SELECT id, user_id, is_verified, images_qty, description_len, category FROM page
+        ON CONFLICT (advertisement_id) DO UPDATE SET
+            seller_id = EXCLUDED.seller_id,
+            is_verified_seller = EXCLUDED.is_verified_seller,
+            images_qty = EXCLUDED.images_qty,
+            description_len = EXCLUDED.description_len,
+            category = EXCLUDED.category
+    )
+    SELECT count(*) AS rows, max(id) AS last_id FROM page
+    """,
+)
@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import AsyncIterable, Iterable, Optional, Union
 import logging
-from database import Database
+from database import DB_BULK_CHUNK_SIZE, Database, batches
 from models.domain import User, UserCreate
+from repositories import queries
 
 logger = logging.getLogger(__name__)
 
@@ -14,24 +15,36 @@ class UserRepository:
     async def create(self, user_data: UserCreate) -> User:
         async with self.db.get_connection() as conn:
             row = await conn.fetchrow(
-                """
-                INSERT INTO users (is_verified)
-                VALUES ($1)
-                RETURNING id, is_verified
-                """,
+                queries.USER_CREATE,
                 user_data.is_verified
             )
             logger.info(f"User created: id={row['id']}")
             return User(id=row['id'], is_verified=row['is_verified'])
     
+    async def bulk_create(
+        self,
+        users: Union[Iterable[UserCreate], AsyncIterable[UserCreate]],
+        chunk_size: int = DB_BULK_CHUNK_SIZE,
+    ) -> list[int]:
+        """Insert users with COPY, ``chunk_size`` at a time; returns their ids in input order."""
+        ids: list[int] = []
+        async for chunk in batches(users, chunk_size):
+            async with self.db.get_connection() as conn:
+                rows = await conn.fetch(queries.USER_ALLOCATE_IDS, len(chunk))
+                chunk_ids = [row['id'] for row in rows]
+                await conn.copy_records_to_table(
+                    "users",
+                    records=[(user_id, user.is_verified) for user_id, user in zip(chunk_ids, chunk)],
+                    columns=("id", "is_verified"),
+                )
+            ids.extend(chunk_ids)
+        logger.info(f"Users bulk created: {len(ids)}")
+        return ids
+
     async def get_by_id(self, user_id: int) -> Optional[User]:
         async with self.db.get_connection() as conn:
             row = await conn.fetchrow(
-                """
-                SELECT id, is_verified
-                FROM users
-                WHERE id = $1
-                """,
+                queries.USER_GET_BY_ID,
                 user_id
             )
             if row is None:
@@ -41,10 +54,7 @@ class UserRepository:
     async def delete(self, user_id: int) -> bool:
         async with self.db.get_connection() as conn:
             result = await conn.execute(
-                """
-                DELETE FROM users
-                WHERE id = $1
-                """,
+                queries.USER_DELETE,
                 user_id
             )
             deleted = result.split()[-1] == "1"
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel, Field
 
 from app.dependencies.auth import AUTH_COOKIE_NAME, get_current_account
+from app.dependencies.database import db_session
 from models.domain import Account
 from repositories.accounts import AccountRepository
 from services.auth import AuthService
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(db_session)])
 
 
 class LoginRequest(BaseModel):
@@ -1,25 +1,36 @@
+import os
+from typing import Any
+
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from app.dependencies.auth import get_current_account
+from app.dependencies.database import db_session
 from models.domain import Account, ModerationResult
-from models.items import Item, PredictionResponse
+from models.items import BatchPredictionResponse, BatchPredictionResult, Item, PredictionResponse
 from repositories.advertisements import AdvertisementRepository
 from repositories.moderation_results import ModerationResultRepository
 from services.items import ItemsService
 from services.ml_model import ModelNotLoadedError
+from services.ports.metrics import get_metrics_recorder
 from app.clients.kafka import KafkaProducerClient
 from storages.prediction_cache import PredictionCacheStorage
 import logging
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(db_session)])
 logger = logging.getLogger(__name__)
 
+BATCH_PREDICT_MAX_ITEMS = int(os.getenv("BATCH_PREDICT_MAX_ITEMS", "1000"))
+
 
 class SimplePredictRequest(BaseModel):
     advertisement_id: int = Field(..., gt=0)
 
 
+class BatchPredictRequest(BaseModel):
+    items: list[Any] = Field(..., min_length=1, max_length=BATCH_PREDICT_MAX_ITEMS)
+
+
 class AsyncPredictRequest(BaseModel):
     item_id: int = Field(..., gt=0)
 
@@ -39,10 +50,11 @@ async def predict(
     service: ItemsService = Depends(),
 ) -> PredictionResponse:
     try:
-        is_violation, probability = await service.predict(item)
+        is_violation, probability, model_version = await service.predict(item)
         return PredictionResponse(
             is_violation=is_violation, 
-            probability=probability
+            probability=probability,
+            model_version=model_version,
         )
     except ModelNotLoadedError:
         logger.error("Model not loaded")
@@ -58,6 +70,62 @@ async def predict(
         )
 
 
+def _validation_error_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+@router.post("/batch_predict", response_model=BatchPredictionResponse)
+async def batch_predict(
+    request: BatchPredictRequest,
+    account: Account = Depends(get_current_account),
+    service: ItemsService = Depends(),
+) -> BatchPredictionResponse:
+    results: list[BatchPredictionResult | None] = [None] * len(request.items)
+    items: list[Item] = []
+    positions: list[int] = []
+    for index, payload in enumerate(request.items):
+        try:
+            items.append(Item.model_validate(payload))
+            positions.append(index)
+        except ValidationError as e:
+            item_id = payload.get("item_id") if isinstance(payload, dict) else None
+            results[index] = BatchPredictionResult(
+                index=index,
+                item_id=item_id if isinstance(item_id, int) else None,
+                error=_validation_error_message(e),
+            )
+    get_metrics_recorder().record_prediction_errors(
+        error_type="invalid_item", count=len(request.items) - len(items)
+    )
+
+    try:
+        scored = await service.predict_batch(items)
+    except ModelNotLoadedError:
+        logger.error("Model not loaded")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model is not loaded"
+        )
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal Server Error"
+        )
+
+    for index, item, (is_violation, probability) in zip(positions, items, scored.results):
+        results[index] = BatchPredictionResult(
+            index=index,
+            item_id=item.item_id,
+            is_violation=is_violation,
+            probability=probability,
+        )
+    return BatchPredictionResponse(results=results, model_version=scored.model_version or None)
+
+
 @router.post("/simple_predict", response_model=PredictionResponse)
 async def simple_predict(
     request: SimplePredictRequest,
@@ -157,21 +225,19 @@ async def close_advertisement(
 ) -> dict:
     item_id = request.item_id
     ad_repo = AdvertisementRepository()
-    mod_repo = ModerationResultRepository()
     cache = PredictionCacheStorage()
 
-    ad = await ad_repo.get_by_id(item_id)
-    if ad is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Advertisement with id {item_id} not found",
-        )
-
-    task_ids = await mod_repo.get_task_ids_by_item_id(item_id)
-    await cache.delete_prediction_by_ad(item_id)
-    await cache.delete_moderation_results_by_task_ids(task_ids)
-
-    await mod_repo.delete_by_item_id(item_id)
-    await ad_repo.close(item_id)
+    not_found = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Advertisement with id {item_id} not found",
+    )
+    # A write is never answered from the negative cache: the marker can be
+    # stale for an ad created moments ago.
+    task_ids = await ad_repo.close_with_moderation_results(item_id)
+    if task_ids is None:
+        await cache.set_ad_missing(item_id)
+        raise not_found
+
+    await cache.invalidate_closed_ad(item_id, task_ids)
 
     return {"message": "Advertisement closed successfully"}
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Optional, Sequence
+
+from models.items import Item
+from repositories.advertisements import AdvertisementRepository
+from repositories.hot_advertisements import HotAdvertisementRepository
+from services.hot_set import HotSetTracker, get_hot_set_tracker
+from services.ml_model import build_feature_matrix, get_inference_executor
+from services.ports.metrics import get_metrics_recorder
+from storages.prediction_cache import PredictionCacheStorage
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREWARM_INTERVAL_SECONDS = float(os.getenv("CACHE_PREWARM_INTERVAL_SECONDS", "60"))
+CACHE_PREWARM_TOP_K = int(os.getenv("CACHE_PREWARM_TOP_K", "1000"))
+CACHE_PREWARM_BATCH_SIZE = int(os.getenv("CACHE_PREWARM_BATCH_SIZE", "50"))
+# Upper bound on advertisements read from Postgres per second while warming.
+CACHE_PREWARM_RATE_PER_SECOND = float(os.getenv("CACHE_PREWARM_RATE_PER_SECOND", "200"))
+HOT_SET_RETENTION_SECONDS = float(os.getenv("HOT_SET_RETENTION_SECONDS", "86400"))
+
+
+class CachePrewarmer:
+    """Persist the hot set and reload its predictions into a cold Redis.
+
+    Every interval the tracker's top ids are written to Postgres and halved,
+    and the Redis warm marker is checked. When the marker is missing (first
+    start, Redis restart or failover) the instance that re-creates it loads
+    predictions for the persisted hot set, at most
+    ``CACHE_PREWARM_RATE_PER_SECOND`` advertisements per second.
+    """
+
+    def __init__(
+        self,
+        tracker: Optional[HotSetTracker] = None,
+        interval_seconds: float = CACHE_PREWARM_INTERVAL_SECONDS,
+        top_k: int = CACHE_PREWARM_TOP_K,
+        batch_size: int = CACHE_PREWARM_BATCH_SIZE,
+        rate_per_second: float = CACHE_PREWARM_RATE_PER_SECOND,
+    ):
+        self._tracker = tracker
+        self._interval_seconds = interval_seconds
+        self._top_k = top_k
+        self._batch_size = max(1, batch_size)
+        self._rate_per_second = rate_per_second
+        self._owner = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self.cache = PredictionCacheStorage()
+        self.ad_repository = AdvertisementRepository()
+        self.hot_repository = HotAdvertisementRepository()
+
+    @property
+    def tracker(self) -> HotSetTracker:
+        if self._tracker is None:
+            self._tracker = get_hot_set_tracker()
+        return self._tracker
+
+    def start(self) -> None:
+        if self._interval_seconds <= 0 or self._top_k <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Cache prewarmer checking every %ss", self._interval_seconds)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.warning("Cache prewarm check failed: %s", e)
+            await asyncio.sleep(self._interval_seconds)
+
+    async def tick(self) -> int:
+        await self.persist_hot_set()
+        if not await self.cache.claim_warm_marker(self._owner):
+            return 0
+        logger.info("Prediction cache is cold, prewarming hot set")
+        hot = await self.hot_repository.get_top(self._top_k)
+        ids = list(dict.fromkeys([advertisement_id for advertisement_id, _ in hot] + self.tracker.top(self._top_k)))
+        return await self.prewarm(ids)
+
+    async def persist_hot_set(self) -> None:
+        snapshot = self.tracker.snapshot()
+        if not snapshot:
+            return
+        # The tracker halves its counts once per interval, which is the
+        # half-life the stored counts decay with between saves.
+        await self.hot_repository.save(snapshot, self._interval_seconds)
+        await self.hot_repository.delete_stale(HOT_SET_RETENTION_SECONDS)
+        self.tracker.decay()
+
+    async def prewarm(self, advertisement_ids: Sequence[int]) -> int:
+        start = time.perf_counter()
+        cached = await self.cache.get_predictions_by_ads(advertisement_ids)
+        missing = [advertisement_id for advertisement_id in advertisement_ids if advertisement_id not in cached]
+
+        warmed = 0
+        for offset in range(0, len(missing), self._batch_size):
+            batch_start = time.perf_counter()
+            warmed += await self._warm_batch(missing[offset:offset + self._batch_size])
+            if self._rate_per_second > 0:
+                budget = min(self._batch_size, len(missing) - offset) / self._rate_per_second
+                await asyncio.sleep(max(0.0, budget - (time.perf_counter() - batch_start)))
+
+        elapsed = time.perf_counter() - start
+        get_metrics_recorder().observe_cache_prewarm(duration_seconds=elapsed, warmed=warmed)
+        logger.info("Prewarmed %d of %d hot predictions in %.2fs", warmed, len(advertisement_ids), elapsed)
+        return warmed
+
+    async def _warm_batch(self, advertisement_ids: Sequence[int]) -> int:
+        start = time.perf_counter()
+        found, _ = await self.ad_repository.get_many_with_user(advertisement_ids)
+        ads = list(found.values())
+        if not ads:
+            return 0
+        items = [
+            Item(
+                seller_id=ad.user_id,
+                is_verified_seller=ad.is_verified_seller,
+                item_id=ad.id,
+                name=ad.name,
+                description=ad.description,
+                category=ad.category,
+                images_qty=ad.images_qty,
+            )
+            for ad in ads
+        ]
+        # Scored straight on the executor: these predictions reach no client,
+        # so they stay out of the served-prediction metrics.
+        scored = await get_inference_executor().predict(build_feature_matrix(items))
+        compute_seconds = (time.perf_counter() - start) / len(ads)
+        await self.cache.set_predictions_by_ads(
+            {ad.id: result for ad, result in zip(ads, scored.results)},
+            compute_seconds=compute_seconds,
+        )
+        return len(ads)
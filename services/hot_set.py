@@ -0,0 +1,108 @@
+import os
+from array import array
+from typing import Iterable, Optional
+
+HOT_SET_SIZE = int(os.getenv("HOT_SET_SIZE", "1000"))
+HOT_SET_SKETCH_WIDTH = int(os.getenv("HOT_SET_SKETCH_WIDTH", "4096"))
+HOT_SET_SKETCH_DEPTH = 4
+
+# Multiplicative hashing, one odd multiplier per row: ad ids are sequential
+# integers and Python's identity hash for ints would not spread them. The
+# high bits of the product are used because the low bits only depend on the
+# low bits of the id.
+_ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_MASK_64 = (1 << 64) - 1
+
+
+class HotSetTracker:
+    """Approximate top-K of the most requested advertisement ids.
+
+    A count-min sketch estimates how often each id was requested, and the
+    ``size`` ids with the highest estimates are kept as the hot set. Memory
+    is fixed regardless of how many distinct ids are seen. ``decay`` halves
+    every counter so the set follows shifts in traffic.
+    """
+
+    def __init__(
+        self,
+        size: int = HOT_SET_SIZE,
+        width: int = HOT_SET_SKETCH_WIDTH,
+        depth: int = HOT_SET_SKETCH_DEPTH,
+    ):
+        self._size = max(0, size)
+        self._width = max(1, width)
+        self._seeds = _ROW_SEEDS[:max(1, min(depth, len(_ROW_SEEDS)))]
+        self._rows = [array("q", bytes(8 * self._width)) for _ in self._seeds]
+        self._top: dict[int, int] = {}
+        self._min_key: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._size > 0
+
+    def __len__(self) -> int:
+        return len(self._top)
+
+    def _slots(self, key: int) -> list[int]:
+        return [(((key * seed) & _MASK_64) >> 32) % self._width for seed in self._seeds]
+
+    def estimate(self, key: int) -> int:
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(key)))
+
+    def record(self, key: int, count: int = 1) -> None:
+        if not self.enabled:
+            return
+        estimate = None
+        for row, slot in zip(self._rows, self._slots(key)):
+            row[slot] += count
+            estimate = row[slot] if estimate is None else min(estimate, row[slot])
+        self._offer(key, estimate)
+
+    def _offer(self, key: int, estimate: int) -> None:
+        if key in self._top:
+            self._top[key] = estimate
+            if key == self._min_key:
+                self._min_key = None
+            return
+        if len(self._top) < self._size:
+            self._top[key] = estimate
+            self._min_key = None
+            return
+        if self._min_key is None:
+            self._min_key = min(self._top, key=self._top.__getitem__)
+        if estimate > self._top[self._min_key]:
+            del self._top[self._min_key]
+            self._top[key] = estimate
+            self._min_key = None
+
+    def top(self, limit: Optional[int] = None) -> list[int]:
+        ranked = sorted(self._top, key=self._top.__getitem__, reverse=True)
+        return ranked if limit is None else ranked[:limit]
+
+    def snapshot(self) -> list[tuple[int, int]]:
+        return [(key, self._top[key]) for key in self.top()]
+
+    def load(self, entries: Iterable[tuple[int, int]]) -> None:
+        """Seed the tracker with persisted ``(id, hits)`` pairs."""
+        for key, hits in entries:
+            self.record(key, max(0, hits - self.estimate(key)))
+
+    def decay(self) -> None:
+        self._rows = [array("q", (value >> 1 for value in row)) for row in self._rows]
+        self._top = {key: hits >> 1 for key, hits in self._top.items() if hits > 1}
+        self._min_key = None
+
+
+_tracker: Optional[HotSetTracker] = None
+
+
+def get_hot_set_tracker() -> HotSetTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = HotSetTracker()
+    return _tracker
+
+
+def set_hot_set_tracker(tracker: Optional[HotSetTracker]) -> None:
+    global _tracker
+    _tracker = tracker
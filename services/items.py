@@ -1,64 +1,269 @@
+import asyncio
 import logging
+import os
 import time
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from typing import AsyncIterable, Iterable, Union
+
+from database import current_session, release_session_connections
 
 from models.items import Item
-from services.ml_model import build_features, get_prediction
+from services.ml_model import (
+    ModelClient,
+    Prediction,
+    ScoredBatch,
+    build_feature_matrix,
+    build_features,
+    feature_vector,
+    get_inference_executor,
+)
+from services.hot_set import get_hot_set_tracker
+from services.open_ads_filter import get_open_ads_filter
+from services.prediction_memo import get_prediction_memo
+from services.prediction_batcher import get_prediction_batcher
+from models.domain import AdFeatures, Advertisement, AdvertisementCreate
+from repositories.ad_features import AdFeaturesRepository
 from repositories.advertisements import AdvertisementRepository
-from storages.prediction_cache import PredictionCacheStorage
+from storages.prediction_cache import PredictionCacheStorage, should_refresh_early
 from services.ml_model import ModelNotLoadedError
 from services.ports.metrics import get_metrics_recorder
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Cross-process single-flight for /simple_predict cache misses. Off by default:
+# in-process coalescing already covers a single worker.
+PREDICT_SINGLE_FLIGHT_REDIS_LOCK = os.getenv("PREDICT_SINGLE_FLIGHT_REDIS_LOCK", "0") == "1"
+PREDICT_LOCK_TTL_MS = int(os.getenv("PREDICT_LOCK_TTL_MS", "5000"))
+PREDICT_LOCK_WAIT_MS = float(os.getenv("PREDICT_LOCK_WAIT_MS", "500"))
+PREDICT_LOCK_POLL_MS = float(os.getenv("PREDICT_LOCK_POLL_MS", "20"))
+
+
+def _not_found(advertisement_id: int) -> ValueError:
+    return ValueError(f"Advertisement with id {advertisement_id} not found")
+
+
+def _record_served_prediction(is_violation: bool, probability: float) -> None:
+    recorder = get_metrics_recorder()
+    result_label = "violation" if is_violation else "no_violation"
+    recorder.record_prediction_result(result=result_label)
+    recorder.observe_prediction_probability(probability=probability)
+
 
 class ItemsService:
+    _flights: SingleFlight = SingleFlight()
+    _refresh_tasks: set[asyncio.Task] = set()
+
     def __init__(self):
         self.ad_repository = AdvertisementRepository()
+        self.features_repository = AdFeaturesRepository()
         self.cache = PredictionCacheStorage()
     
-    async def predict(self, item: Item) -> tuple[bool, float]:
+    async def create_advertisement(self, ad_data: AdvertisementCreate) -> Advertisement:
+        advertisement = await self.ad_repository.create(ad_data)
+        # The id may have been probed before it existed and cached as missing.
+        await self.cache.delete_ad_missing(advertisement.id)
+        return advertisement
+
+    async def bulk_create_advertisements(
+        self, ads: Union[Iterable[AdvertisementCreate], AsyncIterable[AdvertisementCreate]]
+    ) -> list[int]:
+        ids = await self.ad_repository.bulk_create(ads)
+        await self.cache.delete_ads_missing(ids)
+        return ids
+
+    async def predict(self, item: Item) -> Prediction:
         logger.info(f"Predicting for seller_id={item.seller_id}, item_id={item.item_id}")
+        return await self._predict_vector(build_features(item))
 
-        features = build_features(item)
+    async def predict_features(self, advertisement_id: int, features: AdFeatures) -> Prediction:
+        logger.info(f"Predicting for seller_id={features.seller_id}, item_id={advertisement_id}")
+        return await self._predict_vector(
+            feature_vector(
+                features.is_verified_seller, features.images_qty, features.description_len, features.category
+            )
+        )
+
+    async def _predict_vector(self, features: list[float]) -> Prediction:
         logger.info(f"Features: {features}")
         
         recorder = get_metrics_recorder()
+        memo = get_prediction_memo()
+        prediction = memo.get(features, ModelClient().version)
+        if prediction is None:
+            await release_session_connections()
+            start = time.perf_counter()
+            try:
+                prediction = await get_prediction_batcher().predict(features)
+            except ModelNotLoadedError:
+                recorder.record_prediction_error(error_type="model_unavailable")
+                raise
+            except Exception:
+                recorder.record_prediction_error(error_type="prediction_error")
+                raise
+            elapsed = time.perf_counter() - start
+            recorder.observe_prediction_inference(inference_seconds=elapsed)
+            memo.set(features, prediction)
+
+        is_violation, probability, model_version = prediction
+        result_label = "violation" if is_violation else "no_violation"
+        recorder.record_prediction_result(result=result_label)
+        recorder.observe_prediction_probability(probability=probability)
+        recorder.record_model_version_predictions(model_version=model_version, count=1)
+        
+        logger.info(
+            f"Prediction result: is_violation={is_violation}, probability={probability}, model_version={model_version}"
+        )
+        
+        return prediction
+    
+    async def predict_batch(self, items: list[Item]) -> ScoredBatch:
+        if not items:
+            return ScoredBatch(model_version="", results=[])
+        logger.info(f"Batch predicting for {len(items)} items")
+
+        features = build_feature_matrix(items)
+
+        recorder = get_metrics_recorder()
+        await release_session_connections()
         start = time.perf_counter()
         try:
-            is_violation, probability = get_prediction(features)
+            scored = await get_inference_executor().predict(features)
         except ModelNotLoadedError:
-            recorder.record_prediction_error(error_type="model_unavailable")
+            recorder.record_prediction_errors(error_type="model_unavailable", count=len(items))
             raise
         except Exception:
-            recorder.record_prediction_error(error_type="prediction_error")
+            recorder.record_prediction_errors(error_type="prediction_error", count=len(items))
             raise
         elapsed = time.perf_counter() - start
         recorder.observe_prediction_inference(inference_seconds=elapsed)
 
-        result_label = "violation" if is_violation else "no_violation"
-        recorder.record_prediction_result(result=result_label)
-        recorder.observe_prediction_probability(probability=probability)
-        
-        logger.info(f"Prediction result: is_violation={is_violation}, probability={probability}")
-        
-        return is_violation, probability
-    
+        results = scored.results
+        counts = Counter("violation" if is_violation else "no_violation" for is_violation, _ in results)
+        recorder.record_prediction_results(counts=counts)
+        recorder.observe_prediction_probabilities(probabilities=[probability for _, probability in results])
+        recorder.record_model_version_predictions(model_version=scored.model_version, count=len(results))
+
+        return scored
+
     async def predict_by_id(self, advertisement_id: int) -> tuple[bool, float]:
-        cached = await self.cache.get_prediction_by_ad(advertisement_id)
-        if cached is not None:
-            is_violation, probability = cached
-            recorder = get_metrics_recorder()
-            result_label = "violation" if is_violation else "no_violation"
-            recorder.record_prediction_result(result=result_label)
-            recorder.observe_prediction_probability(probability=probability)
+        entry = await self.cache.get_prediction_entry_by_ad(advertisement_id)
+        if entry is not None:
+            get_hot_set_tracker().record(advertisement_id)
+            cached = (entry.is_violation, entry.probability)
+            _record_served_prediction(*cached)
+            if should_refresh_early(entry):
+                self._schedule_refresh(advertisement_id)
             return cached
 
+        if get_open_ads_filter().rejects(advertisement_id):
+            get_metrics_recorder().record_negative_cache_hit(source="bloom")
+            raise _not_found(advertisement_id)
+        if await self.cache.is_ad_missing(advertisement_id):
+            get_metrics_recorder().record_negative_cache_hit(source="redis")
+            raise _not_found(advertisement_id)
+
+        get_hot_set_tracker().record(advertisement_id)
+        session = current_session()
+        if session is not None and self._flights.running(advertisement_id):
+            # Joining another request's flight: nothing to query until it lands.
+            await session.release()
+
+        async def compute() -> tuple[bool, float]:
+            # The leader runs in its own task; lend it this request's session
+            # so it does not take a second connection while this one sits idle.
+            async with session.lend() if session is not None else nullcontext():
+                return await self._compute_prediction_by_id(advertisement_id)
+
+        result, shared = await self._flights.do(advertisement_id, compute)
+        if shared:
+            get_metrics_recorder().record_coalesced_request(scope="process")
+            _record_served_prediction(*result)
+        return result
+
+    def _schedule_refresh(self, advertisement_id: int) -> None:
+        key = ("refresh", advertisement_id)
+        if self._flights.running(key) or self._flights.running(advertisement_id):
+            return
+        task = asyncio.create_task(self._refresh_prediction(key, advertisement_id))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh_prediction(self, key: tuple, advertisement_id: int) -> None:
+        try:
+            await self._flights.do(key, lambda: self._refresh_once(advertisement_id))
+        except Exception as e:
+            logger.warning(f"Early refresh failed for advertisement_id={advertisement_id}: {e}")
+
+    async def _refresh_once(self, advertisement_id: int):
+        if not PREDICT_SINGLE_FLIGHT_REDIS_LOCK:
+            return await self._predict_and_cache(advertisement_id)
+        token = uuid.uuid4().hex
+        if not await self.cache.acquire_prediction_lock(advertisement_id, token, PREDICT_LOCK_TTL_MS):
+            # Another process is already refreshing or recomputing this entry.
+            return None
+        try:
+            return await self._predict_and_cache(advertisement_id)
+        finally:
+            await self.cache.release_prediction_lock(advertisement_id, token)
+
+    async def _compute_prediction_by_id(self, advertisement_id: int) -> tuple[bool, float]:
+        if not PREDICT_SINGLE_FLIGHT_REDIS_LOCK:
+            return await self._predict_and_cache(advertisement_id)
+
+        token = uuid.uuid4().hex
+        acquired = await self.cache.acquire_prediction_lock(advertisement_id, token, PREDICT_LOCK_TTL_MS)
+        if not acquired:
+            cached = await self._wait_for_cached_prediction(advertisement_id)
+            if cached is not None:
+                get_metrics_recorder().record_coalesced_request(scope="redis")
+                _record_served_prediction(*cached)
+                return cached
+            # The lock holder is slow or gone; compute rather than fail the request.
+            return await self._predict_and_cache(advertisement_id)
+        try:
+            return await self._predict_and_cache(advertisement_id)
+        finally:
+            await self.cache.release_prediction_lock(advertisement_id, token)
+
+    async def _wait_for_cached_prediction(self, advertisement_id: int):
+        await release_session_connections()
+        deadline = time.monotonic() + PREDICT_LOCK_WAIT_MS / 1000.0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(PREDICT_LOCK_POLL_MS / 1000.0)
+            cached = await self.cache.get_prediction_by_ad(advertisement_id)
+            if cached is not None:
+                return cached
+        return None
+
+    async def _predict_and_cache(self, advertisement_id: int) -> tuple[bool, float]:
         logger.info(f"Predicting for advertisement_id={advertisement_id}")
 
+        start = time.perf_counter()
+        features = None
+        if self.features_repository.available:
+            features = await self.features_repository.get(advertisement_id)
+        if features is not None:
+            is_violation, probability, _ = await self.predict_features(advertisement_id, features)
+        else:
+            # Not backfilled yet, closed or unknown: the full row tells which.
+            is_violation, probability = await self._predict_from_advertisement(advertisement_id)
+        compute_seconds = time.perf_counter() - start
+        await self.cache.set_prediction_by_ad(advertisement_id, is_violation, probability, compute_seconds)
+        return is_violation, probability
+
+    async def _predict_from_advertisement(self, advertisement_id: int) -> tuple[bool, float]:
         ad_with_user = await self.ad_repository.get_with_user(advertisement_id)
+        if ad_with_user is None and self.ad_repository.db.has_replicas:
+            # A lagging replica can miss an ad just created on another pod;
+            # only the primary may put the shared negative-cache marker.
+            ad_with_user = await self.ad_repository.get_with_user(advertisement_id, readonly=False)
 
         if ad_with_user is None:
-            raise ValueError(f"Advertisement with id {advertisement_id} not found")
+            await self.cache.set_ad_missing(advertisement_id)
+            raise _not_found(advertisement_id)
 
         item = Item(
             seller_id=ad_with_user.user_id,
@@ -70,6 +275,5 @@ class ItemsService:
             images_qty=ad_with_user.images_qty
         )
 
-        is_violation, probability = await self.predict(item)
-        await self.cache.set_prediction_by_ad(advertisement_id, is_violation, probability)
+        is_violation, probability, _ = await self.predict(item)
         return is_violation, probability
@@ -1,8 +1,31 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import os
 import pickle
+import time
 import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Protocol, Tuple
-from sklearn.linear_model import LogisticRegression
+from typing import Any, Literal, Mapping, NamedTuple, Optional, Protocol, Sequence, Tuple
+from numpy.typing import ArrayLike, DTypeLike
+
+from services.ports.metrics import get_metrics_recorder
+
+logger = logging.getLogger(__name__)
+
+ScoringMode = Literal["sklearn", "compiled"]
+InferenceExecutorKind = Literal["inline", "thread", "process"]
+
+MODEL_SCORING_MODE: ScoringMode = os.getenv("MODEL_SCORING_MODE", "sklearn")  # type: ignore[assignment]
+MODEL_INFERENCE_EXECUTOR: InferenceExecutorKind = os.getenv("MODEL_INFERENCE_EXECUTOR", "inline")  # type: ignore[assignment]
+MODEL_INFERENCE_WORKERS = int(os.getenv("MODEL_INFERENCE_WORKERS", "2"))
+MODEL_DIR = os.getenv("MODEL_DIR", ".")
+MODEL_MANIFEST = os.getenv("MODEL_MANIFEST", "model_manifest.json")
 
 
 class ModelNotLoadedError(RuntimeError):
@@ -18,13 +41,197 @@ class FeatureSource(Protocol):
 
 def build_features(source: FeatureSource) -> list[float]:
     """Build the normalized feature vector used by the moderation model."""
-    feat_verified = 1.0 if source.is_verified_seller else 0.0
-    feat_images = min(source.images_qty, 10) / 10.0
-    feat_desc_len = len(source.description) / 1000.0
-    feat_category = source.category / 100.0
+    return feature_vector(source.is_verified_seller, source.images_qty, len(source.description), source.category)
+
+
+def feature_vector(is_verified_seller: bool, images_qty: int, description_len: int, category: int) -> list[float]:
+    """``build_features`` from the raw inputs, e.g. an ``ad_features`` row."""
+    feat_verified = 1.0 if is_verified_seller else 0.0
+    feat_images = min(images_qty, 10) / 10.0
+    feat_desc_len = description_len / 1000.0
+    feat_category = category / 100.0
     return [feat_verified, feat_images, feat_desc_len, feat_category]
 
 
+def build_features_batch(
+    is_verified_seller: ArrayLike,
+    images_qty: ArrayLike,
+    description_len: ArrayLike,
+    category: ArrayLike,
+    dtype: DTypeLike = np.float64,
+) -> np.ndarray:
+    """Columnar counterpart of ``build_features`` returning an ``(N, 4)`` matrix.
+
+    Values are computed in float64, so the rows are identical to
+    ``build_features`` before the optional cast to ``dtype``.
+    """
+    verified = np.asarray(is_verified_seller)
+    images = np.asarray(images_qty)
+    desc_len = np.asarray(description_len)
+    categories = np.asarray(category)
+    count = len(verified)
+    if not (len(images) == len(desc_len) == len(categories) == count):
+        raise ValueError("Feature columns must have the same length")
+
+    matrix = np.empty((count, 4), dtype=dtype)
+    matrix[:, 0] = verified.astype(bool)
+    matrix[:, 1] = np.minimum(images, 10) / 10.0
+    matrix[:, 2] = desc_len / 1000.0
+    matrix[:, 3] = categories / 100.0
+    return matrix
+
+
+def build_features_batch_from_records(
+    records: Sequence[Mapping[str, Any]],
+    dtype: DTypeLike = np.float64,
+) -> np.ndarray:
+    """Build the feature matrix from asyncpg records (or any row mappings).
+
+    Rows may carry either the full ``description`` or a precomputed
+    ``description_len`` column.
+    """
+    if not records:
+        return np.empty((0, 4), dtype=dtype)
+    count = len(records)
+    if "description_len" in records[0].keys():
+        desc_len = np.fromiter((r["description_len"] for r in records), dtype=np.int64, count=count)
+    else:
+        desc_len = np.fromiter((len(r["description"]) for r in records), dtype=np.int64, count=count)
+    return build_features_batch(
+        np.fromiter((r["is_verified_seller"] for r in records), dtype=bool, count=count),
+        np.fromiter((r["images_qty"] for r in records), dtype=np.int64, count=count),
+        desc_len,
+        np.fromiter((r["category"] for r in records), dtype=np.int64, count=count),
+        dtype=dtype,
+    )
+
+
+def build_feature_matrix(sources: Sequence[FeatureSource]) -> np.ndarray:
+    """Build the ``(N, 4)`` feature matrix for many ``FeatureSource`` objects."""
+    count = len(sources)
+    return build_features_batch(
+        np.fromiter((s.is_verified_seller for s in sources), dtype=bool, count=count),
+        np.fromiter((s.images_qty for s in sources), dtype=np.int64, count=count),
+        np.fromiter((len(s.description) for s in sources), dtype=np.int64, count=count),
+        np.fromiter((s.category for s in sources), dtype=np.int64, count=count),
+    )
+
+
+@dataclass(frozen=True)
+class CompiledLinearModel:
+    """Weights of a binary linear classifier evaluated without sklearn.
+
+    ``is_violation`` is taken from the same decision value the probability is
+    computed from, using sklearn's rule: the positive class wins when the
+    decision is above ``threshold`` (0.0, i.e. probability 0.5).
+    """
+
+    coef: np.ndarray
+    weights: Tuple[float, ...]
+    intercept: float
+    positive_label: bool
+    negative_label: bool
+    threshold: float = 0.0
+
+    @classmethod
+    def from_estimator(cls, model) -> Optional["CompiledLinearModel"]:
+        coef = getattr(model, "coef_", None)
+        intercept = getattr(model, "intercept_", None)
+        classes = getattr(model, "classes_", None)
+        if coef is None or intercept is None or classes is None or len(classes) != 2:
+            return None
+        if getattr(model, "predict_proba", None) is None or coef.shape[0] != 1:
+            return None
+        weights = np.ascontiguousarray(coef[0], dtype=np.float64)
+        return cls(
+            coef=weights,
+            weights=tuple(weights.tolist()),
+            intercept=float(intercept[0]),
+            positive_label=bool(classes[1]),
+            negative_label=bool(classes[0]),
+        )
+
+    def score(self, features: np.ndarray) -> list[Tuple[bool, float]]:
+        decision = features @ self.coef + self.intercept
+        probabilities = 1.0 / (1.0 + np.exp(-decision))
+        return [
+            (self.positive_label if d > self.threshold else self.negative_label, float(p))
+            for d, p in zip(decision.tolist(), probabilities.tolist())
+        ]
+
+    def score_row(self, features: list[float]) -> Tuple[bool, float]:
+        decision = self.intercept
+        for weight, value in zip(self.weights, features):
+            decision += weight * value
+        if decision >= 0:
+            probability = 1.0 / (1.0 + math.exp(-decision))
+        else:
+            exp_decision = math.exp(decision)
+            probability = exp_decision / (1.0 + exp_decision)
+        label = self.positive_label if decision > self.threshold else self.negative_label
+        return label, probability
+
+
+class Prediction(NamedTuple):
+    is_violation: bool
+    probability: float
+    model_version: str
+
+
+class ScoredBatch(NamedTuple):
+    model_version: str
+    results: list[Tuple[bool, float]]
+
+
+@dataclass(frozen=True)
+class ModelArtifact:
+    version: str
+    path: Path
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """An immutable, fully loaded model version; swapped in as a whole."""
+
+    version: str
+    estimator: Any
+    compiled: Optional[CompiledLinearModel]
+    size_bytes: int
+
+
+def resolve_model_artifact() -> Optional[ModelArtifact]:
+    """Find the artifact to serve: the manifest entry, or the legacy ``model.pkl``.
+
+    The manifest is a JSON object ``{"version": "...", "path": "..."}`` with
+    ``path`` relative to ``MODEL_DIR``. Without a manifest the version of
+    ``model.pkl`` is derived from its content hash.
+    """
+    model_dir = Path(MODEL_DIR)
+    manifest_path = model_dir / MODEL_MANIFEST
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        return ModelArtifact(version=str(manifest["version"]), path=model_dir / manifest["path"])
+
+    model_path = model_dir / "model.pkl"
+    if not model_path.exists():
+        return None
+    digest = hashlib.sha256(model_path.read_bytes()).hexdigest()
+    return ModelArtifact(version=f"sha256:{digest[:12]}", path=model_path)
+
+
+def load_artifact(artifact: ModelArtifact) -> LoadedModel:
+    estimator = load_model(str(artifact.path))
+    compiled = CompiledLinearModel.from_estimator(estimator)
+    if MODEL_SCORING_MODE == "compiled" and compiled is None:
+        logger.warning("Model %s cannot be compiled, using sklearn scoring", type(estimator).__name__)
+    return LoadedModel(
+        version=artifact.version,
+        estimator=estimator,
+        compiled=compiled,
+        size_bytes=artifact.path.stat().st_size,
+    )
+
+
 class ModelClient:
     _instance = None
 
@@ -35,43 +242,206 @@ class ModelClient:
         return cls._instance
 
     def _load_model(self):
-        model_path = "model.pkl"
-        if not Path(model_path).exists():
-            self._model = train_model()
-            save_model(self._model, model_path)
-        else:
-            self._model = load_model(model_path)
+        # Serving never trains: without an artifact the client stays empty and
+        # predictions fail with ModelNotLoadedError until one is published.
+        self._scoring_mode = MODEL_SCORING_MODE
+        self._active: Optional[LoadedModel] = None
+        artifact = resolve_model_artifact()
+        if artifact is None:
+            logger.error("No model artifact found in %s", Path(MODEL_DIR).resolve())
+            return
+        self._active = load_artifact(artifact)
+        logger.info("Model loaded: version=%s", self._active.version)
 
-    def predict(self, features):
-        if self._model is None:
+    @property
+    def _model(self):
+        return self._active.estimator if self._active is not None else None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._active.version if self._active is not None else None
+
+    def snapshot(self) -> LoadedModel:
+        active = self._active
+        if active is None:
             raise ModelNotLoadedError("Model is not loaded")
-        return self._model.predict(features)
+        return active
+
+    def swap(self, loaded: LoadedModel) -> Optional[LoadedModel]:
+        previous, self._active = self._active, loaded
+        logger.info(
+            "Model swapped: %s -> %s",
+            previous.version if previous is not None else None,
+            loaded.version,
+        )
+        return previous
+
+    def ensure_version(self, version: Optional[str]) -> None:
+        if version is None or version == self.version:
+            return
+        artifact = resolve_model_artifact()
+        if artifact is not None and artifact.version == version:
+            self.swap(load_artifact(artifact))
+
+    @property
+    def scoring_mode(self) -> ScoringMode:
+        if self._scoring_mode == "compiled" and self._active is not None and self._active.compiled is not None:
+            return "compiled"
+        return "sklearn"
+
+    def predict(self, features):
+        return self.snapshot().estimator.predict(features)
 
     def predict_proba(self, features):
-        if self._model is None:
-            raise ModelNotLoadedError("Model is not loaded")
-        return self._model.predict_proba(features)
-        
-            
+        return self.snapshot().estimator.predict_proba(features)
+
+    def score_batch(self, features: np.ndarray) -> ScoredBatch:
+        # Every row of a call is scored by the snapshot taken here, so requests
+        # in flight during a swap finish on the version they started with.
+        active = self.snapshot()
+        if self._scoring_mode == "compiled" and active.compiled is not None:
+            return ScoredBatch(active.version, active.compiled.score(features))
+        predictions = active.estimator.predict(features)
+        probabilities = active.estimator.predict_proba(features)
+        return ScoredBatch(
+            active.version,
+            [
+                (bool(prediction), float(proba[1]))
+                for prediction, proba in zip(predictions, probabilities)
+            ],
+        )
+
+    def score(self, features: np.ndarray) -> list[Tuple[bool, float]]:
+        return self.score_batch(features).results
+
+    def score_row(self, features: list[float]) -> Prediction:
+        active = self.snapshot()
+        if self._scoring_mode == "compiled" and active.compiled is not None:
+            is_violation, probability = active.compiled.score_row(features)
+            return Prediction(is_violation, probability, active.version)
+        version, results = self.score_batch(np.array(features).reshape(1, -1))
+        return Prediction(results[0][0], results[0][1], version)
 
 
 def get_prediction(features: list[float]) -> Tuple[bool, float]:
-    
-    _model = ModelClient()
-    
-    np_features = np.array(features).reshape(1, -1)
-    
-    prediction = _model.predict(np_features)
-    probabilities = _model.predict_proba(np_features)
-    
-    is_violation = bool(prediction[0])
-    probability = float(probabilities[0][1])
-    
-    return is_violation, probability
+    prediction = ModelClient().score_row(features)
+    return prediction.is_violation, prediction.probability
+
+
+def get_predictions(features: np.ndarray) -> list[Tuple[bool, float]]:
+    """Score an ``(N, 4)`` feature matrix with a single model call."""
+    return ModelClient().score(features)
+
+
+def score_batch(features: np.ndarray) -> ScoredBatch:
+    return ModelClient().score_batch(features)
+
+
+def _init_inference_worker() -> None:
+    ModelClient()
 
 
+def _score_in_executor(
+    features: np.ndarray, model_version: Optional[str] = None
+) -> Tuple[float, ScoredBatch]:
+    # Wall-clock start time, so the wait can be measured across processes too.
+    started_at = time.time()
+    client = ModelClient()
+    client.ensure_version(model_version)
+    return started_at, client.score_batch(features)
+
+
+class InferenceExecutor:
+    """Run model inference inline, in a thread pool or in a process pool.
+
+    Process workers load their own ``ModelClient`` once in the pool
+    initializer; feature matrices are shipped to them by pickling.
+    """
+
+    def __init__(
+        self,
+        kind: InferenceExecutorKind = MODEL_INFERENCE_EXECUTOR,
+        max_workers: int = MODEL_INFERENCE_WORKERS,
+    ):
+        if kind not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown inference executor: {kind}")
+        self._kind = kind
+        self._max_workers = max(1, max_workers)
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+
+    @property
+    def kind(self) -> InferenceExecutorKind:
+        return self._kind
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self._kind == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="inference",
+                )
+            else:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_inference_worker,
+                )
+            logger.info("Inference executor started: %s x%d", self._kind, self._max_workers)
+        return self._pool
+
+    async def predict(self, features: np.ndarray) -> ScoredBatch:
+        if self._kind == "inline":
+            return score_batch(features)
+
+        recorder = get_metrics_recorder()
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        self._in_flight += 1
+        recorder.set_inference_queue_depth(depth=self._in_flight)
+        submitted_at = time.time()
+        model_version = ModelClient().version if self._kind == "process" else None
+        try:
+            started_at, scored = await loop.run_in_executor(
+                pool, _score_in_executor, features, model_version
+            )
+        finally:
+            self._in_flight -= 1
+            recorder.set_inference_queue_depth(depth=self._in_flight)
+        recorder.observe_inference_wait(wait_seconds=max(0.0, started_at - submitted_at))
+        return scored
+
+    async def predict_one(self, features: list[float]) -> Prediction:
+        if self._kind == "inline":
+            return ModelClient().score_row(features)
+        version, results = await self.predict(np.array(features, dtype=np.float64).reshape(1, -1))
+        return Prediction(results[0][0], results[0][1], version)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            logger.info("Inference executor stopped")
+
+
+_executor: Optional[InferenceExecutor] = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    global _executor
+    if _executor is None:
+        _executor = InferenceExecutor()
+    return _executor
+
+
+def set_inference_executor(executor: Optional[InferenceExecutor]) -> None:
+    global _executor
+    _executor = executor
+
 
 def train_model():
+    from sklearn.linear_model import LogisticRegression
+
     np.random.seed(42)
     X = np.random.rand(1000, 4)
     y = (X[:, 0] < 0.3) & (X[:, 1] < 0.2)
@@ -88,3 +458,10 @@ def save_model(model, path="model.pkl"):
 def load_model(path="model.pkl"):
     with open(path, "rb") as f:
         return pickle.load(f)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    output_path = Path(MODEL_DIR) / "model.pkl"
+    save_model(train_model(), str(output_path))
+    logger.info("Model trained and saved to %s", output_path)
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from services.ml_model import (
+    ModelArtifact,
+    ModelClient,
+    load_artifact,
+    resolve_model_artifact,
+)
+from services.ports.metrics import get_metrics_recorder
+
+logger = logging.getLogger(__name__)
+
+MODEL_RELOAD_INTERVAL_SECONDS = float(os.getenv("MODEL_RELOAD_INTERVAL_SECONDS", "30"))
+
+
+class ModelRegistry:
+    """Watch the model directory and hot-swap new artifact versions.
+
+    The new version is unpickled in a worker thread while the current one keeps
+    serving, then ``ModelClient.swap`` replaces it in a single assignment.
+    Scoring calls already in flight hold their own snapshot and finish on the
+    version they started with.
+    """
+
+    def __init__(
+        self,
+        client: Optional[ModelClient] = None,
+        interval_seconds: float = MODEL_RELOAD_INTERVAL_SECONDS,
+    ):
+        self._client = client
+        self._interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def client(self) -> ModelClient:
+        if self._client is None:
+            self._client = ModelClient()
+        return self._client
+
+    def start(self) -> None:
+        version = self.client.version
+        if version is not None:
+            get_metrics_recorder().set_active_model_version(model_version=version)
+        if self._interval_seconds <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._watch())
+        logger.info("Model registry watching for new versions every %ss", self._interval_seconds)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            try:
+                await self.check_for_update()
+            except Exception as e:
+                logger.warning("Model version check failed: %s", e)
+
+    async def check_for_update(self) -> bool:
+        artifact = await asyncio.to_thread(resolve_model_artifact)
+        if artifact is None or artifact.version == self.client.version:
+            return False
+        return await self.reload(artifact)
+
+    async def reload(self, artifact: ModelArtifact) -> bool:
+        async with self._lock:
+            if artifact.version == self.client.version:
+                return False
+            recorder = get_metrics_recorder()
+            start = time.perf_counter()
+            try:
+                loaded = await asyncio.to_thread(load_artifact, artifact)
+            except Exception as e:
+                recorder.observe_model_reload(duration_seconds=time.perf_counter() - start, result="failure")
+                logger.error("Failed to load model version %s: %s", artifact.version, e)
+                return False
+
+            previous = self.client.swap(loaded)
+            elapsed = time.perf_counter() - start
+            previous_bytes = previous.size_bytes if previous is not None else 0
+            recorder.observe_model_reload(duration_seconds=elapsed, result="success")
+            recorder.set_model_reload_artifact_bytes(artifact_bytes=previous_bytes + loaded.size_bytes)
+            recorder.set_active_model_version(model_version=loaded.version)
+            logger.info("Model version %s is live after %.3fs", loaded.version, elapsed)
+            return True
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from repositories.advertisements import AdvertisementRepository
+from storages.bloom_filter import IntBloomFilter
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_BLOOM_ENABLED = os.getenv("PREDICTION_BLOOM_ENABLED", "0") == "1"
+PREDICTION_BLOOM_FALSE_POSITIVE_RATE = float(os.getenv("PREDICTION_BLOOM_FALSE_POSITIVE_RATE", "0.01"))
+PREDICTION_BLOOM_REBUILD_SECONDS = float(os.getenv("PREDICTION_BLOOM_REBUILD_SECONDS", "300"))
+
+
+class OpenAdsFilter:
+    """Bloom filter of advertisement ids that were open at the last rebuild.
+
+    Ids are allocated in increasing order but not committed in that order:
+    a bulk insert reserves its ids before a long COPY, and a later single
+    insert can commit first. So a rebuild only judges ids up to the largest
+    one the *previous* rebuild saw, which had a whole interval to commit;
+    anything above goes to the database. The first rebuild judges nothing.
+    An ad closed since the rebuild is just a false positive that the
+    database lookup and the negative cache handle.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = PREDICTION_BLOOM_REBUILD_SECONDS,
+        false_positive_rate: float = PREDICTION_BLOOM_FALSE_POSITIVE_RATE,
+    ):
+        self._interval_seconds = interval_seconds
+        self._false_positive_rate = false_positive_rate
+        self._bloom: Optional[IntBloomFilter] = None
+        # Largest id judged by rejects, and largest id seen by the last rebuild.
+        self._max_id = 0
+        self._seen_max_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self.ad_repository = AdvertisementRepository()
+
+    @property
+    def ready(self) -> bool:
+        return self._bloom is not None
+
+    def rejects(self, advertisement_id: int) -> bool:
+        """True when the ad certainly was not open at the last rebuild."""
+        bloom = self._bloom
+        return (
+            bloom is not None
+            and advertisement_id <= self._max_id
+            and not bloom.might_contain(advertisement_id)
+        )
+
+    async def rebuild(self) -> None:
+        start = time.perf_counter()
+        count = await self.ad_repository.count_open()
+        # Headroom for ads created before the next rebuild keeps the false
+        # positive rate near the target.
+        bloom = IntBloomFilter(int(count * 1.1) + 1, self._false_positive_rate)
+        max_id = 0
+        async for ids in self.ad_repository.iter_open_ids():
+            for advertisement_id in ids:
+                bloom.add(advertisement_id)
+            max_id = max(max_id, ids[-1])
+        self._bloom, self._max_id = bloom, min(self._seen_max_id, max_id)
+        self._seen_max_id = max_id
+        logger.info(
+            "Open ads filter rebuilt: %d ids up to %d, judging ids up to %d, %d bytes in %.2fs",
+            count, max_id, self._max_id, bloom.size_bytes, time.perf_counter() - start,
+        )
+
+    def start(self) -> None:
+        if not PREDICTION_BLOOM_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.warning("Open ads filter rebuild failed: %s", e)
+            if self._interval_seconds <= 0:
+                return
+            await asyncio.sleep(self._interval_seconds)
+
+
+_filter: Optional[OpenAdsFilter] = None
+
+
+def get_open_ads_filter() -> OpenAdsFilter:
+    global _filter
+    if _filter is None:
+        _filter = OpenAdsFilter()
+    return _filter
+
+
+def set_open_ads_filter(ads_filter: Optional[OpenAdsFilter]) -> None:
+    global _filter
+    _filter = ads_filter
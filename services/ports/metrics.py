@@ -1,10 +1,21 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Literal, Protocol
+from typing import Literal, Mapping, Protocol, Sequence
 
 PredictionResult = Literal["violation", "no_violation"]
-PredictionErrorType = Literal["model_unavailable", "prediction_error"]
+PredictionErrorType = Literal["model_unavailable", "prediction_error", "invalid_item"]
+ModelReloadResult = Literal["success", "failure"]
+MemoEvent = Literal["hit", "miss", "eviction", "invalidation"]
+CacheTier = Literal["l1", "l2"]
+CacheKeyspace = Literal[
+    "prediction:ad", "prediction:missing", "prediction:lock", "prediction:warm_marker", "moderation_result"
+]
+CacheOperation = Literal["get", "mget", "set", "mset", "delete", "lock", "unlock"]
+CacheResult = Literal["hit", "miss", "ok", "error"]
+NegativeCacheSource = Literal["redis", "bloom"]
+CircuitState = Literal["closed", "open", "half_open"]
+CoalesceScope = Literal["process", "redis"]
 
 
 class MetricsRecorder(Protocol):
@@ -16,6 +27,49 @@ class MetricsRecorder(Protocol):
 
     def record_prediction_error(self, *, error_type: PredictionErrorType) -> None: ...
 
+    def record_prediction_results(self, *, counts: Mapping[PredictionResult, int]) -> None: ...
+
+    def observe_prediction_probabilities(self, *, probabilities: Sequence[float]) -> None: ...
+
+    def record_prediction_errors(self, *, error_type: PredictionErrorType, count: int) -> None: ...
+
+    def observe_prediction_batch_size(self, *, batch_size: int) -> None: ...
+
+    def observe_prediction_queue_delay(self, *, delay_seconds: float) -> None: ...
+
+    def set_inference_queue_depth(self, *, depth: int) -> None: ...
+
+    def observe_inference_wait(self, *, wait_seconds: float) -> None: ...
+
+    def record_model_version_predictions(self, *, model_version: str, count: int) -> None: ...
+
+    def set_active_model_version(self, *, model_version: str) -> None: ...
+
+    def observe_model_reload(self, *, duration_seconds: float, result: ModelReloadResult) -> None: ...
+
+    def set_model_reload_artifact_bytes(self, *, artifact_bytes: int) -> None: ...
+
+    def record_prediction_memo_event(self, *, event: MemoEvent, count: int) -> None: ...
+
+    def record_cache_lookup(self, *, tier: CacheTier, keyspace: CacheKeyspace, hit: bool) -> None: ...
+
+    def observe_cache_operation(
+        self,
+        *,
+        keyspace: CacheKeyspace,
+        operation: CacheOperation,
+        duration_seconds: float,
+        results: Mapping[CacheResult, int],
+    ) -> None: ...
+
+    def record_coalesced_request(self, *, scope: CoalesceScope) -> None: ...
+
+    def observe_cache_prewarm(self, *, duration_seconds: float, warmed: int) -> None: ...
+
+    def record_negative_cache_hit(self, *, source: NegativeCacheSource) -> None: ...
+
+    def record_circuit_breaker_transition(self, *, name: str, state: CircuitState) -> None: ...
+
 
 @dataclass(frozen=True)
 class NoopMetricsRecorder:
@@ -31,6 +85,67 @@ class NoopMetricsRecorder:
     def record_prediction_error(self, *, error_type: PredictionErrorType) -> None:
         return None
 
+    def record_prediction_results(self, *, counts: Mapping[PredictionResult, int]) -> None:
+        return None
+
+    def observe_prediction_probabilities(self, *, probabilities: Sequence[float]) -> None:
+        return None
+
+    def record_prediction_errors(self, *, error_type: PredictionErrorType, count: int) -> None:
+        return None
+
+    def observe_prediction_batch_size(self, *, batch_size: int) -> None:
+        return None
+
+    def observe_prediction_queue_delay(self, *, delay_seconds: float) -> None:
+        return None
+
+    def set_inference_queue_depth(self, *, depth: int) -> None:
+        return None
+
+    def observe_inference_wait(self, *, wait_seconds: float) -> None:
+        return None
+
+    def record_model_version_predictions(self, *, model_version: str, count: int) -> None:
+        return None
+
+    def set_active_model_version(self, *, model_version: str) -> None:
+        return None
+
+    def observe_model_reload(self, *, duration_seconds: float, result: ModelReloadResult) -> None:
+        return None
+
+    def set_model_reload_artifact_bytes(self, *, artifact_bytes: int) -> None:
+        return None
+
+    def record_prediction_memo_event(self, *, event: MemoEvent, count: int) -> None:
+        return None
+
+    def record_cache_lookup(self, *, tier: CacheTier, keyspace: CacheKeyspace, hit: bool) -> None:
+        return None
+
+    def observe_cache_operation(
+        self,
+        *,
+        keyspace: CacheKeyspace,
+        operation: CacheOperation,
+        duration_seconds: float,
+        results: Mapping[CacheResult, int],
+    ) -> None:
+        return None
+
+    def record_coalesced_request(self, *, scope: CoalesceScope) -> None:
+        return None
+
+    def observe_cache_prewarm(self, *, duration_seconds: float, warmed: int) -> None:
+        return None
+
+    def record_negative_cache_hit(self, *, source: NegativeCacheSource) -> None:
+        return None
+
+    def record_circuit_breaker_transition(self, *, name: str, state: CircuitState) -> None:
+        return None
+
 
 _recorder: MetricsRecorder = NoopMetricsRecorder()
 
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from services import ml_model
+from services.ports.metrics import get_metrics_recorder
+
+logger = logging.getLogger(__name__)
+
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+PREDICT_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "0.5"))
+
+# Weight of the latest batch in the moving average of observed batch sizes.
+_LOAD_EWMA_ALPHA = 0.2
+
+
+@dataclass
+class _PendingPrediction:
+    features: list[float]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class PredictionBatcher:
+    """Coalesce concurrent single-row predictions into one ``(N, 4)`` model call.
+
+    While traffic is idle the queue is flushed on the next loop iteration, so a
+    lone request never waits. Once concurrent requests start to show up the
+    flush is delayed by up to ``max_wait_seconds`` to let a batch fill, and it
+    is dispatched immediately when ``max_batch_size`` rows are queued.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = PREDICT_BATCH_MAX_SIZE,
+        max_wait_seconds: float = PREDICT_BATCH_MAX_WAIT_MS / 1000.0,
+    ):
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait_seconds = max(0.0, max_wait_seconds)
+        self._pending: list[_PendingPrediction] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._load = 1.0
+
+    @property
+    def max_batch_size(self) -> int:
+        return self._max_batch_size
+
+    def current_wait_seconds(self) -> float:
+        fill = min(1.0, max(0.0, self._load - 1.0))
+        return self._max_wait_seconds * fill
+
+    async def predict(self, features: list[float]) -> ml_model.Prediction:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._reset(loop)
+
+        future = loop.create_future()
+        self._pending.append(_PendingPrediction(features, future, time.perf_counter()))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            wait_seconds = self.current_wait_seconds()
+            if wait_seconds > 0:
+                self._flush_handle = loop.call_later(wait_seconds, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+        return await future
+
+    def _reset(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = None
+        self._pending = []
+        self._tasks = set()
+        self._loop = loop
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._load += _LOAD_EWMA_ALPHA * (len(batch) - self._load)
+
+        recorder = get_metrics_recorder()
+        now = time.perf_counter()
+        recorder.observe_prediction_batch_size(batch_size=len(batch))
+        for pending in batch:
+            recorder.observe_prediction_queue_delay(delay_seconds=now - pending.enqueued_at)
+
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list[_PendingPrediction]) -> None:
+        try:
+            matrix = np.array([pending.features for pending in batch], dtype=np.float64)
+            model_version, results = await ml_model.get_inference_executor().predict(matrix)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, (is_violation, probability) in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(ml_model.Prediction(is_violation, probability, model_version))
+
+
+_batcher: Optional[PredictionBatcher] = None
+
+
+def get_prediction_batcher() -> PredictionBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = PredictionBatcher()
+    return _batcher
+
+
+def set_prediction_batcher(batcher: Optional[PredictionBatcher]) -> None:
+    global _batcher
+    _batcher = batcher
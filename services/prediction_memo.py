@@ -0,0 +1,70 @@
+import os
+from typing import Optional
+
+from services.ml_model import Prediction
+from services.ports.metrics import get_metrics_recorder
+from storages.local_cache import LocalLRUCache
+
+PREDICTION_MEMO_SIZE = int(os.getenv("PREDICTION_MEMO_SIZE", "10000"))
+PREDICTION_MEMO_TTL_SECONDS = float(os.getenv("PREDICTION_MEMO_TTL_SECONDS", "300"))
+
+
+class PredictionMemo:
+    """In-process memo of model outputs keyed by the exact feature vector.
+
+    Entries belong to one model version; the whole memo is dropped as soon as
+    a lookup or store sees a different version.
+    """
+
+    def __init__(
+        self,
+        max_size: int = PREDICTION_MEMO_SIZE,
+        ttl_seconds: float = PREDICTION_MEMO_TTL_SECONDS,
+    ):
+        self._cache: LocalLRUCache[tuple[float, ...], Prediction] = LocalLRUCache(max_size, ttl_seconds)
+        self._model_version: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    def _sync_version(self, model_version: str) -> None:
+        if model_version == self._model_version:
+            return
+        if len(self._cache):
+            get_metrics_recorder().record_prediction_memo_event(event="invalidation", count=len(self._cache))
+        self._cache.clear()
+        self._model_version = model_version
+
+    def get(self, features: list[float], model_version: Optional[str]) -> Optional[Prediction]:
+        if not self.enabled or model_version is None:
+            return None
+        self._sync_version(model_version)
+        prediction = self._cache.get(tuple(features))
+        get_metrics_recorder().record_prediction_memo_event(
+            event="hit" if prediction is not None else "miss", count=1
+        )
+        return prediction
+
+    def set(self, features: list[float], prediction: Prediction) -> None:
+        if not self.enabled:
+            return
+        self._sync_version(prediction.model_version)
+        evicted = self._cache.set(tuple(features), prediction)
+        if evicted:
+            get_metrics_recorder().record_prediction_memo_event(event="eviction", count=evicted)
+
+
+_memo: Optional[PredictionMemo] = None
+
+
+def get_prediction_memo() -> PredictionMemo:
+    global _memo
+    if _memo is None:
+        _memo = PredictionMemo()
+    return _memo
+
+
+def set_prediction_memo(memo: Optional[PredictionMemo]) -> None:
+    global _memo
+    _memo = memo
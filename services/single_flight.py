@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Run at most one call per key at a time; concurrent callers share its result.
+
+    The call runs in its own task, so a caller that gets cancelled does not
+    cancel the computation the other callers are waiting for.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def running(self, key: Hashable) -> bool:
+        task = self._calls.get(key)
+        return task is not None and not task.done()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another caller ran ``fn``."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._calls = {}
+            self._loop = loop
+
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = loop.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away.
+            task.exception()
@@ -2,6 +2,7 @@ import hashlib
 from typing import Optional
 
 from database import Database
+from repositories import queries
 
 
 def _hash_password(password: str) -> str:
@@ -16,24 +17,17 @@ class AccountStorage:
         hashed = _hash_password(password)
         async with self.db.get_connection() as conn:
             row = await conn.fetchrow(
-                """
-                INSERT INTO account (login, password, is_blocked)
-                VALUES ($1, $2, FALSE)
-                RETURNING id, login, password, is_blocked
-                """,
+                queries.ACCOUNT_CREATE,
                 login,
                 hashed,
             )
+            self.db.mark_written(("account", row["id"]))
             return dict(row)
 
     async def get_by_id(self, account_id: int) -> Optional[dict]:
-        async with self.db.get_connection() as conn:
+        async with self.db.get_connection(readonly=True, key=("account", account_id)) as conn:
             row = await conn.fetchrow(
-                """
-                SELECT id, login, password, is_blocked
-                FROM account
-                WHERE id = $1
-                """,
+                queries.ACCOUNT_GET_BY_ID,
                 account_id,
             )
             return dict(row) if row else None
@@ -41,35 +35,26 @@ class AccountStorage:
     async def delete(self, account_id: int) -> bool:
         async with self.db.get_connection() as conn:
             result = await conn.execute(
-                """
-                DELETE FROM account
-                WHERE id = $1
-                """,
+                queries.ACCOUNT_DELETE,
                 account_id,
             )
+            self.db.mark_written(("account", account_id))
             return result.split()[-1] == "1"
 
     async def block(self, account_id: int) -> bool:
         async with self.db.get_connection() as conn:
             result = await conn.execute(
-                """
-                UPDATE account
-                SET is_blocked = TRUE
-                WHERE id = $1
-                """,
+                queries.ACCOUNT_BLOCK,
                 account_id,
             )
+            self.db.mark_written(("account", account_id))
             return result.split()[-1] == "1"
 
     async def get_by_login_password(self, login: str, password: str) -> Optional[dict]:
         hashed = _hash_password(password)
         async with self.db.get_connection() as conn:
             row = await conn.fetchrow(
-                """
-                SELECT id, login, password, is_blocked
-                FROM account
-                WHERE login = $1 AND password = $2
-                """,
+                queries.ACCOUNT_GET_BY_LOGIN_PASSWORD,
                 login,
                 hashed,
             )
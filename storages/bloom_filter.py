@@ -0,0 +1,39 @@
+import math
+
+_MASK_64 = (1 << 64) - 1
+_SEED_A = 0x9E3779B97F4A7C15
+_SEED_B = 0xC2B2AE3D27D4EB4F
+
+
+class IntBloomFilter:
+    """Bloom filter over non-negative integer ids.
+
+    ``might_contain`` never returns False for an added id; it returns True
+    for an id that was not added with probability close to
+    ``false_positive_rate`` once ``capacity`` ids are in.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        capacity = max(1, capacity)
+        bits = math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+        self._bits = max(8, bits)
+        self._hashes = max(1, round(self._bits / capacity * math.log(2)))
+        self._array = bytearray((self._bits + 7) // 8)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._array)
+
+    def _positions(self, value: int):
+        # Double hashing (Kirsch-Mitzenmacher): k positions from two hashes.
+        h1 = ((value * _SEED_A) & _MASK_64) >> 16
+        h2 = (((value * _SEED_B) & _MASK_64) >> 16) | 1
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._bits
+
+    def add(self, value: int) -> None:
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, value: int) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
@@ -0,0 +1,115 @@
+import json
+import struct
+from typing import NamedTuple, Optional, Union
+
+# The first byte of a binary entry is its format tag. Legacy entries are JSON
+# objects and therefore always start with "{" (0x7B), which no tag uses.
+PREDICTION_V1 = 0x01
+PREDICTION_V2 = 0x02
+MODERATION_RESULT_V1 = 0x11
+
+_PREDICTION_V1 = struct.Struct(">B?d")
+# v2 adds the recompute cost (seconds) and the absolute expiry (unix time)
+# that early refresh needs.
+_PREDICTION_V2 = struct.Struct(">B?dfd")
+_MODERATION_RESULT_V1 = struct.Struct(">BqBbd")
+
+_STATUS_CODES = {"pending": 0, "completed": 1, "failed": 2}
+_STATUS_NAMES = {code: name for name, code in _STATUS_CODES.items()}
+_JSON_PREFIX = ord("{")
+
+RawValue = Union[bytes, str]
+
+
+def _is_json(data: RawValue) -> bool:
+    if isinstance(data, str):
+        return True
+    return len(data) > 0 and data[0] == _JSON_PREFIX
+
+
+class CachedPrediction(NamedTuple):
+    is_violation: bool
+    probability: float
+    compute_seconds: float = 0.0
+    expires_at: Optional[float] = None
+
+
+def encode_prediction(
+    is_violation: bool,
+    probability: float,
+    fmt: str = "binary",
+    compute_seconds: float = 0.0,
+    expires_at: Optional[float] = None,
+) -> bytes:
+    if fmt == "json":
+        obj = {"is_violation": is_violation, "probability": probability}
+        if expires_at is not None:
+            obj["compute_seconds"] = compute_seconds
+            obj["expires_at"] = expires_at
+        return json.dumps(obj).encode("utf-8")
+    if expires_at is None:
+        return _PREDICTION_V1.pack(PREDICTION_V1, is_violation, probability)
+    return _PREDICTION_V2.pack(PREDICTION_V2, is_violation, probability, compute_seconds, expires_at)
+
+
+def decode_prediction_entry(data: RawValue) -> Optional[CachedPrediction]:
+    if _is_json(data):
+        obj = json.loads(data)
+        return CachedPrediction(
+            obj["is_violation"],
+            obj["probability"],
+            obj.get("compute_seconds", 0.0),
+            obj.get("expires_at"),
+        )
+    if data[0] == PREDICTION_V2 and len(data) == _PREDICTION_V2.size:
+        _, is_violation, probability, compute_seconds, expires_at = _PREDICTION_V2.unpack(data)
+        return CachedPrediction(is_violation, probability, compute_seconds, expires_at)
+    if data[0] == PREDICTION_V1 and len(data) == _PREDICTION_V1.size:
+        _, is_violation, probability = _PREDICTION_V1.unpack(data)
+        return CachedPrediction(is_violation, probability)
+    return None
+
+
+def decode_prediction(data: RawValue) -> Optional[tuple[bool, float]]:
+    entry = decode_prediction_entry(data)
+    if entry is None:
+        return None
+    return entry.is_violation, entry.probability
+
+
+def encode_moderation_result(result: dict, fmt: str = "binary") -> bytes:
+    status = _STATUS_CODES.get(result.get("status"))
+    task_id = result.get("task_id")
+    extra_keys = set(result) - {"task_id", "status", "is_violation", "probability", "error_message"}
+    if fmt == "json" or status is None or not isinstance(task_id, int) or extra_keys or result.get("error_message") == "":
+        return json.dumps(result).encode("utf-8")
+    is_violation = result.get("is_violation")
+    probability = result.get("probability")
+    header = _MODERATION_RESULT_V1.pack(
+        MODERATION_RESULT_V1,
+        task_id,
+        status,
+        -1 if is_violation is None else int(bool(is_violation)),
+        float("nan") if probability is None else float(probability),
+    )
+    error_message = result.get("error_message")
+    if error_message is None:
+        return header
+    return header + error_message.encode("utf-8")
+
+
+def decode_moderation_result(data: RawValue) -> Optional[dict]:
+    if _is_json(data):
+        return json.loads(data)
+    if data[0] != MODERATION_RESULT_V1 or len(data) < _MODERATION_RESULT_V1.size:
+        return None
+    _, task_id, status, is_violation, probability = _MODERATION_RESULT_V1.unpack_from(data)
+    result: dict = {
+        "task_id": task_id,
+        "status": _STATUS_NAMES.get(status, "unknown"),
+        "is_violation": None if is_violation < 0 else bool(is_violation),
+        "probability": None if probability != probability else probability,
+    }
+    if len(data) > _MODERATION_RESULT_V1.size:
+        result["error_message"] = data[_MODERATION_RESULT_V1.size:].decode("utf-8")
+    return result
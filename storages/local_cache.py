@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LocalLRUCache(Generic[K, V]):
+    """Bounded in-process LRU with a per-entry TTL.
+
+    Not thread-safe: it is meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_size = max(0, max_size)
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_size > 0 and self._ttl_seconds > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl_seconds: Optional[float] = None) -> int:
+        """Store ``value`` and return how many entries were evicted to make room."""
+        if not self.enabled:
+            return 0
+        ttl = self._ttl_seconds if ttl_seconds is None else min(ttl_seconds, self._ttl_seconds)
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return 0
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
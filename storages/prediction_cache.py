@@ -1,15 +1,149 @@
-import json
-from typing import Optional
+import math
+import os
+import random
+import time
+from typing import Iterable, Mapping, Optional, Sequence
 
 import redis.exceptions
 from app.clients.redis_client import RedisClient
+from services.ports.metrics import get_metrics_recorder
+from storages.cache_codec import (
+    CachedPrediction,
+    decode_moderation_result,
+    decode_prediction_entry,
+    encode_moderation_result,
+    encode_prediction,
+)
+from storages.local_cache import LocalLRUCache
 
 
 PREDICTION_AD_TTL = 3600
 MODERATION_RESULT_TTL = 86400
 
+# Short-lived marker for ad ids that are unknown or closed, so repeated
+# lookups of them skip the database. Kept out of L1 so that creating an ad
+# invalidates it for every process at once.
+PREDICTION_NEGATIVE_TTL_SECONDS = int(os.getenv("PREDICTION_NEGATIVE_TTL_SECONDS", "30"))
+_MISSING_VALUE = b"1"
+
+# Each write's TTL is spread by up to +/- this fraction, so keys written
+# together (bulk warm-up, traffic bursts) do not all expire in the same second.
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", "0.1"))
+
+# XFetch early-refresh aggressiveness: above 1 refreshes earlier, 0 disables it.
+PREDICTION_CACHE_XFETCH_BETA = float(os.getenv("PREDICTION_CACHE_XFETCH_BETA", "1.0"))
+
+# In-process L1 tier in front of Redis; disabled unless a size is configured.
+# Its TTL bounds how long other processes may serve an entry deleted here.
+PREDICTION_CACHE_L1_SIZE = int(os.getenv("PREDICTION_CACHE_L1_SIZE", "0"))
+PREDICTION_CACHE_L1_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_L1_TTL_SECONDS", "5"))
+
+# "binary" (compact struct encoding) or "json" (legacy, readable by old builds).
+# Reads always accept both, so the format can be switched during a rollout.
+PREDICTION_CACHE_FORMAT = os.getenv("PREDICTION_CACHE_FORMAT", "binary")
+
+# Errors meaning Redis is down or over its latency budget. Every cache method
+# swallows them and behaves as a miss or a skipped write.
+_UNAVAILABLE = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+# Keys per MGET / pipeline round-trip in the bulk methods.
+BULK_CHUNK_SIZE = 1000
+
+# Written once the cache has been warmed. Redis loses it on restart, flush or
+# failover to an empty replica, which is how a cold cache is detected.
+WARM_MARKER_KEY = "prediction:warm_marker"
+
+# Deletes the lock only if it still holds the caller's token, so an expired
+# lock that another process has since taken is never released by mistake.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _chunks(items: Sequence, size: int) -> Iterable[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def jittered_ttl(ttl_seconds: int, jitter: Optional[float] = None) -> int:
+    jitter = CACHE_TTL_JITTER if jitter is None else jitter
+    if jitter <= 0:
+        return ttl_seconds
+    spread = ttl_seconds * jitter
+    return max(1, round(ttl_seconds + random.uniform(-spread, spread)))
+
+
+def should_refresh_early(
+    entry: CachedPrediction, beta: Optional[float] = None, now: Optional[float] = None
+) -> bool:
+    """XFetch: recompute before expiry with a probability that rises as expiry nears.
+
+    ``-log(U)`` is exponentially distributed, so an entry that took
+    ``compute_seconds`` to produce is refreshed on average about
+    ``beta * compute_seconds`` before it expires, by one lucky request
+    rather than by everyone at once after it has expired.
+    """
+    beta = PREDICTION_CACHE_XFETCH_BETA if beta is None else beta
+    if entry.expires_at is None or entry.compute_seconds <= 0 or beta <= 0:
+        return False
+    now = time.time() if now is None else now
+    return now - entry.compute_seconds * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+
+def _encode_entry(entry: CachedPrediction) -> bytes:
+    return encode_prediction(
+        entry.is_violation,
+        entry.probability,
+        PREDICTION_CACHE_FORMAT,
+        compute_seconds=entry.compute_seconds,
+        expires_at=entry.expires_at,
+    )
+
+
+class _CacheCall:
+    """Time one Redis round-trip and report it when the block exits.
+
+    Reads call ``lookups`` with their hit and miss counts; any exception is
+    reported as an error for every key in the call before it propagates.
+    The outcome also feeds the Redis circuit breaker.
+    """
+
+    def __init__(self, client: RedisClient, keyspace: str, operation: str, keys: int = 1):
+        self.client = client
+        self.keyspace = keyspace
+        self.operation = operation
+        self.keys = keys
+        self.results: dict[str, int] = {"ok": keys}
+
+    def lookups(self, hits: int, misses: int) -> None:
+        self.results = {"hit": hits, "miss": misses}
+
+    def __enter__(self) -> "_CacheCall":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.client.record_success()
+        else:
+            self.results = {"error": self.keys}
+            if issubclass(exc_type, _UNAVAILABLE):
+                self.client.record_failure()
+        get_metrics_recorder().observe_cache_operation(
+            keyspace=self.keyspace,
+            operation=self.operation,
+            duration_seconds=time.perf_counter() - self._start,
+            results=self.results,
+        )
+        return False
+
 
 class PredictionCacheStorage:
+    _l1: LocalLRUCache = LocalLRUCache(PREDICTION_CACHE_L1_SIZE, PREDICTION_CACHE_L1_TTL_SECONDS)
+
     def __init__(self):
         self.redis = RedisClient()
 
@@ -19,74 +153,327 @@ class PredictionCacheStorage:
     def _moderation_key(self, task_id: int) -> str:
         return f"moderation_result:{task_id}"
 
+    def _missing_key(self, advertisement_id: int) -> str:
+        return f"prediction:missing:{advertisement_id}"
+
+    def _ad_lock_key(self, advertisement_id: int) -> str:
+        return f"prediction:lock:ad:{advertisement_id}"
+
+    def _l1_get(self, key: str, keyspace: str):
+        if not self._l1.enabled:
+            return None
+        value = self._l1.get(key)
+        get_metrics_recorder().record_cache_lookup(tier="l1", keyspace=keyspace, hit=value is not None)
+        return value
+
+    def _l1_set(self, key: str, value, ttl_seconds: int) -> None:
+        if self._l1.enabled:
+            self._l1.set(key, value, ttl_seconds=ttl_seconds)
+
+    async def _get(self, keyspace: str, key: str):
+        with _CacheCall(self.redis, keyspace, "get") as call:
+            data = await self.redis.raw_client.get(key)
+            call.lookups(int(data is not None), int(data is None))
+        get_metrics_recorder().record_cache_lookup(tier="l2", keyspace=keyspace, hit=data is not None)
+        return data
+
+    async def _mget(self, keyspace: str, keys: list[str]) -> list:
+        with _CacheCall(self.redis, keyspace, "mget", keys=len(keys)) as call:
+            values = await self.redis.raw_client.mget(keys)
+            hits = sum(value is not None for value in values)
+            call.lookups(hits, len(keys) - hits)
+        recorder = get_metrics_recorder()
+        for value in values:
+            recorder.record_cache_lookup(tier="l2", keyspace=keyspace, hit=value is not None)
+        return values
+
+    async def _setex(self, keyspace: str, key: str, ttl: int, value: bytes) -> None:
+        with _CacheCall(self.redis, keyspace, "set"):
+            await self.redis.raw_client.setex(key, ttl, value)
+
+    async def _delete(self, keyspace: str, *keys: str) -> None:
+        with _CacheCall(self.redis, keyspace, "delete", keys=len(keys)):
+            await self.redis.raw_client.delete(*keys)
+
     async def get_prediction_by_ad(self, advertisement_id: int) -> Optional[tuple[bool, float]]:
+        entry = await self.get_prediction_entry_by_ad(advertisement_id)
+        if entry is None:
+            return None
+        return entry.is_violation, entry.probability
+
+    async def get_prediction_entry_by_ad(self, advertisement_id: int) -> Optional[CachedPrediction]:
+        key = self._ad_key(advertisement_id)
+        local = self._l1_get(key, "prediction:ad")
+        if local is not None:
+            return local
         if not self.redis.is_connected():
             return None
         try:
-            key = self._ad_key(advertisement_id)
-            data = await self.redis.client.get(key)
+            data = await self._get("prediction:ad", key)
             if data is None:
                 return None
-            obj = json.loads(data)
-            return obj["is_violation"], obj["probability"]
-        except redis.exceptions.ConnectionError:
+            entry = decode_prediction_entry(data)
+            if entry is not None:
+                self._l1_set(key, entry, PREDICTION_AD_TTL)
+            return entry
+        except _UNAVAILABLE:
             return None
 
     async def set_prediction_by_ad(
-        self, advertisement_id: int, is_violation: bool, probability: float
+        self, advertisement_id: int, is_violation: bool, probability: float, compute_seconds: float = 0.0
     ) -> None:
+        key = self._ad_key(advertisement_id)
+        ttl = jittered_ttl(PREDICTION_AD_TTL)
+        entry = CachedPrediction(is_violation, probability, compute_seconds, time.time() + ttl)
+        self._l1_set(key, entry, ttl)
         if not self.redis.is_connected():
             return
         try:
-            key = self._ad_key(advertisement_id)
-            value = json.dumps({"is_violation": is_violation, "probability": probability})
-            await self.redis.client.setex(key, PREDICTION_AD_TTL, value)
-        except redis.exceptions.ConnectionError:
+            await self._setex("prediction:ad", key, ttl, _encode_entry(entry))
+        except _UNAVAILABLE:
             pass
 
+    async def get_predictions_by_ads(
+        self, advertisement_ids: Sequence[int]
+    ) -> dict[int, tuple[bool, float]]:
+        found: dict[int, tuple[bool, float]] = {}
+        missing: list[int] = []
+        for advertisement_id in dict.fromkeys(advertisement_ids):
+            local = self._l1_get(self._ad_key(advertisement_id), "prediction:ad")
+            if local is not None:
+                found[advertisement_id] = (local.is_violation, local.probability)
+            else:
+                missing.append(advertisement_id)
+        if not missing or not self.redis.is_connected():
+            return found
+        try:
+            for chunk in _chunks(missing, BULK_CHUNK_SIZE):
+                keys = [self._ad_key(advertisement_id) for advertisement_id in chunk]
+                values = await self._mget("prediction:ad", keys)
+                for advertisement_id, key, data in zip(chunk, keys, values):
+                    entry = decode_prediction_entry(data) if data is not None else None
+                    if entry is None:
+                        continue
+                    self._l1_set(key, entry, PREDICTION_AD_TTL)
+                    found[advertisement_id] = (entry.is_violation, entry.probability)
+        except _UNAVAILABLE:
+            pass
+        return found
+
+    async def set_predictions_by_ads(
+        self, predictions: Mapping[int, tuple[bool, float]], compute_seconds: float = 0.0
+    ) -> None:
+        """``compute_seconds`` is the per-entry recompute cost used for early refresh."""
+        if not predictions:
+            return
+        now = time.time()
+        entries: list[tuple[int, int, CachedPrediction]] = []
+        for advertisement_id, (is_violation, probability) in predictions.items():
+            ttl = jittered_ttl(PREDICTION_AD_TTL)
+            entry = CachedPrediction(is_violation, probability, compute_seconds, now + ttl)
+            self._l1_set(self._ad_key(advertisement_id), entry, ttl)
+            entries.append((advertisement_id, ttl, entry))
+        if not self.redis.is_connected():
+            return
+        try:
+            for chunk in _chunks(entries, BULK_CHUNK_SIZE):
+                pipe = self.redis.raw_client.pipeline(transaction=False)
+                for advertisement_id, ttl, entry in chunk:
+                    pipe.setex(self._ad_key(advertisement_id), ttl, _encode_entry(entry))
+                with _CacheCall(self.redis, "prediction:ad", "mset", keys=len(chunk)):
+                    await pipe.execute()
+        except _UNAVAILABLE:
+            pass
+
+    async def is_ad_missing(self, advertisement_id: int) -> bool:
+        if PREDICTION_NEGATIVE_TTL_SECONDS <= 0 or not self.redis.is_connected():
+            return False
+        try:
+            data = await self._get("prediction:missing", self._missing_key(advertisement_id))
+        except _UNAVAILABLE:
+            return False
+        return data is not None
+
+    async def set_ad_missing(self, advertisement_id: int) -> None:
+        if PREDICTION_NEGATIVE_TTL_SECONDS <= 0 or not self.redis.is_connected():
+            return
+        try:
+            await self._setex(
+                "prediction:missing",
+                self._missing_key(advertisement_id),
+                jittered_ttl(PREDICTION_NEGATIVE_TTL_SECONDS),
+                _MISSING_VALUE,
+            )
+        except _UNAVAILABLE:
+            pass
+
+    async def delete_ad_missing(self, advertisement_id: int) -> None:
+        if not self.redis.is_connected():
+            return
+        try:
+            await self._delete("prediction:missing", self._missing_key(advertisement_id))
+        except _UNAVAILABLE:
+            pass
+
+    async def delete_ads_missing(self, advertisement_ids: Sequence[int]) -> None:
+        if not advertisement_ids or not self.redis.is_connected():
+            return
+        try:
+            for chunk in _chunks(advertisement_ids, BULK_CHUNK_SIZE):
+                await self._delete("prediction:missing", *(self._missing_key(ad_id) for ad_id in chunk))
+        except _UNAVAILABLE:
+            pass
+
+    async def acquire_prediction_lock(self, advertisement_id: int, token: str, ttl_ms: int) -> bool:
+        """Try to become the only process computing this ad's prediction.
+
+        Returns True when Redis is unavailable: without a shared lock every
+        process computes on its own, as it would with the lock disabled.
+        """
+        if not self.redis.is_connected():
+            return True
+        try:
+            with _CacheCall(self.redis, "prediction:lock", "lock"):
+                acquired = await self.redis.raw_client.set(
+                    self._ad_lock_key(advertisement_id), token, nx=True, px=ttl_ms
+                )
+            return bool(acquired)
+        except _UNAVAILABLE:
+            return True
+
+    async def release_prediction_lock(self, advertisement_id: int, token: str) -> None:
+        if not self.redis.is_connected():
+            return
+        try:
+            with _CacheCall(self.redis, "prediction:lock", "unlock"):
+                await self.redis.raw_client.eval(
+                    _RELEASE_LOCK_SCRIPT, 1, self._ad_lock_key(advertisement_id), token
+                )
+        except _UNAVAILABLE:
+            pass
+
+    async def claim_warm_marker(self, owner: str) -> Optional[bool]:
+        """Set the warm marker if Redis lost it.
+
+        True means the cache is cold and this caller should prewarm it; False
+        means it is warm or another instance already claimed it; None means
+        Redis is unavailable.
+        """
+        if not self.redis.is_connected():
+            return None
+        try:
+            with _CacheCall(self.redis, "prediction:warm_marker", "set"):
+                return bool(await self.redis.raw_client.set(WARM_MARKER_KEY, owner, nx=True))
+        except _UNAVAILABLE:
+            return None
+
     async def delete_prediction_by_ad(self, advertisement_id: int) -> None:
+        key = self._ad_key(advertisement_id)
+        self._l1.delete(key)
         if not self.redis.is_connected():
             return
         try:
-            await self.redis.client.delete(self._ad_key(advertisement_id))
-        except redis.exceptions.ConnectionError:
+            await self._delete("prediction:ad", key)
+        except _UNAVAILABLE:
+            pass
+
+    async def invalidate_closed_ad(self, advertisement_id: int, task_ids: Sequence[int]) -> None:
+        """Drop a closed ad's prediction and moderation results and cache it as missing."""
+        ad_key = self._ad_key(advertisement_id)
+        moderation_keys = [self._moderation_key(task_id) for task_id in task_ids]
+        self._l1.delete(ad_key)
+        for key in moderation_keys:
+            self._l1.delete(key)
+        if not self.redis.is_connected():
+            return
+        pipe = self.redis.raw_client.pipeline(transaction=False)
+        pipe.delete(ad_key, *moderation_keys)
+        if PREDICTION_NEGATIVE_TTL_SECONDS > 0:
+            pipe.setex(
+                self._missing_key(advertisement_id),
+                jittered_ttl(PREDICTION_NEGATIVE_TTL_SECONDS),
+                _MISSING_VALUE,
+            )
+        try:
+            with _CacheCall(self.redis, "prediction:ad", "delete", keys=1 + len(moderation_keys)):
+                await pipe.execute()
+        except _UNAVAILABLE:
             pass
 
     async def get_moderation_result(self, task_id: int) -> Optional[dict]:
+        key = self._moderation_key(task_id)
+        local = self._l1_get(key, "moderation_result")
+        if local is not None:
+            return dict(local)
         if not self.redis.is_connected():
             return None
         try:
-            key = self._moderation_key(task_id)
-            data = await self.redis.client.get(key)
+            data = await self._get("moderation_result", key)
             if data is None:
                 return None
-            return json.loads(data)
-        except redis.exceptions.ConnectionError:
+            result = decode_moderation_result(data)
+            if result is not None:
+                self._l1_set(key, dict(result), MODERATION_RESULT_TTL)
+            return result
+        except _UNAVAILABLE:
             return None
 
+    async def get_moderation_results(self, task_ids: Sequence[int]) -> dict[int, dict]:
+        found: dict[int, dict] = {}
+        missing: list[int] = []
+        for task_id in dict.fromkeys(task_ids):
+            local = self._l1_get(self._moderation_key(task_id), "moderation_result")
+            if local is not None:
+                found[task_id] = dict(local)
+            else:
+                missing.append(task_id)
+        if not missing or not self.redis.is_connected():
+            return found
+        try:
+            for chunk in _chunks(missing, BULK_CHUNK_SIZE):
+                keys = [self._moderation_key(task_id) for task_id in chunk]
+                values = await self._mget("moderation_result", keys)
+                for task_id, key, data in zip(chunk, keys, values):
+                    result = decode_moderation_result(data) if data is not None else None
+                    if result is None:
+                        continue
+                    self._l1_set(key, dict(result), MODERATION_RESULT_TTL)
+                    found[task_id] = result
+        except _UNAVAILABLE:
+            pass
+        return found
+
     async def set_moderation_result(self, task_id: int, result: dict) -> None:
+        key = self._moderation_key(task_id)
+        ttl = jittered_ttl(MODERATION_RESULT_TTL)
+        self._l1_set(key, dict(result), ttl)
         if not self.redis.is_connected():
             return
         try:
-            key = self._moderation_key(task_id)
-            value = json.dumps(result)
-            await self.redis.client.setex(key, MODERATION_RESULT_TTL, value)
-        except redis.exceptions.ConnectionError:
+            value = encode_moderation_result(result, PREDICTION_CACHE_FORMAT)
+            await self._setex("moderation_result", key, ttl, value)
+        except _UNAVAILABLE:
             pass
 
     async def delete_moderation_result(self, task_id: int) -> None:
+        key = self._moderation_key(task_id)
+        self._l1.delete(key)
         if not self.redis.is_connected():
             return
         try:
-            await self.redis.client.delete(self._moderation_key(task_id))
-        except redis.exceptions.ConnectionError:
+            await self._delete("moderation_result", key)
+        except _UNAVAILABLE:
             pass
 
     async def delete_moderation_results_by_task_ids(self, task_ids: list[int]) -> None:
-        if not self.redis.is_connected() or not task_ids:
+        if not task_ids:
+            return
+        keys = [self._moderation_key(tid) for tid in task_ids]
+        for key in keys:
+            self._l1.delete(key)
+        if not self.redis.is_connected():
             return
         try:
-            keys = [self._moderation_key(tid) for tid in task_ids]
-            await self.redis.client.delete(*keys)
-        except redis.exceptions.ConnectionError:
+            await self._delete("moderation_result", *keys)
+        except _UNAVAILABLE:
             pass
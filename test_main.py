@@ -94,6 +94,62 @@ def test_predict_edge_cases_parametrized(client, name, description, expected_sta
     assert response.status_code == expected_status
 
 
+def _item_payload(item_id, is_verified, images_qty):
+    return {
+        "seller_id": 1,
+        "is_verified_seller": is_verified,
+        "item_id": item_id,
+        "name": "Test Item",
+        "description": "Test description",
+        "category": 1,
+        "images_qty": images_qty,
+    }
+
+
+def test_batch_predict_returns_results_in_input_order(client):
+    payload = {"items": [
+        _item_payload(1, True, 5),
+        _item_payload(2, False, 1),
+        _item_payload(3, True, 10),
+    ]}
+    response = client.post("/batch_predict", json=payload)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [r["item_id"] for r in results] == [1, 2, 3]
+    assert [r["is_violation"] for r in results] == [False, True, False]
+    assert all(r["error"] is None for r in results)
+
+    single = client.post("/predict", json=_item_payload(2, False, 1)).json()
+    assert results[1]["probability"] == pytest.approx(single["probability"])
+    assert single["model_version"]
+    assert response.json()["model_version"] == single["model_version"]
+
+
+def test_batch_predict_reports_invalid_items_without_failing_batch(client):
+    invalid = _item_payload(2, False, 1)
+    del invalid["category"]
+    payload = {"items": [_item_payload(1, True, 5), invalid, "not an item"]}
+
+    response = client.post("/batch_predict", json=payload)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["is_violation"] is False
+    assert results[0]["error"] is None
+    assert results[1]["item_id"] == 2
+    assert results[1]["is_violation"] is None
+    assert "category" in results[1]["error"]
+    assert results[2]["item_id"] is None
+    assert results[2]["error"]
+
+
+@pytest.mark.parametrize("count", [0, 1001])
+def test_batch_predict_rejects_empty_or_oversized_batches(client, count):
+    payload = {"items": [_item_payload(i, True, 5) for i in range(count)]}
+    response = client.post("/batch_predict", json=payload)
+    assert response.status_code == 422
+
+
 def test_create_user_in_db(monkeypatch):
     mock_user = User(id=1, is_verified=True)
     
@@ -483,10 +539,10 @@ def test_moderation_result_failed_includes_error(client, monkeypatch):
 
 
 def test_close_advertisement_not_found(client, monkeypatch):
-    async def mock_get_by_id(self, ad_id):
+    async def mock_close(self, ad_id):
         return None
 
-    monkeypatch.setattr(AdvertisementRepository, "get_by_id", mock_get_by_id)
+    monkeypatch.setattr(AdvertisementRepository, "close_with_moderation_results", mock_close)
 
     response = client.post("/close", json={"item_id": 99999})
     assert response.status_code == 404
@@ -496,37 +552,31 @@ def test_close_advertisement_not_found(client, monkeypatch):
 def test_close_advertisement_success(client, monkeypatch):
     from storages.prediction_cache import PredictionCacheStorage
 
-    mock_ad = Advertisement(
-        id=1,
-        user_id=1,
-        name="Test",
-        description="Desc",
-        category=1,
-        images_qty=5,
-    )
+    async def mock_close(self, ad_id):
+        return [10, 11] if ad_id == 1 else None
 
-    async def mock_get_by_id(self, ad_id):
-        return mock_ad if ad_id == 1 else None
+    invalidate = AsyncMock()
+    monkeypatch.setattr(AdvertisementRepository, "close_with_moderation_results", mock_close)
+    monkeypatch.setattr(PredictionCacheStorage, "invalidate_closed_ad", invalidate)
+
+    response = client.post("/close", json={"item_id": 1})
+    assert response.status_code == 200
+    assert "closed" in response.json()["message"].lower()
+    invalidate.assert_awaited_once_with(1, [10, 11])
 
-    async def mock_get_task_ids(self, item_id):
-        return [10, 11]
 
-    async def mock_delete_by_item_id(self, item_id):
-        pass
+def test_close_advertisement_ignores_negative_cache(client, monkeypatch):
+    from storages.prediction_cache import PredictionCacheStorage
 
-    async def mock_close_ad(self, ad_id):
-        return True
+    async def mock_close(self, ad_id):
+        return []
 
-    monkeypatch.setattr(AdvertisementRepository, "get_by_id", mock_get_by_id)
-    monkeypatch.setattr(ModerationResultRepository, "get_task_ids_by_item_id", mock_get_task_ids)
-    monkeypatch.setattr(ModerationResultRepository, "delete_by_item_id", mock_delete_by_item_id)
-    monkeypatch.setattr(AdvertisementRepository, "close", mock_close_ad)
-    monkeypatch.setattr(PredictionCacheStorage, "delete_prediction_by_ad", AsyncMock())
-    monkeypatch.setattr(PredictionCacheStorage, "delete_moderation_results_by_task_ids", AsyncMock())
+    monkeypatch.setattr(PredictionCacheStorage, "is_ad_missing", AsyncMock(return_value=True))
+    monkeypatch.setattr(PredictionCacheStorage, "invalidate_closed_ad", AsyncMock())
+    monkeypatch.setattr(AdvertisementRepository, "close_with_moderation_results", mock_close)
 
     response = client.post("/close", json={"item_id": 1})
     assert response.status_code == 200
-    assert "closed" in response.json()["message"].lower()
 
 
 @pytest.mark.asyncio
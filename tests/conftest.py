@@ -12,3 +12,13 @@ async def redis_client():
         await client.close()
         RedisClient._instance = None
         RedisClient._client = None
+        RedisClient._raw_client = None
+
+
+@pytest.fixture(autouse=True)
+def reset_redis_breaker():
+    yield
+    if RedisClient._probe_task is not None:
+        RedisClient._probe_task.cancel()
+        RedisClient._probe_task = None
+    RedisClient._breaker.reset()
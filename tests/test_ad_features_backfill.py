@@ -0,0 +1,15 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.workers.ad_features_backfill import backfill
+
+
+@pytest.mark.asyncio
+async def test_backfill_pages_by_last_id_until_exhausted():
+    repository = MagicMock()
+    repository.backfill_page = AsyncMock(side_effect=[(2, 10), (1, 15), (0, None)])
+
+    assert await backfill(repository, page_size=2, pause_seconds=0) == 3
+
+    assert [call.args for call in repository.backfill_page.await_args_list] == [(0, 2), (10, 2), (15, 2)]
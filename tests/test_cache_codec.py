@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from storages.cache_codec import (
+    CachedPrediction,
+    decode_moderation_result,
+    decode_prediction,
+    decode_prediction_entry,
+    encode_moderation_result,
+    encode_prediction,
+)
+
+
+@pytest.mark.parametrize("is_violation,probability", [(True, 0.8312345678901234), (False, 0.0), (False, 1.0)])
+def test_prediction_round_trip(is_violation, probability):
+    data = encode_prediction(is_violation, probability)
+
+    assert len(data) == 10
+    assert decode_prediction(data) == (is_violation, probability)
+
+
+def test_prediction_with_expiry_round_trips_refresh_metadata():
+    data = encode_prediction(True, 0.7, compute_seconds=0.25, expires_at=1_700_000_000.5)
+
+    assert decode_prediction_entry(data) == CachedPrediction(True, 0.7, 0.25, 1_700_000_000.5)
+    assert decode_prediction(data) == (True, 0.7)
+
+    legacy = encode_prediction(True, 0.7, fmt="json", compute_seconds=0.25, expires_at=1_700_000_000.5)
+    assert decode_prediction_entry(legacy) == CachedPrediction(True, 0.7, 0.25, 1_700_000_000.5)
+
+
+@pytest.mark.parametrize("data", [
+    '{"is_violation": true, "probability": 0.83}',
+    b'{"is_violation": true, "probability": 0.83}',
+])
+def test_prediction_reads_legacy_json(data):
+    assert decode_prediction(data) == (True, 0.83)
+
+
+def test_prediction_json_format_is_legacy_compatible():
+    data = encode_prediction(False, 0.25, fmt="json")
+
+    assert json.loads(data) == {"is_violation": False, "probability": 0.25}
+
+
+def test_unknown_format_tag_is_a_miss():
+    assert decode_prediction(b"\x7f" + b"\x00" * 9) is None
+    assert decode_moderation_result(b"\x7f" + b"\x00" * 30) is None
+
+
+@pytest.mark.parametrize("result", [
+    {"task_id": 20, "status": "completed", "is_violation": True, "probability": 0.87},
+    {"task_id": 21, "status": "pending", "is_violation": None, "probability": None},
+    {"task_id": 22, "status": "failed", "is_violation": None, "probability": None, "error_message": "Не найдено"},
+])
+def test_moderation_result_round_trip(result):
+    data = encode_moderation_result(result)
+
+    assert data[0] == 0x11
+    assert decode_moderation_result(data) == result
+    assert len(data) < len(json.dumps(result))
+
+
+def test_moderation_result_with_unknown_shape_falls_back_to_json():
+    result = {"task_id": 1, "status": "archived"}
+
+    data = encode_moderation_result(result)
+
+    assert data.startswith(b"{")
+    assert decode_moderation_result(data) == result
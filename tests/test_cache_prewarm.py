@@ -0,0 +1,100 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from models.domain import AdvertisementWithUser
+from services import cache_prewarm
+from services.cache_prewarm import CachePrewarmer
+from services.hot_set import HotSetTracker
+from services.ml_model import ScoredBatch
+
+
+def _ad(advertisement_id: int) -> AdvertisementWithUser:
+    return AdvertisementWithUser(
+        id=advertisement_id,
+        user_id=1,
+        name="Test",
+        description="Desc",
+        category=1,
+        images_qty=2,
+        is_verified_seller=False,
+    )
+
+
+@pytest.fixture
+def prewarmer(monkeypatch):
+    prewarmer = CachePrewarmer(tracker=HotSetTracker(size=10, width=256), batch_size=2, rate_per_second=0)
+    monkeypatch.setattr(prewarmer.cache, "get_predictions_by_ads", AsyncMock(return_value={1: (False, 0.1)}))
+    monkeypatch.setattr(prewarmer.cache, "set_predictions_by_ads", AsyncMock())
+    monkeypatch.setattr(
+        prewarmer.ad_repository,
+        "get_many_with_user",
+        AsyncMock(side_effect=lambda ids: ({i: _ad(i) for i in ids if i != 4}, [i for i in ids if i == 4])),
+    )
+    executor = MagicMock()
+    executor.predict = AsyncMock(side_effect=lambda features: ScoredBatch("v1", [(True, 0.9)] * len(features)))
+    monkeypatch.setattr(cache_prewarm, "get_inference_executor", lambda: executor)
+    monkeypatch.setattr(prewarmer.hot_repository, "save", AsyncMock())
+    monkeypatch.setattr(prewarmer.hot_repository, "delete_stale", AsyncMock())
+    monkeypatch.setattr(prewarmer.hot_repository, "get_top", AsyncMock(return_value=[(1, 9), (2, 5)]))
+    return prewarmer
+
+
+@pytest.mark.asyncio
+async def test_prewarm_skips_cached_and_missing_ads(prewarmer):
+    warmed = await prewarmer.prewarm([1, 2, 3, 4])
+
+    assert warmed == 2
+    written = {}
+    for call in prewarmer.cache.set_predictions_by_ads.call_args_list:
+        written.update(call.args[0])
+    assert written == {2: (True, 0.9), 3: (True, 0.9)}
+
+
+@pytest.mark.asyncio
+async def test_prewarm_does_not_count_as_served_predictions(prewarmer):
+    from services.ports.metrics import NoopMetricsRecorder, set_metrics_recorder
+
+    recorder = MagicMock()
+    set_metrics_recorder(recorder)
+    try:
+        await prewarmer.prewarm([2, 3])
+    finally:
+        set_metrics_recorder(NoopMetricsRecorder())
+
+    recorder.record_prediction_results.assert_not_called()
+    recorder.record_model_version_predictions.assert_not_called()
+    recorder.observe_prediction_probabilities.assert_not_called()
+    recorder.observe_prediction_inference.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_prewarm_is_rate_limited(prewarmer, monkeypatch):
+    prewarmer._rate_per_second = 4
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(cache_prewarm.asyncio, "sleep", fake_sleep)
+
+    await prewarmer.prewarm([2, 3, 5])
+
+    assert len(sleeps) == 2
+    assert sleeps[0] == pytest.approx(0.5, abs=0.05)
+    assert sleeps[1] == pytest.approx(0.25, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_tick_prewarms_only_when_this_instance_claims_cold_cache(prewarmer, monkeypatch):
+    prewarmer.tracker.record(3)
+    monkeypatch.setattr(prewarmer.cache, "claim_warm_marker", AsyncMock(return_value=False))
+
+    assert await prewarmer.tick() == 0
+    prewarmer.hot_repository.save.assert_awaited_once_with([(3, 1)], prewarmer._interval_seconds)
+
+    prewarmer.cache.claim_warm_marker = AsyncMock(return_value=True)
+    monkeypatch.setattr(prewarmer, "prewarm", AsyncMock(return_value=2))
+
+    assert await prewarmer.tick() == 2
+    prewarmer.prewarm.assert_awaited_once_with([1, 2])
@@ -0,0 +1,71 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis.exceptions
+
+from app.clients import redis_client as redis_client_module
+from app.clients.circuit_breaker import CircuitBreaker
+from app.clients.redis_client import RedisClient
+from storages.prediction_cache import PredictionCacheStorage
+
+
+def test_breaker_opens_after_consecutive_failures_and_closes_on_success():
+    transitions = []
+    breaker = CircuitBreaker("test", failure_threshold=3, on_transition=lambda name, state: transitions.append(state))
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    breaker.half_open()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.half_open()
+    breaker.record_success()
+    assert breaker.allow()
+    assert transitions == ["open", "half_open", "open", "half_open", "closed"]
+
+
+@pytest.fixture
+def connected_redis(monkeypatch):
+    client = RedisClient()
+    raw = MagicMock()
+    decoded = MagicMock()
+    decoded.ping = AsyncMock(side_effect=redis.exceptions.ConnectionError())
+    monkeypatch.setattr(client, "_raw_client", raw)
+    monkeypatch.setattr(client, "_client", decoded)
+    return client, raw, decoded
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_bypasses_redis_until_probe_succeeds(monkeypatch, connected_redis):
+    client, raw, decoded = connected_redis
+    monkeypatch.setattr(redis_client_module, "REDIS_BREAKER_OPEN_SECONDS", 0.01)
+    raw.get = AsyncMock(side_effect=redis.exceptions.TimeoutError())
+    cache = PredictionCacheStorage()
+
+    for _ in range(5):
+        assert await cache.get_prediction_by_ad(1) is None
+    assert raw.get.await_count == 5
+    assert not client.is_connected()
+
+    assert await cache.get_prediction_by_ad(1) is None
+    assert raw.get.await_count == 5
+
+    await asyncio.sleep(0.05)
+    assert client.breaker.state == "open"
+    decoded.ping = AsyncMock(return_value=True)
+    await asyncio.sleep(0.05)
+
+    assert client.breaker.state == "closed"
+    assert client.is_connected()
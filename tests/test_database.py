@@ -0,0 +1,505 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg
+import pytest
+
+import database
+from database import Database, NamedQuery, _InstrumentedConnection, register_query
+
+
+def _prepared_statement(row=None, status="UPDATE 1"):
+    stmt = MagicMock()
+    stmt.fetchrow = AsyncMock(return_value=row)
+    stmt.fetch = AsyncMock(return_value=[])
+    stmt.get_statusmsg = MagicMock(return_value=status)
+    return stmt
+
+
+@pytest.mark.asyncio
+async def test_named_query_runs_on_prepared_statement():
+    raw = MagicMock()
+    raw.fetchrow = AsyncMock()
+    stmt = _prepared_statement(row={"id": 1})
+    query = NamedQuery("q", "SELECT id FROM t WHERE id = $1")
+    conn = _InstrumentedConnection(raw, {"q": stmt})
+
+    assert await conn.fetchrow(query, 1) == {"id": 1}
+    stmt.fetchrow.assert_awaited_once_with(1)
+    raw.fetchrow.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_prepared_execute_returns_status_like_connection_execute():
+    stmt = _prepared_statement(status="UPDATE 1")
+    conn = _InstrumentedConnection(MagicMock(), {"q": stmt})
+
+    assert await conn.execute(NamedQuery("q", "UPDATE t SET x = 1 WHERE id = $1"), 5) == "UPDATE 1"
+    stmt.fetch.assert_awaited_once_with(5)
+
+
+@pytest.mark.asyncio
+async def test_unprepared_named_query_falls_back_to_sql_text():
+    raw = MagicMock()
+    raw.fetchrow = AsyncMock(return_value=None)
+    conn = _InstrumentedConnection(raw)
+
+    await conn.fetchrow(NamedQuery("q", "SELECT 1"), 1)
+
+    raw.fetchrow.assert_awaited_once_with("SELECT 1", 1)
+
+
+def test_register_query_rejects_conflicting_sql(monkeypatch):
+    monkeypatch.setattr(database, "_QUERIES", {})
+    register_query("dup", "SELECT 1")
+
+    assert register_query("dup", "SELECT 1").sql == "SELECT 1"
+    with pytest.raises(ValueError):
+        register_query("dup", "SELECT 2")
+
+
+@pytest.mark.asyncio
+async def test_init_hook_prepares_registered_queries_and_skips_failures(monkeypatch):
+    monkeypatch.setattr(database, "_QUERIES", {})
+    monkeypatch.setattr(Database, "_prepared", {})
+    register_query("ok", "SELECT 1")
+    register_query("broken", "SELECT * FROM missing_table")
+    stmt = _prepared_statement()
+
+    async def prepare(sql):
+        if "missing_table" in sql:
+            raise asyncpg.UndefinedTableError("relation does not exist")
+        return stmt
+
+    conn = MagicMock()
+    conn.prepare = prepare
+    conn.get_server_pid = MagicMock(return_value=4242)
+
+    await Database()._init_connection(conn)
+
+    assert Database._prepared == {4242: {"ok": stmt}}
+    conn.add_termination_listener.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_init_hook_prepares_nothing_when_disabled(monkeypatch):
+    monkeypatch.setattr(database, "DB_PREPARE_STATEMENTS", False)
+    monkeypatch.setattr(Database, "_prepared", {})
+    conn = MagicMock()
+    conn.prepare = AsyncMock()
+
+    await Database()._init_connection(conn)
+
+    conn.prepare.assert_not_called()
+    assert Database._prepared == {}
+
+
+def test_repository_queries_are_registered():
+    from repositories import queries
+
+    names = {query.name for query in database.registered_queries()}
+    assert {
+        queries.ADVERTISEMENT_GET_WITH_USER.name,
+        queries.ADVERTISEMENT_GET_BY_ID.name,
+        queries.MODERATION_RESULT_SET_COMPLETED.name,
+    } <= names
+
+
+class _FakePool:
+    def __init__(self, size=1, idle=1, acquire_error=None):
+        self.size = size
+        self.idle = idle
+        self.acquire_error = acquire_error
+        self.acquire_timeouts = []
+        self.released = []
+
+    def get_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return self.idle
+
+    async def acquire(self, timeout=None):
+        self.acquire_timeouts.append(timeout)
+        if self.acquire_error is not None:
+            raise self.acquire_error
+        if self.idle:
+            self.idle -= 1
+        else:
+            self.size += 1
+        conn = MagicMock()
+        conn.get_server_pid = MagicMock(return_value=1)
+        return conn
+
+    async def release(self, conn):
+        self.released.append(conn)
+        self.idle += 1
+
+
+def _sample(name, labels=None):
+    from prometheus_client import REGISTRY
+
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_get_connection_reports_pool_usage_and_releases(monkeypatch):
+    pool = _FakePool(size=2, idle=2)
+    monkeypatch.setattr(Database, "_pool", pool)
+    waits = _sample("db_pool_acquire_wait_seconds_count", {"pool": "primary"})
+
+    async with Database().get_connection():
+        assert _sample("db_pool_connections", {"pool": "primary", "state": "in_use"}) == 1
+        assert _sample("db_pool_connections", {"pool": "primary", "state": "idle"}) == 1
+
+    assert len(pool.released) == 1
+    assert pool.acquire_timeouts == [database.DB_POOL_ACQUIRE_TIMEOUT_SECONDS]
+    assert _sample("db_pool_connections", {"pool": "primary", "state": "in_use"}) == 0
+    assert _sample("db_pool_acquire_wait_seconds_count", {"pool": "primary"}) == waits + 1
+
+
+@pytest.mark.asyncio
+async def test_get_connection_counts_acquire_timeouts(monkeypatch):
+    monkeypatch.setattr(Database, "_pool", _FakePool(acquire_error=asyncio.TimeoutError()))
+    timeouts = _sample("db_pool_acquire_timeouts_total", {"pool": "primary"})
+
+    with pytest.raises(asyncio.TimeoutError):
+        async with Database().get_connection():
+            pass
+
+    assert _sample("db_pool_acquire_timeouts_total", {"pool": "primary"}) == timeouts + 1
+
+
+@pytest.mark.asyncio
+async def test_prewarm_opens_connections_up_to_target(monkeypatch):
+    pool = _FakePool(size=1, idle=1)
+    monkeypatch.setattr(Database, "_pool", pool)
+    monkeypatch.setattr(database, "DB_POOL_MAX_SIZE", 4)
+
+    await Database()._prewarm(6)
+
+    assert pool.get_size() == 4
+    assert pool.get_idle_size() == 4
+    assert len(pool.released) == 4
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    pools = [_FakePool(size=2, idle=2), _FakePool(size=2, idle=2)]
+    monkeypatch.setattr(Database, "_pool", _FakePool(size=2, idle=2))
+    monkeypatch.setattr(Database, "_replicas", pools)
+    monkeypatch.setattr(Database, "_replica_prepared", [{}, {}])
+    monkeypatch.setattr(Database, "_recent_writes", database.OrderedDict())
+    return pools
+
+
+@pytest.mark.asyncio
+async def test_readonly_connections_go_to_least_busy_replica(replicas):
+    db = Database()
+    replicas[0].idle = 0
+
+    async with db.get_connection(readonly=True):
+        pass
+    async with db.get_connection():
+        pass
+
+    assert len(replicas[0].released) == 0
+    assert len(replicas[1].released) == 1
+    assert len(Database._pool.released) == 1
+
+
+@pytest.mark.asyncio
+async def test_round_robin_rotates_replicas(replicas, monkeypatch):
+    monkeypatch.setattr(database, "DB_REPLICA_SELECTION", "round_robin")
+    db = Database()
+
+    for _ in range(4):
+        async with db.get_connection(readonly=True):
+            pass
+
+    assert [len(p.released) for p in replicas] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_reads_stay_on_primary_within_read_your_writes_window(replicas, monkeypatch):
+    db = Database()
+    routed = _sample("db_connection_routes_total", {"target": "primary", "reason": "read_your_writes"})
+    db.mark_written(("advertisement", 7))
+
+    async with db.get_connection(readonly=True, key=("advertisement", 7)):
+        pass
+    async with db.get_connection(readonly=True, key=("advertisement", 8)):
+        pass
+
+    assert len(Database._pool.released) == 1
+    assert sum(len(p.released) for p in replicas) == 1
+    assert _sample("db_connection_routes_total", {"target": "primary", "reason": "read_your_writes"}) == routed + 1
+
+    monkeypatch.setattr(database.time, "monotonic", lambda: float("inf"))
+    assert not db._written_recently(("advertisement", 7))
+
+
+@pytest.mark.asyncio
+async def test_unavailable_replica_falls_back_to_primary(replicas):
+    for pool in replicas:
+        pool.acquire_error = ConnectionRefusedError()
+
+    async with Database().get_connection(readonly=True):
+        pass
+
+    assert len(Database._pool.released) == 1
+
+
+@pytest.mark.asyncio
+async def test_batches_groups_sync_and_async_iterables():
+    async def agen():
+        for i in range(5):
+            yield i
+
+    assert [b async for b in database.batches(range(5), 2)] == [[0, 1], [2, 3], [4]]
+    assert [b async for b in database.batches(agen(), 2)] == [[0, 1], [2, 3], [4]]
+    assert [b async for b in database.batches([], 2)] == []
+
+
+@pytest.fixture
+def primary(monkeypatch):
+    pool = _FakePool(size=2, idle=2)
+    monkeypatch.setattr(Database, "_pool", pool)
+    monkeypatch.setattr(Database, "_replicas", [])
+    monkeypatch.setattr(Database, "_replica_prepared", [])
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_session_reuses_one_connection(primary):
+    db = Database()
+    observed = _sample("db_session_connection_acquisitions_count")
+
+    async with db.session() as session:
+        async with db.get_connection(readonly=True) as first:
+            pass
+        async with db.get_connection() as second:
+            pass
+        assert first is second
+        assert len(primary.acquire_timeouts) == 1
+        assert primary.released == []
+
+    assert session.acquisitions == 1
+    assert len(primary.released) == 1
+    assert _sample("db_session_connection_acquisitions_count") == observed + 1
+
+
+@pytest.mark.asyncio
+async def test_session_is_lazy(primary):
+    async with Database().session() as session:
+        pass
+
+    assert session.acquisitions == 0
+    assert primary.acquire_timeouts == []
+
+
+@pytest.mark.asyncio
+async def test_tasks_spawned_in_session_use_their_own_connections(primary):
+    db = Database()
+
+    async def query():
+        async with db.get_connection() as conn:
+            return conn
+
+    async with db.session() as session:
+        mine = await query()
+        spawned = await asyncio.create_task(query())
+
+    assert mine is not spawned
+    assert session.acquisitions == 2
+    assert len(primary.released) == 2
+
+
+class _BoundedPool(_FakePool):
+    """A pool of ``max_size`` connections whose acquire waits, then times out."""
+
+    def __init__(self, max_size):
+        super().__init__(size=max_size, idle=max_size)
+        self._free = asyncio.Semaphore(max_size)
+
+    async def acquire(self, timeout=None):
+        await asyncio.wait_for(self._free.acquire(), timeout)
+        return await super().acquire(timeout)
+
+    async def release(self, conn):
+        await super().release(conn)
+        self._free.release()
+
+
+@pytest.fixture
+def predict_by_id_in_session(monkeypatch):
+    """``ItemsService.predict_by_id`` on a cache miss, after an auth lookup in
+    the same session; the ad lookup and inference are stubbed."""
+    from models.domain import AdvertisementWithUser
+    from services import items
+    from services.items import ItemsService
+    from services.ml_model import Prediction
+
+    monkeypatch.setattr(Database, "_replicas", [])
+    monkeypatch.setattr(Database, "_replica_prepared", [])
+    monkeypatch.setattr(database, "DB_POOL_ACQUIRE_TIMEOUT_SECONDS", 0.5)
+
+    async def inference(features):
+        await asyncio.sleep(0.05)
+        return Prediction(False, 0.1, "v1")
+
+    monkeypatch.setattr(items, "get_prediction_batcher", lambda: MagicMock(predict=inference))
+    monkeypatch.setattr(items, "get_prediction_memo", lambda: MagicMock(get=MagicMock(return_value=None)))
+    monkeypatch.setattr(items, "ModelClient", lambda: MagicMock(version="v1"))
+
+    async def run(advertisement_id):
+        db = Database()
+        service = ItemsService()
+        service.cache = MagicMock(
+            get_prediction_entry_by_ad=AsyncMock(return_value=None),
+            is_ad_missing=AsyncMock(return_value=False),
+            set_prediction_by_ad=AsyncMock(),
+        )
+        service.features_repository = MagicMock(available=False)
+
+        async def get_with_user(ad_id, readonly=True):
+            async with db.get_connection(readonly=readonly):
+                await asyncio.sleep(0.01)
+                return AdvertisementWithUser(
+                    id=ad_id, user_id=1, name="Ad", description="Desc",
+                    category=1, images_qty=1, is_verified_seller=True,
+                )
+
+        service.ad_repository.get_with_user = get_with_user
+        async with db.session() as session:
+            async with db.get_connection():
+                pass  # the auth lookup
+            result = await service.predict_by_id(advertisement_id)
+        return session, result
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_borrows_the_request_session(monkeypatch, predict_by_id_in_session):
+    pool = _BoundedPool(max_size=1)
+    monkeypatch.setattr(Database, "_pool", pool)
+
+    session, result = await predict_by_id_in_session(1)
+
+    assert result == (False, 0.1)
+    assert session.acquisitions == 1
+    assert len(pool.released) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_do_not_exhaust_a_small_pool(monkeypatch, predict_by_id_in_session):
+    pool = _BoundedPool(max_size=4)
+    monkeypatch.setattr(Database, "_pool", pool)
+
+    outcomes = await asyncio.gather(*(predict_by_id_in_session(ad_id) for ad_id in [1, 1, 2, 3, 4, 5, 6, 7]))
+
+    assert [result for _, result in outcomes] == [(False, 0.1)] * 8
+    assert all(session.acquisitions == 1 for session, _ in outcomes)
+    assert pool.idle == 4
+
+
+@pytest.mark.asyncio
+async def test_lent_session_is_released_by_borrower_after_owner_is_cancelled(primary):
+    db = Database()
+    borrowed = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def borrower(session):
+        async with session.lend():
+            async with db.get_connection():
+                borrowed.set()
+                await finish.wait()
+
+    async def request():
+        async with db.session() as session:
+            await asyncio.shield(asyncio.create_task(borrower(session)))
+
+    owner = asyncio.create_task(request())
+    await borrowed.wait()
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    assert primary.released == []
+
+    finish.set()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert len(primary.released) == 1
+
+
+@pytest.mark.asyncio
+async def test_session_released_before_wait_reacquires_on_next_use(primary):
+    db = Database()
+
+    async with db.session() as session:
+        async with db.get_connection():
+            pass
+        await database.release_session_connections()
+        assert len(primary.released) == 1
+        async with db.get_connection():
+            pass
+
+    assert session.acquisitions == 2
+    assert len(primary.released) == 2
+
+
+@pytest.mark.asyncio
+async def test_transaction_session_commits_or_rolls_back(primary):
+    db = Database()
+    entered = []
+
+    class _Tx:
+        async def __aenter__(self):
+            entered.append("begin")
+
+        async def __aexit__(self, exc_type, exc, tb):
+            entered.append("rollback" if exc_type else "commit")
+
+    async def acquire(timeout=None):
+        conn = MagicMock()
+        conn.get_server_pid = MagicMock(return_value=1)
+        conn.transaction = MagicMock(return_value=_Tx())
+        return conn
+
+    primary.acquire = acquire
+
+    async with db.session(transaction=True):
+        async with db.get_connection(readonly=True):
+            pass
+    with pytest.raises(RuntimeError):
+        async with db.session(transaction=True):
+            async with db.get_connection():
+                raise RuntimeError("boom")
+
+    assert entered == ["begin", "commit", "begin", "rollback"]
+
+
+def test_db_session_dependency_shares_connection_with_sub_dependencies(primary):
+    from fastapi import APIRouter, Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.dependencies.database import db_session
+
+    async def lookup():
+        async with Database().get_connection() as conn:
+            return id(conn)
+
+    router = APIRouter(dependencies=[Depends(db_session)])
+
+    @router.get("/probe")
+    async def probe(first: int = Depends(lookup)):
+        return {"same": first == await lookup()}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).get("/probe")
+
+    assert response.json() == {"same": True}
+    assert len(primary.acquire_timeouts) == 1
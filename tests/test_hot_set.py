@@ -0,0 +1,54 @@
+import random
+
+from services.hot_set import HotSetTracker
+
+
+def test_top_returns_most_requested_ids_first():
+    tracker = HotSetTracker(size=3, width=1024)
+    for key, hits in [(10, 50), (20, 5), (30, 30), (40, 1), (50, 20)]:
+        for _ in range(hits):
+            tracker.record(key)
+
+    assert tracker.top() == [10, 30, 50]
+
+
+def test_heavy_hitters_survive_long_tail():
+    rng = random.Random(0)
+    tracker = HotSetTracker(size=10, width=2048)
+    hot = list(range(1, 11))
+    for _ in range(20000):
+        if rng.random() < 0.5:
+            tracker.record(rng.choice(hot))
+        else:
+            tracker.record(rng.randint(1000, 1_000_000))
+
+    assert sorted(tracker.top()) == hot
+
+
+def test_decay_halves_counts_and_drops_cold_ids():
+    tracker = HotSetTracker(size=5, width=256)
+    for _ in range(8):
+        tracker.record(1)
+    tracker.record(2)
+
+    tracker.decay()
+
+    assert tracker.snapshot() == [(1, 4)]
+    assert tracker.estimate(1) == 4
+
+
+def test_load_restores_persisted_ranking():
+    tracker = HotSetTracker(size=2, width=256)
+
+    tracker.load([(7, 100), (8, 40), (9, 10)])
+
+    assert tracker.snapshot() == [(7, 100), (8, 40)]
+
+
+def test_disabled_tracker_records_nothing():
+    tracker = HotSetTracker(size=0)
+
+    tracker.record(1)
+
+    assert not tracker.enabled
+    assert tracker.top() == []
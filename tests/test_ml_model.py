@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+from services import ml_model
+from services.ml_model import CompiledLinearModel, ModelClient, load_model, train_model
+
+
+@pytest.fixture
+def sklearn_model():
+    return load_model("model.pkl")
+
+
+def _random_features(n: int) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    features = rng.random((n, 4))
+    features[:, 0] = rng.integers(0, 2, n)
+    features[:, 2] *= 5.0
+    return features
+
+
+@pytest.mark.parametrize("model_factory", [lambda: load_model("model.pkl"), train_model])
+def test_compiled_model_matches_sklearn(model_factory):
+    model = model_factory()
+    compiled = CompiledLinearModel.from_estimator(model)
+    features = _random_features(5000)
+
+    results = compiled.score(features)
+
+    expected_labels = model.predict(features).astype(bool).tolist()
+    expected_proba = model.predict_proba(features)[:, 1]
+    assert [label for label, _ in results] == expected_labels
+    assert np.allclose([p for _, p in results], expected_proba, rtol=1e-12, atol=0.0)
+
+
+def test_compiled_score_row_matches_batch(sklearn_model):
+    compiled = CompiledLinearModel.from_estimator(sklearn_model)
+    features = _random_features(200)
+
+    batch = compiled.score(features)
+    rows = [compiled.score_row(row) for row in features.tolist()]
+
+    assert [label for label, _ in rows] == [label for label, _ in batch]
+    assert np.allclose([p for _, p in rows], [p for _, p in batch], rtol=1e-12, atol=0.0)
+
+
+def test_compile_rejects_models_without_linear_weights():
+    class Opaque:
+        classes_ = np.array([0, 1])
+
+        def predict_proba(self, features):
+            return np.zeros((len(features), 2))
+
+    assert CompiledLinearModel.from_estimator(Opaque()) is None
+
+
+def test_model_client_compiled_mode_matches_reference(monkeypatch):
+    monkeypatch.setattr(ModelClient, "_instance", None)
+    client = ModelClient()
+    features = _random_features(100)
+
+    reference = ml_model.get_predictions(features)
+    monkeypatch.setattr(client, "_scoring_mode", "compiled")
+    assert client.scoring_mode == "compiled"
+    compiled = ml_model.get_predictions(features)
+
+    assert [label for label, _ in compiled] == [label for label, _ in reference]
+    assert np.allclose([p for _, p in compiled], [p for _, p in reference], rtol=1e-12, atol=0.0)
+    monkeypatch.setattr(ModelClient, "_instance", None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["inline", "thread", "process"])
+async def test_inference_executor_matches_direct_call(kind):
+    executor = ml_model.InferenceExecutor(kind=kind, max_workers=1)
+    features = _random_features(16)
+    try:
+        version, results = await executor.predict(features)
+        single = await executor.predict_one(features[0].tolist())
+    finally:
+        executor.shutdown()
+
+    expected = ml_model.get_predictions(features)
+    assert version == ModelClient().version
+    assert single.model_version == version
+    assert [label for label, _ in results] == [label for label, _ in expected]
+    assert np.allclose([p for _, p in results], [p for _, p in expected])
+    assert single[0] == expected[0][0]
+    assert single[1] == pytest.approx(expected[0][1])
+
+
+def test_inference_executor_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        ml_model.InferenceExecutor(kind="gpu")
+
+
+def _feature_sources(n: int) -> list:
+    from models.domain import AdvertisementWithUser
+
+    rng = np.random.default_rng(11)
+    return [
+        AdvertisementWithUser(
+            id=i,
+            user_id=i,
+            name="ad",
+            description="x" * int(rng.integers(0, 3000)),
+            category=int(rng.integers(0, 200)),
+            images_qty=int(rng.integers(0, 25)),
+            is_verified_seller=bool(rng.integers(0, 2)),
+        )
+        for i in range(n)
+    ]
+
+
+def test_build_features_batch_is_identical_to_build_features():
+    sources = _feature_sources(500)
+    expected = np.array([ml_model.build_features(s) for s in sources])
+
+    columnar = ml_model.build_features_batch(
+        [s.is_verified_seller for s in sources],
+        np.array([s.images_qty for s in sources]),
+        [len(s.description) for s in sources],
+        np.array([s.category for s in sources], dtype=np.int32),
+    )
+
+    assert columnar.shape == (500, 4)
+    assert np.array_equal(columnar, expected)
+    assert np.array_equal(ml_model.build_feature_matrix(sources), expected)
+    assert np.array_equal(
+        ml_model.build_features_batch_from_records([s.model_dump() for s in sources]),
+        expected,
+    )
+
+
+def test_build_features_batch_float32_and_precomputed_lengths():
+    sources = _feature_sources(50)
+    expected = np.array([ml_model.build_features(s) for s in sources], dtype=np.float32)
+    records = [
+        {**s.model_dump(exclude={"description"}), "description_len": len(s.description)}
+        for s in sources
+    ]
+
+    matrix = ml_model.build_features_batch_from_records(records, dtype=np.float32)
+
+    assert matrix.dtype == np.float32
+    assert np.array_equal(matrix, expected)
+
+
+def test_build_features_batch_rejects_ragged_columns():
+    with pytest.raises(ValueError):
+        ml_model.build_features_batch([True], [1, 2], [10], [1])
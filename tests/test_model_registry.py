@@ -0,0 +1,138 @@
+import asyncio
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from services import ml_model
+from services.ml_model import ModelClient, save_model, train_model
+from services.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    shutil.copy("model.pkl", tmp_path / "model.pkl")
+    monkeypatch.setattr(ml_model, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(ModelClient, "_instance", None)
+    yield tmp_path
+    monkeypatch.setattr(ModelClient, "_instance", None)
+
+
+def _publish(model_dir, version, model):
+    save_model(model, str(model_dir / f"model-{version}.pkl"))
+    (model_dir / "model_manifest.json").write_text(
+        json.dumps({"version": version, "path": f"model-{version}.pkl"})
+    )
+
+
+@pytest.mark.asyncio
+async def test_legacy_model_version_is_content_hash(model_dir):
+    client = ModelClient()
+
+    assert client.version.startswith("sha256:")
+    assert await ModelRegistry(client, interval_seconds=0).check_for_update() is False
+
+
+@pytest.mark.asyncio
+async def test_registry_swaps_in_manifest_version(model_dir):
+    client = ModelClient()
+    registry = ModelRegistry(client, interval_seconds=0)
+    features = np.array([[0.0, 0.1, 0.5, 0.3]])
+
+    _publish(model_dir, "v2", train_model())
+    assert await registry.check_for_update() is True
+
+    assert client.version == "v2"
+    assert ml_model.score_batch(features).model_version == "v2"
+    assert await registry.check_for_update() is False
+
+
+@pytest.mark.asyncio
+async def test_in_flight_snapshot_keeps_old_version(model_dir):
+    client = ModelClient()
+    registry = ModelRegistry(client, interval_seconds=0)
+    old_snapshot = client.snapshot()
+
+    _publish(model_dir, "v2", train_model())
+    await registry.check_for_update()
+
+    assert old_snapshot.version != "v2"
+    assert client.snapshot().version == "v2"
+
+
+@pytest.mark.asyncio
+async def test_failed_load_keeps_serving_current_version(model_dir):
+    client = ModelClient()
+    registry = ModelRegistry(client, interval_seconds=0)
+    version = client.version
+
+    (model_dir / "model-broken.pkl").write_bytes(b"not a pickle")
+    (model_dir / "model_manifest.json").write_text(
+        json.dumps({"version": "broken", "path": "model-broken.pkl"})
+    )
+
+    assert await registry.check_for_update() is False
+    assert client.version == version
+
+
+@pytest.mark.asyncio
+async def test_background_watch_picks_up_new_version(model_dir):
+    client = ModelClient()
+    registry = ModelRegistry(client, interval_seconds=0.01)
+    registry.start()
+    try:
+        _publish(model_dir, "v3", train_model())
+        for _ in range(200):
+            if client.version == "v3":
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await registry.stop()
+
+    assert client.version == "v3"
+
+
+@pytest.mark.asyncio
+async def test_registry_started_without_artifact_loads_first_published(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_model, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(ModelClient, "_instance", None)
+    client = ModelClient()
+    registry = ModelRegistry(client, interval_seconds=0.01)
+    registry.start()
+    try:
+        assert client.version is None
+        _publish(tmp_path, "v1", train_model())
+        for _ in range(200):
+            if client.version == "v1":
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await registry.stop()
+        monkeypatch.setattr(ModelClient, "_instance", None)
+
+    assert client.version == "v1"
+
+
+def test_missing_artifact_is_not_trained_in_serving_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_model, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(ModelClient, "_instance", None)
+    try:
+        client = ModelClient()
+
+        assert client.version is None
+        assert list(tmp_path.iterdir()) == []
+        with pytest.raises(ml_model.ModelNotLoadedError):
+            ml_model.get_prediction([1.0, 0.5, 0.1, 0.1])
+    finally:
+        monkeypatch.setattr(ModelClient, "_instance", None)
+
+
+def test_importing_app_does_not_import_sklearn():
+    import subprocess
+    import sys
+
+    code = "import sys, main; print('sklearn' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == "False"
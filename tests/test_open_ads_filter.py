@@ -0,0 +1,43 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.open_ads_filter import OpenAdsFilter
+from storages.bloom_filter import IntBloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = IntBloomFilter(capacity=10000, false_positive_rate=0.01)
+    for value in range(0, 20000, 2):
+        bloom.add(value)
+
+    assert all(bloom.might_contain(value) for value in range(0, 20000, 2))
+    false_positives = sum(bloom.might_contain(value) for value in range(1, 20000, 2))
+    assert false_positives / 10000 < 0.03
+
+
+@pytest.mark.asyncio
+async def test_filter_only_rejects_ids_up_to_max_seen_by_previous_rebuild(monkeypatch):
+    ads_filter = OpenAdsFilter()
+    snapshots = [[[1, 2, 3], [5, 8]], [[1, 2, 3], [5, 8], [12]]]
+
+    async def pages():
+        for page in snapshots.pop(0):
+            yield page
+
+    monkeypatch.setattr(ads_filter.ad_repository, "count_open", AsyncMock(return_value=6))
+    monkeypatch.setattr(ads_filter.ad_repository, "iter_open_ids", lambda: pages())
+
+    assert not ads_filter.rejects(4)
+    await ads_filter.rebuild()
+
+    # Ids below 8 may still be committing, so the first rebuild judges nothing.
+    assert ads_filter.ready
+    assert not ads_filter.rejects(4)
+
+    await ads_filter.rebuild()
+
+    assert not any(ads_filter.rejects(i) for i in (1, 2, 3, 5, 8))
+    assert ads_filter.rejects(4)
+    assert not ads_filter.rejects(10)
+    assert not ads_filter.rejects(12)
@@ -109,3 +109,114 @@ async def test_moderation_result_repository_workflow(db, ad_repo, mod_repo, user
     await mod_repo.delete_by_item_id(ad.id)
     await ad_repo.delete(ad.id)
     await user_repo.delete(user.id)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_bulk_create_returns_ids_in_input_order(db, user_repo, ad_repo):
+    user_ids = await user_repo.bulk_create((UserCreate(is_verified=i % 2 == 0) for i in range(3)), chunk_size=2)
+    assert len(set(user_ids)) == 3
+    assert (await user_repo.get_by_id(user_ids[1])).is_verified is False
+
+    async def ads():
+        for i, user_id in enumerate(user_ids):
+            yield AdvertisementCreate(
+                user_id=user_id, name=f"Bulk {i}", description="d", category=i, images_qty=i
+            )
+
+    ad_ids = await ad_repo.bulk_create(ads(), chunk_size=2)
+    assert len(ad_ids) == 3
+    for i, ad_id in enumerate(ad_ids):
+        fetched = await ad_repo.get_by_id(ad_id)
+        assert fetched.name == f"Bulk {i}"
+        assert fetched.user_id == user_ids[i]
+        await ad_repo.delete(ad_id)
+
+    for user_id in user_ids:
+        await user_repo.delete(user_id)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_many_with_user_reports_missing_and_closed(db, user_repo, ad_repo):
+    user = await user_repo.create(UserCreate(is_verified=True))
+    ad_ids = await ad_repo.bulk_create(
+        AdvertisementCreate(user_id=user.id, name=f"Many {i}", description="d", category=1, images_qty=1)
+        for i in range(3)
+    )
+    await ad_repo.close(ad_ids[1])
+    unknown = max(ad_ids) + 1_000_000
+
+    found, missing = await ad_repo.get_many_with_user([ad_ids[2], unknown, ad_ids[0], ad_ids[1], ad_ids[0]], chunk_size=2)
+
+    assert set(found) == {ad_ids[0], ad_ids[2]}
+    assert found[ad_ids[0]].is_verified_seller is True
+    assert missing == [unknown, ad_ids[1]]
+
+    for ad_id in ad_ids:
+        await ad_repo.delete(ad_id)
+    await user_repo.delete(user.id)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_ad_features_follow_ad_and_seller_writes(db, user_repo, ad_repo):
+    from repositories.ad_features import AdFeaturesRepository
+
+    features_repo = AdFeaturesRepository()
+    if not await features_repo.detect():
+        pytest.skip("migration 007 is not applied")
+    user = await user_repo.create(UserCreate(is_verified=False))
+    ad = await ad_repo.create(
+        AdvertisementCreate(user_id=user.id, name="Feat", description="x" * 42, category=3, images_qty=2)
+    )
+
+    features = await features_repo.get(ad.id)
+    assert features == (user.id, False, 2, 42, 3)
+
+    async with db.get_connection() as conn:
+        await conn.execute("UPDATE users SET is_verified = TRUE WHERE id = $1", user.id)
+    assert (await features_repo.get(ad.id)).is_verified_seller is True
+
+    await ad_repo.close(ad.id)
+    assert await features_repo.get(ad.id) is None
+
+    await ad_repo.delete(ad.id)
+    await user_repo.delete(user.id)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_close_with_moderation_results_returns_deleted_task_ids(db, user_repo, ad_repo, mod_repo):
+    user = await user_repo.create(UserCreate(is_verified=False))
+    ad = await ad_repo.create(
+        AdvertisementCreate(user_id=user.id, name="Close", description="d", category=1, images_qty=1)
+    )
+    tasks = [await mod_repo.create_pending(ad.id) for _ in range(2)]
+
+    task_ids = await ad_repo.close_with_moderation_results(ad.id)
+
+    assert sorted(task_ids) == sorted(task.id for task in tasks)
+    assert await ad_repo.get_by_id(ad.id) is None
+    assert await mod_repo.get_by_id(tasks[0].id) is None
+    assert await ad_repo.close_with_moderation_results(ad.id) is None
+
+    await ad_repo.delete(ad.id)
+    await user_repo.delete(user.id)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_hot_advertisement_save_keeps_higher_count_from_other_pod(db):
+    from repositories.hot_advertisements import HotAdvertisementRepository
+
+    repo = HotAdvertisementRepository()
+    ad_id = 9_000_000_001
+    await repo.save([(ad_id, 100)], half_life_seconds=3600)
+    await repo.save([(ad_id, 5)], half_life_seconds=3600)
+
+    hits = dict(await repo.get_top(1000)).get(ad_id)
+    assert 95 <= hits <= 100
+
+    async with db.get_connection() as conn:
+        await conn.execute("DELETE FROM hot_advertisements WHERE advertisement_id = $1", ad_id)
@@ -0,0 +1,82 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from services import ml_model
+from services.ml_model import ModelNotLoadedError
+from services.prediction_batcher import PredictionBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_predictions_share_one_model_call(monkeypatch):
+    calls = []
+
+    def fake_score_batch(matrix):
+        calls.append(matrix.shape)
+        return ml_model.ScoredBatch("v1", [(bool(row[0] > 0.5), float(row[0])) for row in matrix])
+
+    monkeypatch.setattr(ml_model, "score_batch", fake_score_batch)
+    batcher = PredictionBatcher(max_batch_size=64, max_wait_seconds=0.001)
+
+    features = [[i / 10.0, 0.0, 0.0, 0.0] for i in range(10)]
+    results = await asyncio.gather(*(batcher.predict(f) for f in features))
+
+    assert calls == [(10, 4)]
+    assert results == [(i / 10.0 > 0.5, i / 10.0, "v1") for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_batch_is_flushed_when_max_size_reached(monkeypatch):
+    calls = []
+
+    def fake_score_batch(matrix):
+        calls.append(len(matrix))
+        return ml_model.ScoredBatch("v1", [(False, 0.1)] * len(matrix))
+
+    monkeypatch.setattr(ml_model, "score_batch", fake_score_batch)
+    batcher = PredictionBatcher(max_batch_size=4, max_wait_seconds=0.05)
+
+    await asyncio.gather(*(batcher.predict([0.0, 0.0, 0.0, 0.0]) for _ in range(10)))
+
+    assert calls == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_model_error_is_propagated_to_every_caller(monkeypatch):
+    def fake_score_batch(matrix):
+        raise ModelNotLoadedError("Model is not loaded")
+
+    monkeypatch.setattr(ml_model, "score_batch", fake_score_batch)
+    batcher = PredictionBatcher(max_batch_size=8, max_wait_seconds=0.0)
+
+    results = await asyncio.gather(
+        *(batcher.predict([0.0, 0.0, 0.0, 0.0]) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ModelNotLoadedError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_wait_window_adapts_to_observed_batch_size(monkeypatch):
+    monkeypatch.setattr(
+        ml_model, "score_batch", lambda m: ml_model.ScoredBatch("v1", [(False, 0.0)] * len(m))
+    )
+    batcher = PredictionBatcher(max_batch_size=64, max_wait_seconds=0.001)
+
+    assert batcher.current_wait_seconds() == 0.0
+    for _ in range(5):
+        await asyncio.gather(*(batcher.predict([0.0, 0.0, 0.0, 0.0]) for _ in range(8)))
+
+    assert batcher.current_wait_seconds() == pytest.approx(0.001)
+
+
+def test_get_predictions_matches_single_row_path():
+    features = np.array([[1.0, 0.5, 0.016, 0.01], [0.0, 0.1, 0.013, 0.02]])
+
+    batch = ml_model.get_predictions(features)
+    single = [ml_model.get_prediction(list(row)) for row in features]
+
+    assert [label for label, _ in batch] == [label for label, _ in single]
+    assert [proba for _, proba in batch] == pytest.approx([proba for _, proba in single])
@@ -1,6 +1,10 @@
+import asyncio
+import time
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from storages.cache_codec import CachedPrediction, decode_prediction, decode_prediction_entry
 from storages.prediction_cache import PredictionCacheStorage
 from app.clients.redis_client import RedisClient
 
@@ -11,7 +15,7 @@ async def test_predict_by_id_returns_cached_result_when_available(monkeypatch):
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value='{"is_violation": true, "probability": 0.9}')
     monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
-    monkeypatch.setattr(cache.redis, "_client", mock_client)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
 
     result = await cache.get_prediction_by_ad(1)
 
@@ -25,7 +29,7 @@ async def test_predict_by_id_returns_none_when_cache_miss(monkeypatch):
     mock_client = MagicMock()
     mock_client.get = AsyncMock(return_value=None)
     monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
-    monkeypatch.setattr(cache.redis, "_client", mock_client)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
 
     result = await cache.get_prediction_by_ad(1)
 
@@ -39,16 +43,16 @@ async def test_set_prediction_by_ad_calls_redis_with_correct_args(monkeypatch):
     mock_setex = AsyncMock()
     mock_client.setex = mock_setex
     monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
-    monkeypatch.setattr(cache.redis, "_client", mock_client)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
 
     await cache.set_prediction_by_ad(1, False, 0.15)
 
     mock_setex.assert_called_once()
     call_args = mock_setex.call_args
     assert call_args[0][0] == "prediction:ad:1"
-    assert call_args[0][1] == 3600
-    assert '"is_violation": false' in call_args[0][2]
-    assert '"probability": 0.15' in call_args[0][2]
+    assert 3240 <= call_args[0][1] <= 3960
+    assert isinstance(call_args[0][2], bytes)
+    assert decode_prediction(call_args[0][2]) == (False, 0.15)
 
 
 @pytest.mark.asyncio
@@ -59,21 +63,22 @@ async def test_items_service_uses_cache_before_db(monkeypatch):
     cached_result = (True, 0.85)
     monkeypatch.setattr(
         service.cache,
-        "get_prediction_by_ad",
-        AsyncMock(return_value=cached_result),
+        "get_prediction_entry_by_ad",
+        AsyncMock(return_value=CachedPrediction(*cached_result)),
     )
 
     result = await service.predict_by_id(1)
 
     assert result == cached_result
-    service.cache.get_prediction_by_ad.assert_called_once_with(1)
+    service.cache.get_prediction_entry_by_ad.assert_called_once_with(1)
 
 
 @pytest.mark.asyncio
 async def test_items_service_sets_cache_on_miss(monkeypatch):
     from models.domain import AdvertisementWithUser
+    from services import items
     from services.items import ItemsService
-    from services import ml_model
+    from services.ml_model import Prediction
 
     service = ItemsService()
     ad = AdvertisementWithUser(
@@ -85,13 +90,19 @@ async def test_items_service_sets_cache_on_miss(monkeypatch):
         images_qty=5,
         is_verified_seller=True,
     )
-    monkeypatch.setattr(service.cache, "get_prediction_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
     monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock(return_value=ad))
     monkeypatch.setattr(service.cache, "set_prediction_by_ad", AsyncMock())
-    monkeypatch.setattr(ml_model, "get_prediction", lambda f: (False, 0.1))
+    batcher = MagicMock()
+    batcher.predict = AsyncMock(return_value=Prediction(False, 0.1, "v1"))
+    monkeypatch.setattr(items, "get_prediction_batcher", lambda: batcher)
+    monkeypatch.setattr(items, "get_prediction_memo", lambda: MagicMock(get=MagicMock(return_value=None)))
+    monkeypatch.setattr(items, "ModelClient", lambda: MagicMock(version="v1"))
 
     await service.predict_by_id(1)
 
+    batcher.predict.assert_awaited_once()
+
     service.cache.set_prediction_by_ad.assert_called_once()
     call_args = service.cache.set_prediction_by_ad.call_args[0]
     assert call_args[0] == 1
@@ -148,3 +159,467 @@ async def test_delete_moderation_results_by_task_ids(redis_client):
 
     assert await storage.get_moderation_result(1) is None
     assert await storage.get_moderation_result(2) is None
+
+
+@pytest.fixture
+def l1_cache(monkeypatch):
+    from storages.local_cache import LocalLRUCache
+
+    cache = LocalLRUCache(max_size=100, ttl_seconds=5)
+    monkeypatch.setattr(PredictionCacheStorage, "_l1", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_l1_serves_repeated_lookups_without_redis(monkeypatch, l1_cache):
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value='{"is_violation": true, "probability": 0.9}')
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    assert await cache.get_prediction_by_ad(1) == (True, 0.9)
+    assert await PredictionCacheStorage().get_prediction_by_ad(1) == (True, 0.9)
+
+    mock_client.get.assert_called_once_with("prediction:ad:1")
+
+
+@pytest.mark.asyncio
+async def test_l1_honors_local_deletes(monkeypatch, l1_cache):
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=None)
+    mock_client.setex = AsyncMock()
+    mock_client.delete = AsyncMock()
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    await cache.set_prediction_by_ad(1, True, 0.9)
+    await cache.set_moderation_result(7, {"task_id": 7, "status": "completed"})
+    assert await cache.get_prediction_by_ad(1) == (True, 0.9)
+    assert (await cache.get_moderation_result(7))["task_id"] == 7
+
+    await cache.delete_prediction_by_ad(1)
+    await cache.delete_moderation_results_by_task_ids([7])
+
+    assert await cache.get_prediction_by_ad(1) is None
+    assert await cache.get_moderation_result(7) is None
+    assert mock_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_l1_entry_expires_before_redis_entry(monkeypatch):
+    from storages.local_cache import LocalLRUCache
+
+    now = [0.0]
+    monkeypatch.setattr(
+        PredictionCacheStorage, "_l1", LocalLRUCache(max_size=10, ttl_seconds=5, clock=lambda: now[0])
+    )
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value='{"is_violation": false, "probability": 0.2}')
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    await cache.get_prediction_by_ad(3)
+    now[0] = 6.0
+    await cache.get_prediction_by_ad(3)
+
+    assert mock_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_predictions_by_ads_uses_single_mget(monkeypatch):
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.mget = AsyncMock(
+        return_value=['{"is_violation": true, "probability": 0.9}', None, '{"is_violation": false, "probability": 0.1}']
+    )
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    result = await cache.get_predictions_by_ads([1, 2, 3, 1])
+
+    assert result == {1: (True, 0.9), 3: (False, 0.1)}
+    mock_client.mget.assert_called_once_with(["prediction:ad:1", "prediction:ad:2", "prediction:ad:3"])
+
+
+@pytest.mark.asyncio
+async def test_set_predictions_by_ads_pipelines_setex(monkeypatch):
+    cache = PredictionCacheStorage()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    mock_client = MagicMock()
+    mock_client.pipeline = MagicMock(return_value=pipe)
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    await cache.set_predictions_by_ads({1: (True, 0.9), 2: (False, 0.2)})
+
+    mock_client.pipeline.assert_called_once_with(transaction=False)
+    assert [c.args[0] for c in pipe.setex.call_args_list] == [
+        "prediction:ad:1",
+        "prediction:ad:2",
+    ]
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_methods_degrade_on_connection_error(monkeypatch):
+    import redis.exceptions
+
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.mget = AsyncMock(side_effect=redis.exceptions.ConnectionError())
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(side_effect=redis.exceptions.ConnectionError())
+    mock_client.pipeline = MagicMock(return_value=pipe)
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    assert await cache.get_predictions_by_ads([1, 2]) == {}
+    assert await cache.get_moderation_results([5]) == {}
+    await cache.set_predictions_by_ads({1: (True, 0.9)})
+
+
+def _ad_with_user(advertisement_id: int = 1):
+    from models.domain import AdvertisementWithUser
+
+    return AdvertisementWithUser(
+        id=advertisement_id,
+        user_id=1,
+        name="Test",
+        description="Desc",
+        category=1,
+        images_qty=5,
+        is_verified_seller=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cache_misses_for_one_ad_are_coalesced(monkeypatch):
+    from services.items import ItemsService
+
+    async def slow_get_with_user(advertisement_id):
+        await asyncio.sleep(0.01)
+        return _ad_with_user(advertisement_id)
+
+    get_with_user = AsyncMock(side_effect=slow_get_with_user)
+    set_prediction = AsyncMock()
+    services = [ItemsService() for _ in range(5)]
+    for service in services:
+        monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+        monkeypatch.setattr(service.cache, "set_prediction_by_ad", set_prediction)
+        monkeypatch.setattr(service.ad_repository, "get_with_user", get_with_user)
+        monkeypatch.setattr(service, "predict", AsyncMock(return_value=(True, 0.9, "v1")))
+
+    results = await asyncio.gather(*(service.predict_by_id(1) for service in services))
+
+    assert results == [(True, 0.9)] * 5
+    get_with_user.assert_awaited_once_with(1)
+    set_prediction.assert_awaited_once()
+    assert set_prediction.call_args[0][:3] == (1, True, 0.9)
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_follower_waits_for_cached_result(monkeypatch):
+    from services import items
+    from services.items import ItemsService
+
+    monkeypatch.setattr(items, "PREDICT_SINGLE_FLIGHT_REDIS_LOCK", True)
+    monkeypatch.setattr(items, "PREDICT_LOCK_POLL_MS", 1.0)
+    service = ItemsService()
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "get_prediction_by_ad", AsyncMock(side_effect=[None, (False, 0.2)]))
+    monkeypatch.setattr(service.cache, "acquire_prediction_lock", AsyncMock(return_value=False))
+    monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock())
+
+    result = await service.predict_by_id(1)
+
+    assert result == (False, 0.2)
+    service.ad_repository.get_with_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_holder_computes_and_releases(monkeypatch):
+    from services import items
+    from services.items import ItemsService
+
+    monkeypatch.setattr(items, "PREDICT_SINGLE_FLIGHT_REDIS_LOCK", True)
+    service = ItemsService()
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "set_prediction_by_ad", AsyncMock())
+    monkeypatch.setattr(service.cache, "acquire_prediction_lock", AsyncMock(return_value=True))
+    monkeypatch.setattr(service.cache, "release_prediction_lock", AsyncMock())
+    monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock(return_value=_ad_with_user()))
+    monkeypatch.setattr(service, "predict", AsyncMock(return_value=(False, 0.1, "v1")))
+
+    assert await service.predict_by_id(1) == (False, 0.1)
+
+    token = service.cache.acquire_prediction_lock.call_args[0][1]
+    service.cache.release_prediction_lock.assert_awaited_once_with(1, token)
+
+
+@pytest.mark.asyncio
+async def test_prediction_lock_is_acquired_with_set_nx_px(monkeypatch):
+    cache = PredictionCacheStorage()
+    mock_client = AsyncMock()
+    mock_client.set = AsyncMock(return_value=None)
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    assert await cache.acquire_prediction_lock(7, "token", 5000) is False
+    mock_client.set.assert_awaited_once_with("prediction:lock:ad:7", "token", nx=True, px=5000)
+
+
+def test_jittered_ttl_spreads_expiry_within_bounds():
+    from storages.prediction_cache import jittered_ttl
+
+    ttls = {jittered_ttl(3600, jitter=0.1) for _ in range(200)}
+
+    assert all(3240 <= ttl <= 3960 for ttl in ttls)
+    assert len(ttls) > 50
+    assert jittered_ttl(3600, jitter=0.0) == 3600
+
+
+def test_should_refresh_early_depends_on_cost_and_time_left():
+    from storages.prediction_cache import should_refresh_early
+
+    now = 1_000.0
+    far = CachedPrediction(True, 0.9, compute_seconds=0.05, expires_at=now + 3600)
+    near = CachedPrediction(True, 0.9, compute_seconds=0.05, expires_at=now + 0.001)
+    unknown_cost = CachedPrediction(True, 0.9, compute_seconds=0.0, expires_at=now + 0.001)
+
+    assert not any(should_refresh_early(far, beta=1.0, now=now) for _ in range(1000))
+    assert sum(should_refresh_early(near, beta=1.0, now=now) for _ in range(1000)) > 900
+    assert not should_refresh_early(unknown_cost, beta=1.0, now=now)
+    assert not should_refresh_early(near, beta=0.0, now=now)
+
+
+@pytest.mark.asyncio
+async def test_set_prediction_by_ad_stores_cost_and_expiry(monkeypatch):
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.setex = AsyncMock()
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    await cache.set_prediction_by_ad(1, True, 0.9, compute_seconds=0.02)
+
+    _, ttl, payload = mock_client.setex.call_args[0]
+    entry = decode_prediction_entry(payload)
+    assert entry.compute_seconds == pytest.approx(0.02)
+    assert entry.expires_at == pytest.approx(time.time() + ttl, abs=1.0)
+
+
+@pytest.mark.asyncio
+async def test_hit_close_to_expiry_is_served_and_refreshed_in_background(monkeypatch):
+    from services import items
+    from services.items import ItemsService
+
+    service = ItemsService()
+    entry = CachedPrediction(False, 0.1, compute_seconds=0.05, expires_at=time.time())
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=entry))
+    monkeypatch.setattr(service.cache, "set_prediction_by_ad", AsyncMock())
+    monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock(return_value=_ad_with_user()))
+    monkeypatch.setattr(service, "predict", AsyncMock(return_value=(True, 0.8, "v2")))
+    monkeypatch.setattr(items, "should_refresh_early", lambda e: True)
+
+    assert await service.predict_by_id(1) == (False, 0.1)
+    await asyncio.gather(*ItemsService._refresh_tasks)
+
+    service.cache.set_prediction_by_ad.assert_awaited_once()
+    assert service.cache.set_prediction_by_ad.call_args[0][:3] == (1, True, 0.8)
+
+
+@pytest.mark.asyncio
+async def test_missing_ad_is_negatively_cached(monkeypatch):
+    from services.items import ItemsService
+
+    service = ItemsService()
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "is_ad_missing", AsyncMock(return_value=False))
+    monkeypatch.setattr(service.cache, "set_ad_missing", AsyncMock())
+    monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock(return_value=None))
+
+    with pytest.raises(ValueError):
+        await service.predict_by_id(404)
+
+    service.cache.set_ad_missing.assert_awaited_once_with(404)
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_hit_skips_database(monkeypatch):
+    from services.items import ItemsService
+
+    service = ItemsService()
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "is_ad_missing", AsyncMock(return_value=True))
+    monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock())
+
+    with pytest.raises(ValueError, match="not found"):
+        await service.predict_by_id(404)
+
+    service.ad_repository.get_with_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_creating_ad_clears_its_negative_entry(monkeypatch):
+    from models.domain import Advertisement, AdvertisementCreate
+    from services.items import ItemsService
+
+    service = ItemsService()
+    ad_data = AdvertisementCreate(user_id=1, name="A", description="B", category=1, images_qty=0)
+    monkeypatch.setattr(
+        service.ad_repository, "create", AsyncMock(return_value=Advertisement(id=42, **ad_data.model_dump()))
+    )
+    monkeypatch.setattr(service.ad_repository, "bulk_create", AsyncMock(return_value=[43, 44]))
+    monkeypatch.setattr(service.cache, "delete_ad_missing", AsyncMock())
+    monkeypatch.setattr(service.cache, "delete_ads_missing", AsyncMock())
+
+    await service.create_advertisement(ad_data)
+    await service.bulk_create_advertisements([ad_data, ad_data])
+
+    service.cache.delete_ad_missing.assert_awaited_once_with(42)
+    service.cache.delete_ads_missing.assert_awaited_once_with([43, 44])
+
+
+class _CacheOperationSpy:
+    def __init__(self):
+        self.operations = []
+
+    def observe_cache_operation(self, *, keyspace, operation, duration_seconds, results):
+        self.operations.append((keyspace, operation, dict(results)))
+
+    def __getattr__(self, name):
+        return lambda **kwargs: None
+
+
+@pytest.fixture
+def cache_spy():
+    from services.ports.metrics import NoopMetricsRecorder, set_metrics_recorder
+
+    spy = _CacheOperationSpy()
+    set_metrics_recorder(spy)
+    yield spy
+    set_metrics_recorder(NoopMetricsRecorder())
+
+
+@pytest.mark.asyncio
+async def test_cache_operations_report_hits_misses_and_writes(monkeypatch, cache_spy):
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=None)
+    mock_client.mget = AsyncMock(return_value=[b"\x01\x00" + bytes(8), None, None])
+    mock_client.setex = AsyncMock()
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    await cache.get_prediction_by_ad(1)
+    await cache.get_predictions_by_ads([1, 2, 3])
+    await cache.set_moderation_result(5, {"task_id": 5, "status": "completed"})
+
+    assert cache_spy.operations == [
+        ("prediction:ad", "get", {"hit": 0, "miss": 1}),
+        ("prediction:ad", "mget", {"hit": 1, "miss": 2}),
+        ("moderation_result", "set", {"ok": 1}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_swallowed_connection_errors_are_reported(monkeypatch, cache_spy):
+    import redis.exceptions
+
+    cache = PredictionCacheStorage()
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(side_effect=redis.exceptions.ConnectionError())
+    mock_client.delete = AsyncMock(side_effect=redis.exceptions.ConnectionError())
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    assert await cache.get_moderation_result(1) is None
+    await cache.delete_moderation_results_by_task_ids([1, 2])
+
+    assert cache_spy.operations == [
+        ("moderation_result", "get", {"error": 1}),
+        ("moderation_result", "delete", {"error": 2}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_reads_ad_features_instead_of_full_row(monkeypatch):
+    from models.domain import AdFeatures
+    from repositories.ad_features import AdFeaturesRepository
+    from services.items import ItemsService
+
+    service = ItemsService()
+    monkeypatch.setattr(AdFeaturesRepository, "_table_exists", True)
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "is_ad_missing", AsyncMock(return_value=False))
+    monkeypatch.setattr(service.cache, "set_prediction_by_ad", AsyncMock())
+    monkeypatch.setattr(service.features_repository, "get", AsyncMock(return_value=AdFeatures(7, True, 3, 120, 5)))
+    monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock())
+    monkeypatch.setattr(service, "_predict_vector", AsyncMock(return_value=(False, 0.2, "v1")))
+
+    assert await service.predict_by_id(1) == (False, 0.2)
+
+    service._predict_vector.assert_awaited_once_with([1.0, 0.3, 0.12, 0.05])
+    service.ad_repository.get_with_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_missing_ad_features_row_falls_back_to_full_row(monkeypatch):
+    from repositories.ad_features import AdFeaturesRepository
+    from services.items import ItemsService
+
+    service = ItemsService()
+    monkeypatch.setattr(AdFeaturesRepository, "_table_exists", True)
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "is_ad_missing", AsyncMock(return_value=False))
+    monkeypatch.setattr(service.cache, "set_prediction_by_ad", AsyncMock())
+    monkeypatch.setattr(service.features_repository, "get", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.ad_repository, "get_with_user", AsyncMock(return_value=_ad_with_user()))
+    monkeypatch.setattr(service, "predict", AsyncMock(return_value=(True, 0.7, "v1")))
+
+    assert await service.predict_by_id(1) == (True, 0.7)
+
+    service.ad_repository.get_with_user.assert_awaited_once_with(1)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_closed_ad_runs_one_pipeline(monkeypatch):
+    cache = PredictionCacheStorage()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[3, True])
+    mock_client = MagicMock()
+    mock_client.pipeline = MagicMock(return_value=pipe)
+    monkeypatch.setattr(cache.redis, "is_connected", lambda: True)
+    monkeypatch.setattr(cache.redis, "_raw_client", mock_client)
+
+    await cache.invalidate_closed_ad(1, [10, 11])
+
+    mock_client.pipeline.assert_called_once_with(transaction=False)
+    pipe.delete.assert_called_once_with("prediction:ad:1", "moderation_result:10", "moderation_result:11")
+    assert pipe.setex.call_args[0][0] == "prediction:missing:1"
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_replica_miss_is_confirmed_on_primary_before_negative_caching(monkeypatch):
+    from database import Database
+    from services.items import ItemsService
+
+    service = ItemsService()
+    monkeypatch.setattr(Database, "_replicas", [MagicMock()])
+    monkeypatch.setattr(service.cache, "get_prediction_entry_by_ad", AsyncMock(return_value=None))
+    monkeypatch.setattr(service.cache, "is_ad_missing", AsyncMock(return_value=False))
+    monkeypatch.setattr(service.cache, "set_ad_missing", AsyncMock())
+    monkeypatch.setattr(service.cache, "set_prediction_by_ad", AsyncMock())
+    get_with_user = AsyncMock(side_effect=lambda ad_id, readonly=True: None if readonly else _ad_with_user())
+    monkeypatch.setattr(service.ad_repository, "get_with_user", get_with_user)
+    monkeypatch.setattr(service, "predict", AsyncMock(return_value=(False, 0.3, "v1")))
+
+    assert await service.predict_by_id(1) == (False, 0.3)
+
+    assert get_with_user.await_args_list[-1].kwargs == {"readonly": False}
+    service.cache.set_ad_missing.assert_not_called()
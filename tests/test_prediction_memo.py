@@ -0,0 +1,104 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from models.items import Item
+from services.ml_model import Prediction
+from services.prediction_memo import PredictionMemo
+from storages.local_cache import LocalLRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalLRUCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    evicted = cache.set("c", 3)
+
+    assert evicted == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_local_cache_expires_entries():
+    clock = FakeClock()
+    cache = LocalLRUCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=1)
+
+    clock.now = 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    clock.now = 6
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_memo_returns_stored_prediction_for_same_version():
+    memo = PredictionMemo(max_size=10, ttl_seconds=60)
+    features = [1.0, 0.5, 0.016, 0.01]
+    prediction = Prediction(False, 0.1, "v1")
+
+    assert memo.get(features, "v1") is None
+    memo.set(features, prediction)
+
+    assert memo.get(list(features), "v1") == prediction
+
+
+def test_memo_is_invalidated_when_model_version_changes():
+    memo = PredictionMemo(max_size=10, ttl_seconds=60)
+    features = [1.0, 0.5, 0.016, 0.01]
+    memo.set(features, Prediction(False, 0.1, "v1"))
+
+    assert memo.get(features, "v2") is None
+    assert memo.get(features, "v1") is None
+
+
+def test_memo_disabled_with_zero_size():
+    memo = PredictionMemo(max_size=0, ttl_seconds=60)
+    features = [1.0, 0.5, 0.016, 0.01]
+    memo.set(features, Prediction(False, 0.1, "v1"))
+
+    assert memo.get(features, "v1") is None
+
+
+@pytest.mark.asyncio
+async def test_items_service_skips_inference_on_memo_hit(monkeypatch):
+    from services import items as items_module
+    from services.items import ItemsService
+    from services.prediction_memo import set_prediction_memo
+
+    set_prediction_memo(PredictionMemo(max_size=10, ttl_seconds=60))
+    batcher = AsyncMock()
+    batcher.predict = AsyncMock(return_value=Prediction(True, 0.9, "v1"))
+    monkeypatch.setattr(items_module, "get_prediction_batcher", lambda: batcher)
+    monkeypatch.setattr(items_module.ModelClient, "version", "v1")
+    item = Item(
+        seller_id=1,
+        is_verified_seller=False,
+        item_id=1,
+        name="a",
+        description="b",
+        category=1,
+        images_qty=1,
+    )
+    try:
+        service = ItemsService()
+        first = await service.predict(item)
+        second = await service.predict(item.model_copy(update={"item_id": 2, "name": "other"}))
+    finally:
+        set_prediction_memo(None)
+
+    assert first == second == Prediction(True, 0.9, "v1")
+    batcher.predict.assert_awaited_once()
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_for_one_key_share_a_single_computation():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flights.do("k", compute) for _ in range(5)))
+
+    assert calls == [1]
+    assert [value for value, _ in results] == ["value"] * 5
+    assert [shared for _, shared in results].count(False) == 1
+    assert flights.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_independently():
+    flights = SingleFlight()
+
+    async def compute(key):
+        await asyncio.sleep(0)
+        return key
+
+    results = await asyncio.gather(flights.do(1, lambda: compute(1)), flights.do(2, lambda: compute(2)))
+
+    assert results == [(1, False), (2, False)]
+
+
+@pytest.mark.asyncio
+async def test_error_is_shared_and_next_call_recomputes():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("not found")
+
+    results = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+    async def succeed():
+        return 42
+
+    assert await flights.do("k", succeed) == (42, False)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_computation():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(flights.do("k", compute))
+    follower = asyncio.create_task(flights.do("k", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    assert await follower == ("done", True)